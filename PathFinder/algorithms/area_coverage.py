@@ -0,0 +1,459 @@
+"""Polygon area coverage planning with boustrophedon decomposition"""
+
+import math
+import logging
+from dataclasses import dataclass, field
+from collections import deque
+from typing import List, Tuple, Optional, Callable, Deque, Set
+
+import numpy as np
+
+from navigation.geodesy import LocalProjection
+from .scan_grid import ScanGrid, STATUS_UNSCANNED, STATUS_CLEAR, STATUS_MINE
+from .corridor_sweep import SweepState
+from .mine_map import MineMap
+
+
+@dataclass
+class AreaConfig:
+    """Configuration for polygon area coverage"""
+    polygon: List[Tuple[float, float]]  # Outer boundary [(lat, lon), ...]
+    holes: List[List[Tuple[float, float]]] = field(default_factory=list)  # No-scan areas inside the boundary
+    start: Optional[Tuple[float, float]] = None  # Launch point (default: first polygon vertex)
+    scan_cell_size_m: float = 1.0     # Spacing of scan positions along a line
+    line_spacing_m: float = 1.0       # Spacing between sweep lines
+    altitude_m: float = 10.0          # Flight altitude
+    sweep_angle_deg: Optional[float] = None  # Fixed sweep direction (deg from east), None = optimise
+    angle_step_deg: float = 5.0       # Resolution of the sweep angle search
+    turn_cost_m: float = 10.0         # Path length equivalent of one turn at a line end
+    mine_merge_radius_m: float = 0.5  # Detections closer than this are the same mine
+
+
+@dataclass
+class CoveragePlan:
+    """Result of planning a coverage path in local (east, north) metres"""
+    sweep_angle_deg: float
+    regions: int                 # Boustrophedon cells
+    east: np.ndarray             # Scan positions in visiting order
+    north: np.ndarray
+    line: np.ndarray             # Sweep line of each scan position
+    col: np.ndarray              # Position index along its line
+    along_m: np.ndarray          # Coordinates in the sweep frame (for ScanGrid.x_m / y_m)
+    across_m: np.ndarray
+    turns: int
+    length_m: float              # Total flight path length through all scan positions
+
+
+def _rings_to_edges(rings: List[np.ndarray]) -> np.ndarray:
+    """Closed rings of (east, north) points to an (E, 4) array of x1, y1, x2, y2"""
+    edges = []
+    for ring in rings:
+        edges.append(np.hstack([ring, np.roll(ring, -1, axis=0)]))
+    return np.vstack(edges)
+
+
+def _rotate(x, y, angle_rad: float):
+    """Rotate points so the sweep direction lies along +x"""
+    c, s = math.cos(angle_rad), math.sin(angle_rad)
+    return x * c + y * s, -x * s + y * c
+
+
+def _sweep_intersections(edges: np.ndarray, angle_rad: float, spacing_m: float):
+    """
+    Intersect the polygon with sweep lines at the given angle.
+    Returns the line offsets and a (lines, K) array of sorted crossing
+    positions padded with NaN; consecutive pairs bound the covered segments.
+    """
+    x1, y1 = _rotate(edges[:, 0], edges[:, 1], angle_rad)
+    x2, y2 = _rotate(edges[:, 2], edges[:, 3], angle_rad)
+
+    y_min, y_max = min(y1.min(), y2.min()), max(y1.max(), y2.max())
+    count = max(int(math.ceil((y_max - y_min) / spacing_m)), 1)
+    # Lines sit half a spacing inside the extent so each covers a full swath
+    ys = y_min + (np.arange(count) + 0.5) * spacing_m
+    ys = ys[ys < y_max]
+    if ys.size == 0:
+        ys = np.array([(y_min + y_max) / 2])
+
+    # Half-open rule: an edge crosses line y if y lies in [min(y1, y2), max(y1, y2))
+    yy = ys[:, None]
+    lo, hi = np.minimum(y1, y2), np.maximum(y1, y2)
+    crosses = (yy >= lo) & (yy < hi)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        xs = x1 + (yy - y1) * (x2 - x1) / (y2 - y1)
+    xs = np.sort(np.where(crosses, xs, np.nan), axis=1)
+    width = int(crosses.sum(axis=1).max()) if crosses.size else 0
+    return ys, xs[:, :width]
+
+
+def _sweep_cost(edges: np.ndarray, angle_rad: float, spacing_m: float, turn_cost_m: float) -> float:
+    """Path length of covering the polygon at one sweep angle, with turns as extra length"""
+    _, xs = _sweep_intersections(edges, angle_rad, spacing_m)
+    if xs.shape[1] == 0:
+        return math.inf
+    segments = np.count_nonzero(~np.isnan(xs)) // 2
+    length = np.nansum(xs[:, 1::2]) - np.nansum(xs[:, 0::2])
+    return float(length + segments * 2 * turn_cost_m)
+
+
+def best_sweep_angle(outer: np.ndarray, edges: np.ndarray, config: 'AreaConfig') -> float:
+    """Sweep direction in degrees from east: the configured one or the cheapest candidate"""
+    if config.sweep_angle_deg is not None:
+        return config.sweep_angle_deg
+    # Uniform candidates plus every boundary edge direction (usually optimal)
+    candidates = set(np.round(np.arange(0.0, 180.0, config.angle_step_deg), 6))
+    d = np.roll(outer, -1, axis=0) - outer
+    candidates.update(np.round(np.degrees(np.arctan2(d[:, 1], d[:, 0])) % 180.0, 6) % 180.0)
+    return float(min(sorted(candidates),
+                     key=lambda a: _sweep_cost(edges, math.radians(a), config.line_spacing_m,
+                                               config.turn_cost_m)))
+
+
+def _decompose(ys: np.ndarray, xs: np.ndarray) -> List[List[Tuple[int, float, float]]]:
+    """
+    Boustrophedon decomposition on the discretised sweep lines. Segments on
+    consecutive lines belong to the same region while they overlap one to
+    one; a change in connectivity (a split or merge around an obstacle or
+    concavity) closes the regions involved and opens new ones.
+    Returns regions as lists of (line, x_start, x_end).
+    """
+    regions: List[List[Tuple[int, float, float]]] = []
+    prev: List[Tuple[float, float, int]] = []  # (x0, x1, region) on the previous line
+
+    for i in range(ys.size):
+        row = xs[i][~np.isnan(xs[i])]
+        segs = [(float(row[k]), float(row[k + 1])) for k in range(0, row.size - 1, 2)
+                if row[k + 1] - row[k] > 1e-9]
+
+        overlaps = [[j for j, (p0, p1, _) in enumerate(prev) if p0 < x1 and x0 < p1] for x0, x1 in segs]
+        prev_links = [0] * len(prev)
+        for links in overlaps:
+            for j in links:
+                prev_links[j] += 1
+
+        current = []
+        for (x0, x1), links in zip(segs, overlaps):
+            if len(links) == 1 and prev_links[links[0]] == 1:
+                region = prev[links[0]][2]
+            else:
+                region = len(regions)
+                regions.append([])
+            regions[region].append((i, x0, x1))
+            current.append((x0, x1, region))
+        prev = current
+
+    return regions
+
+
+def _line_positions(x0: float, x1: float, cell_m: float) -> np.ndarray:
+    """Scan positions along one segment, one cell apart and half a cell inside its ends"""
+    length = x1 - x0
+    if length <= cell_m:
+        return np.array([(x0 + x1) / 2])
+    # Tolerate projection round-off on segments that are a whole number of cells
+    count = int(math.floor(length / cell_m + 1e-6))
+    margin = (length - (count - 1) * cell_m) / 2
+    return x0 + margin + np.arange(count) * cell_m
+
+
+def _region_variants(region, ys: np.ndarray):
+    """
+    The four ways of flying a region (first or last line first, starting
+    left or right), each as (entry point, exit point, lines, start_left).
+    """
+    variants = []
+    for from_first in (True, False):
+        lines = region if from_first else region[::-1]
+        for start_left in (True, False):
+            i0, a0, b0 = lines[0]
+            entry = (a0 if start_left else b0, ys[i0])
+            # Direction alternates each line
+            ends_left = start_left if len(lines) % 2 == 0 else not start_left
+            i1, a1, b1 = lines[-1]
+            exit_ = (a1 if ends_left else b1, ys[i1])
+            variants.append((entry, exit_, lines, start_left))
+    return variants
+
+
+def _order_regions(variants, start_xy: Tuple[float, float]) -> List[Tuple[int, int]]:
+    """
+    Order regions and choose how to fly each so transit between them is short.
+    Greedy nearest neighbour, then 2-opt on the visiting order with the
+    flying direction of every region re-optimised by dynamic programming.
+    Returns [(region, variant), ...].
+    """
+    n = len(variants)
+    if n == 0:
+        return []
+
+    entries = np.array([[v[0] for v in vs] for vs in variants])  # (n, 4, 2)
+    exits = np.array([[v[1] for v in vs] for vs in variants])
+    # transit[i, a, j, b]: from exit of region i flown as a to entry of region j flown as b
+    transit = np.hypot(exits[:, :, None, None, 0] - entries[None, None, :, :, 0],
+                       exits[:, :, None, None, 1] - entries[None, None, :, :, 1])
+    from_start = np.hypot(entries[:, :, 0] - start_xy[0], entries[:, :, 1] - start_xy[1])
+
+    def best_variants(order):
+        cost = from_start[order[0]].copy()
+        back = []
+        for prev, cur in zip(order, order[1:]):
+            step = cost[:, None] + transit[prev, :, cur, :]
+            back.append(step.argmin(axis=0))
+            cost = step.min(axis=0)
+        choice = [int(cost.argmin())]
+        for b in reversed(back):
+            choice.append(int(b[choice[-1]]))
+        return float(cost.min()), choice[::-1]
+
+    # Greedy nearest neighbour
+    remaining = set(range(n))
+    position = start_xy
+    order = []
+    while remaining:
+        best, best_cost = None, math.inf
+        for r in remaining:
+            for k, (entry, exit_, _, _) in enumerate(variants[r]):
+                d = math.hypot(entry[0] - position[0], entry[1] - position[1])
+                if d < best_cost:
+                    best, best_cost = (r, k), d
+        order.append(best[0])
+        remaining.discard(best[0])
+        position = variants[best[0]][best[1]][1]
+
+    # 2-opt (bounded, the region count is small in practice)
+    cost, choice = best_variants(order)
+    improved, passes = n > 2, 0
+    while improved and passes < 3:
+        improved = False
+        passes += 1
+        for i in range(n - 1):
+            for j in range(i + 2, n + 1):
+                candidate = order[:i] + order[i:j][::-1] + order[j:]
+                c, ch = best_variants(candidate)
+                if c < cost - 1e-6:
+                    order, cost, choice, improved = candidate, c, ch, True
+    return list(zip(order, choice))
+
+
+def plan_coverage(projection: LocalProjection, config: AreaConfig) -> CoveragePlan:
+    """Plan scan positions covering the polygon minus its holes"""
+    outer = np.column_stack(projection.forward_many(*np.asarray(config.polygon, dtype=np.float64).T))
+    rings = [outer] + [np.column_stack(projection.forward_many(*np.asarray(h, dtype=np.float64).T))
+                       for h in config.holes]
+    edges = _rings_to_edges(rings)
+    spacing = config.line_spacing_m
+
+    angle = math.radians(best_sweep_angle(outer, edges, config))
+
+    ys, xs = _sweep_intersections(edges, angle, spacing)
+    regions = _decompose(ys, xs)
+    variants = [_region_variants(r, ys) for r in regions]
+
+    start = config.start or config.polygon[0]
+    start_xy = _rotate(*projection.forward(*start), angle)
+    order = _order_regions(variants, start_xy)
+
+    along, across, lines, cols = [], [], [], []
+    for region, variant in order:
+        _, _, region_lines, left = variants[region][variant]
+        for i, x0, x1 in region_lines:
+            pos = _line_positions(x0, x1, config.scan_cell_size_m)
+            idx = np.arange(pos.size)
+            if not left:
+                pos, idx = pos[::-1], idx[::-1]
+            along.append(pos)
+            across.append(np.full(pos.size, ys[i]))
+            lines.append(np.full(pos.size, i, dtype=np.int32))
+            cols.append(idx.astype(np.int32))
+            left = not left
+
+    if not along:
+        empty = np.zeros(0)
+        return CoveragePlan(math.degrees(angle), 0, empty, empty, empty.astype(np.int32),
+                            empty.astype(np.int32), empty, empty, 0, 0.0)
+
+    along, across = np.concatenate(along), np.concatenate(across)
+    # Back from the sweep frame to east/north
+    east, north = _rotate(along, across, -angle)
+    length = float(np.hypot(np.diff(east), np.diff(north)).sum())
+    line = np.concatenate(lines)
+    turns = int(np.count_nonzero(np.diff(line))) if line.size else 0
+
+    return CoveragePlan(
+        sweep_angle_deg=math.degrees(angle), regions=len(regions),
+        east=east, north=north, line=line, col=np.concatenate(cols),
+        along_m=along - along.min(), across_m=across - across.min(),
+        turns=turns, length_m=length
+    )
+
+
+class AreaCoverageAlgorithm:
+    """
+    Boustrophedon coverage of an arbitrary polygon for mine detection.
+
+    Strategy:
+    1. Project the polygon and its holes onto a local metric plane
+    2. Pick the sweep angle with the shortest path counting turns as extra length
+    3. Split the area into regions that can each be flown as one snake pattern
+    4. Order regions (and their entry corners) to keep transit short
+    5. At each position: hover, capture thermal, run detection
+
+    Exposes the same waypoint interface as CorridorSweepAlgorithm so the
+    attachment mission loop can fly either one.
+    """
+
+    def __init__(self, config: AreaConfig):
+        self.config = config
+        self.state = SweepState.IDLE
+        self.grid: Optional[ScanGrid] = None
+        self.current_cell_idx = 0
+        self._next_idx = 1
+        self._requeued: Deque[int] = deque()
+        self._in_flight: Set[int] = set()
+        self.safe_path: List[Tuple[float, float]] = []
+        self.on_path_update: Optional[Callable[[List[Tuple[float, float]]], None]] = None
+        self.checkpoint = None  # MissionCheckpoint, set when the mission is persisted
+        self.log = logging.getLogger(__name__)
+
+        if len(config.polygon) < 3:
+            raise ValueError("Coverage polygon needs at least 3 vertices")
+
+        # Per-mission projection shared with the drone controller
+        self.projection = LocalProjection(*config.polygon[0])
+        self.detected_mines = MineMap(self.projection, config.mine_merge_radius_m)
+        self.plan: Optional[CoveragePlan] = None
+
+        self._generate_scan_grid()
+
+    def _generate_scan_grid(self):
+        """Plan the coverage path and store its scan positions"""
+        self.plan = plan = plan_coverage(self.projection, self.config)
+        lat, lon = self.projection.inverse_many(plan.east, plan.north)
+        self.grid = ScanGrid(lat, lon, plan.along_m, plan.across_m, line=plan.line, col=plan.col)
+
+        self.log.info(f"Coverage plan: sweep angle {plan.sweep_angle_deg:.1f}°, {plan.regions} regions, "
+                      f"{len(self.grid)} scan cells, {plan.turns} turns, {plan.length_m:.0f}m path")
+        self.state = SweepState.SCANNING
+
+    @property
+    def cells(self) -> ScanGrid:
+        """Scan cells in visiting order (indexable, yields ScanCell views)"""
+        return self.grid
+
+    def get_next_waypoint(self) -> Optional[Tuple[float, float, float]]:
+        """Get next scan position (lat, lon, alt)"""
+        idx = self.current_cell_idx
+        if idx >= len(self.grid):
+            return None
+
+        return (float(self.grid.lat[idx]), float(self.grid.lon[idx]), self.config.altitude_m)
+
+    def record_scan_result(self, mine_detected: bool, confidence: float):
+        """Record detection result for current cell"""
+        idx = self.current_cell_idx
+        if idx >= len(self.grid):
+            return
+
+        self._apply_result(idx, mine_detected, confidence)
+        self._advance()
+        self._check_complete()
+
+    def mark_in_flight(self) -> int:
+        """
+        Move past the current cell before its result is known. Returns the
+        cell index to hand to record_cell_result(), or -1 if none is left.
+        """
+        idx = self.current_cell_idx
+        if idx >= len(self.grid):
+            return -1
+
+        if self.checkpoint is not None:
+            self.checkpoint.append(idx, STATUS_UNSCANNED, 0.0)
+        self._in_flight.add(idx)
+        self._advance()
+        return idx
+
+    def record_cell_result(self, idx: int, mine_detected: bool, confidence: float):
+        """Record the result of a cell left in flight (any order)"""
+        if idx not in self._in_flight:
+            self.log.warning(f"Ignoring result for cell {idx}: not awaiting a result")
+            return
+
+        self._in_flight.discard(idx)
+        self._apply_result(idx, mine_detected, confidence)
+        self._check_complete()
+
+    @property
+    def in_flight(self) -> Set[int]:
+        """Cells flown past whose results have not arrived yet"""
+        return self._in_flight
+
+    def requeue_in_flight(self) -> List[int]:
+        """Fly cells whose results were lost (e.g. in flight at a power cut) again, next"""
+        cells = sorted(self._in_flight)
+        if not cells:
+            return cells
+        self._in_flight.clear()
+        if self.current_cell_idx < len(self.grid):
+            self._requeued.appendleft(self.current_cell_idx)
+        self._requeued.extendleft(reversed(cells))
+        self._advance()
+        return cells
+
+    def _advance(self):
+        """Move to the next cell: requeued cells first, then the planned order"""
+        if self._requeued:
+            self.current_cell_idx = self._requeued.popleft()
+        elif self._next_idx < len(self.grid):
+            self.current_cell_idx = self._next_idx
+            self._next_idx += 1
+        else:
+            self.current_cell_idx = len(self.grid)
+
+    def _apply_result(self, idx: int, mine_detected: bool, confidence: float):
+        """Store one cell's detection result and fold mines into the mine map"""
+        self.grid.mark(idx, mine_detected, confidence)
+        if self.checkpoint is not None:
+            self.checkpoint.append(idx, int(self.grid.status[idx]), confidence)
+
+        if mine_detected:
+            lat, lon = float(self.grid.lat[idx]), float(self.grid.lon[idx])
+            mine, new = self.detected_mines.add(lat, lon, confidence)
+            if new:
+                self.log.warning(f"Mine detected at ({lat:.6f}, {lon:.6f}) with confidence {confidence:.2f}")
+            else:
+                self.log.info(f"Detection merged into mine at ({mine.lat:.6f}, {mine.lon:.6f}), "
+                              f"{mine.detections} detections, fused confidence {mine.fused_confidence:.2f}")
+
+    def _check_complete(self):
+        """Finish once every cell is flown and every result is in"""
+        if self.current_cell_idx >= len(self.grid) and not self._in_flight and self.state != SweepState.COMPLETE:
+            self.state = SweepState.COMPLETE
+            self.log.info(f"Scan complete. Detected {len(self.detected_mines)} mines.")
+
+    def get_safe_path(self) -> List[Tuple[float, float]]:
+        """Area coverage has no start-goal route, so there is no safe path"""
+        return self.safe_path
+
+    def get_progress(self) -> float:
+        """Get scan progress (0.0 - 1.0)"""
+        if len(self.grid) == 0:
+            return 0.0
+        if self.current_cell_idx >= len(self.grid) and not self._in_flight:
+            return 1.0
+        return self.grid.scanned_count() / len(self.grid)
+
+    def get_statistics(self) -> dict:
+        """Get current scan statistics"""
+        return {
+            'total_cells': len(self.grid),
+            'scanned_cells': self.grid.scanned_count(),
+            'clear_cells': self.grid.count(STATUS_CLEAR),
+            'mine_cells': self.grid.count(STATUS_MINE),
+            'mines_detected': len(self.detected_mines),
+            'detections': sum(m.detections for m in self.detected_mines),
+            'regions': self.plan.regions,
+            'sweep_angle_deg': self.plan.sweep_angle_deg,
+            'progress': self.get_progress(),
+            'state': self.state.value
+        }
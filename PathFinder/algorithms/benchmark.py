@@ -0,0 +1,451 @@
+#!/usr/bin/env python3
+"""
+Planner benchmarks.
+
+Usage (from the PathFinder directory):
+    python -m algorithms.benchmark
+    python -m algorithms.benchmark --length 1000 --width 50 --resolution 0.25 --mines 200
+    python -m algorithms.benchmark --replan-lengths 250 500 1000 2000
+    python -m algorithms.benchmark --sweep-mines 0 5 20
+    python -m algorithms.benchmark --coverage-hectares 1 10 50
+    python -m algorithms.benchmark --map-mines 1000 10000 100000
+    python -m algorithms.benchmark --fleet-sizes 1 2 4 8
+    python -m algorithms.benchmark --belief-cells 1000000 4000000
+"""
+
+import argparse
+import logging
+import math
+import random
+import statistics
+import time
+from typing import List
+
+import numpy as np
+
+from navigation.geodesy import LocalProjection
+from .corridor_sweep import CorridorSweepAlgorithm, CorridorConfig
+from .area_coverage import AreaCoverageAlgorithm, AreaConfig
+from .mine_map import MineMap
+from .occupancy import BeliefGrid
+from .partition import Vehicle, partition_corridor, partition_polygon
+from .safe_path import SafePathPlanner, PlannerConfig, astar
+from .path_smoothing import simplify_nodes
+from .dstar_lite import DStarLitePlanner
+
+
+# Corridor start used by all benchmarks (Odense)
+ORIGIN = (55.3676, 10.4316)
+
+
+def _corridor_goal(length_m: float, heading_deg: float = 30.0):
+    """GPS goal length_m metres from ORIGIN along heading_deg"""
+    north = length_m * math.cos(math.radians(heading_deg))
+    east = length_m * math.sin(math.radians(heading_deg))
+    return LocalProjection(*ORIGIN).inverse(east, north)
+
+
+def _random_mines(planner: SafePathPlanner, count: int, width_m: float, rng: random.Random):
+    """Scatter mines over the corridor, leaving the start and goal reachable"""
+    grid = planner.grid
+    placed = []
+    radius = planner.config.mine_circumvention_radius_m
+    while len(placed) < count:
+        u = rng.uniform(radius * 2, grid.length_m - radius * 2)
+        v = rng.uniform(-width_m / 2, width_m / 2)
+        placed.append(grid.to_geo(u, v))
+    return placed
+
+
+def _cell_path_length(grid, nodes) -> float:
+    points = np.array([grid.cell_center(n) for n in nodes])
+    return float(np.hypot(*np.diff(points, axis=0).T).sum())
+
+
+def bench_safe_path(length_m: float, width_m: float, resolution_m: float,
+                    mines: int, repeats: int, seed: int) -> dict:
+    """
+    Time grid construction, mine inflation and A* on one corridor, and the
+    coarse-to-fine search against an A* over the whole fine grid
+    """
+    rng = random.Random(seed)
+    goal = _corridor_goal(length_m)
+    config = PlannerConfig(grid_resolution_m=resolution_m)
+
+    build, inflate, search, lengths = [], [], [], []
+    raw, simplify, raw_m, simple_m = [], [], [], []
+    exact, excess = [], []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        planner = SafePathPlanner(ORIGIN, goal, width_m, config)
+        t1 = time.perf_counter()
+        for lat, lon in _random_mines(planner, mines, width_m, rng):
+            planner.add_mine(lat, lon)
+        t2 = time.perf_counter()
+        path = planner.find_path()
+        t3 = time.perf_counter()
+        build.append(t1 - t0)
+        inflate.append(t2 - t1)
+        search.append(t3 - t2)
+        lengths.append(len(path))
+
+        # Simplification stage on its own, against the raw cell path
+        grid = planner.grid
+        start_node = grid.node_of(*grid.cell_of(*grid.to_local(*ORIGIN)))
+        goal_node = grid.node_of(*grid.cell_of(*grid.to_local(*goal)))
+        nodes = astar(grid, start_node, goal_node, True, config.coarse_factor, config.coarse_band_cells)
+        t4 = time.perf_counter()
+        points = simplify_nodes(grid, nodes, config.simplify_tolerance_m)
+        t5 = time.perf_counter()
+        optimal = astar(grid, start_node, goal_node)
+        t6 = time.perf_counter()
+        if nodes:
+            raw.append(len(nodes))
+            simplify.append(t5 - t4)
+            raw_m.append(_cell_path_length(grid, nodes))
+            simple_m.append(float(np.hypot(*np.diff(points, axis=0).T).sum()))
+            exact.append(t6 - t5)
+            excess.append(raw_m[-1] - _cell_path_length(grid, optimal))
+
+    cells = planner.grid.nx * planner.grid.ny
+    return {
+        'cells': cells,
+        'build_ms': statistics.median(build) * 1000,
+        'inflate_ms': statistics.median(inflate) * 1000,
+        'search_ms': statistics.median(search) * 1000,
+        'total_ms': statistics.median(b + i + s for b, i, s in zip(build, inflate, search)) * 1000,
+        'waypoints': statistics.median(lengths),
+        'raw_waypoints': statistics.median(raw) if raw else 0,
+        'simplify_ms': statistics.median(simplify) * 1000 if simplify else 0.0,
+        'raw_length_m': statistics.median(raw_m) if raw_m else 0.0,
+        'length_m': statistics.median(simple_m) if simple_m else 0.0,
+        'exact_ms': statistics.median(exact) * 1000 if exact else 0.0,
+        'excess_m': max(excess) if excess else 0.0,
+    }
+
+
+def bench_replanning(length_m: float, width_m: float, resolution_m: float,
+                     mines: int, seed: int) -> dict:
+    """
+    Per-detection cost of D* Lite repair versus a full A* search. Mines are
+    reported in along-track order, as a drone flying the corridor finds
+    them, and the replanner's start follows each reading.
+    """
+    rng = random.Random(seed)
+    goal = _corridor_goal(length_m)
+    config = PlannerConfig(grid_resolution_m=resolution_m)
+
+    t0 = time.perf_counter()
+    replanner = DStarLitePlanner(ORIGIN, goal, width_m, config)
+    init = time.perf_counter() - t0
+    full = SafePathPlanner(ORIGIN, goal, width_m, config)
+
+    detections = sorted(_random_mines(full, mines, width_m, rng), key=lambda m: full.grid.to_local(*m)[0])
+    repair, extract, search = [], [], []
+    for lat, lon in detections:
+        t0 = time.perf_counter()
+        replanner.move_start(lat, lon)
+        replanner.add_mine(lat, lon)
+        t1 = time.perf_counter()
+        replanner.find_path()
+        t2 = time.perf_counter()
+        full.add_mine(lat, lon)
+        full.find_path()
+        t3 = time.perf_counter()
+        repair.append(t1 - t0)
+        extract.append(t2 - t1)
+        search.append(t3 - t2)
+
+    # Deferred repairs behind the last reading are paid once, for the final path
+    t0 = time.perf_counter()
+    replanner.move_start(*ORIGIN)
+    replanner.find_path()
+    final = time.perf_counter() - t0
+
+    return {
+        'init_ms': init * 1000,
+        'repair_p50_ms': statistics.median(repair) * 1000,
+        'repair_mean_ms': statistics.mean(repair) * 1000,
+        'path_p50_ms': statistics.median(extract) * 1000,
+        'final_ms': final * 1000,
+        'full_p50_ms': statistics.median(search) * 1000,
+        'full_mean_ms': statistics.mean(search) * 1000,
+    }
+
+
+def _simulate_sweep(config: CorridorConfig, mines_xy: np.ndarray,
+                    speed_ms: float, hover_s: float) -> dict:
+    """
+    Fly a sweep against known mine positions (x_m, y_m). A cell reads positive
+    when a mine lies inside its footprint; coarse-pass cells see the whole
+    coarse_factor x coarse_factor block around them.
+    """
+    algorithm = CorridorSweepAlgorithm(config)
+    grid = algorithm.grid
+    step = config.coarse_factor if config.adaptive else 1
+    half_x = config.scan_cell_size_m / 2
+    half_y = algorithm._line_spacing_m / 2 if config.num_lines > 1 else config.corridor_width_m / 2
+
+    distance, visited = 0.0, 0
+    prev = None
+    while True:
+        idx = algorithm.current_cell_idx
+        if algorithm.get_next_waypoint() is None:
+            break
+        x, y = float(grid.x_m[idx]), float(grid.y_m[idx])
+        if prev is not None:
+            distance += math.hypot(x - prev[0], y - prev[1])
+        prev = (x, y)
+        visited += 1
+
+        scale = step if idx < algorithm._base_cells else 1
+        hit = bool(mines_xy.size) and bool(np.any(
+            (np.abs(mines_xy[:, 0] - x) <= half_x * scale) &
+            (np.abs(mines_xy[:, 1] - y) <= half_y * scale)))
+        # Coarse hits are ambiguous (the block is only narrowed down by refinement)
+        algorithm.record_scan_result(hit and scale == 1, 0.5 if hit else 0.05)
+        grid = algorithm.grid
+
+    hectares = algorithm.frame.length_m * config.corridor_width_m / 10000
+    flight_s = distance / speed_ms + visited * hover_s
+    return {
+        'cells': visited,
+        'distance_m': distance,
+        'mines_found': len(algorithm.detected_mines),
+        'min_per_ha': flight_s / 60 / hectares,
+    }
+
+
+def bench_adaptive(length_m: float, width_m: float, num_lines: int, mines: int,
+                   speed_ms: float, hover_s: float, seed: int) -> dict:
+    """Full-resolution sweep versus adaptive coarse-then-refine sweep"""
+    rng = np.random.default_rng(seed)
+    mines_xy = np.column_stack([rng.uniform(0, length_m, mines), rng.uniform(0, width_m, mines)])
+    goal = _corridor_goal(length_m)
+    results = {}
+    for adaptive in (False, True):
+        config = CorridorConfig(start=ORIGIN, goal=goal, corridor_width_m=width_m,
+                                num_lines=num_lines, adaptive=adaptive)
+        results['adaptive' if adaptive else 'full'] = _simulate_sweep(config, mines_xy, speed_ms, hover_s)
+    return results
+
+
+def _test_area(hectares: float, heading_deg: float = 20.0):
+    """Rotated U-shaped polygon of the given area with a small hole, as GPS rings"""
+    # U shape on a 4 x 3 unit box with a 2 x 2 notch: 8 square units
+    unit = math.sqrt(hectares * 10000 / 8)
+    outer = [(0, 0), (4, 0), (4, 3), (3, 3), (3, 1), (1, 1), (1, 3), (0, 3)]
+    hole = [(1.8, 0.3), (2.2, 0.3), (2.2, 0.6), (1.8, 0.6)]
+    a = math.radians(heading_deg)
+    projection = LocalProjection(*ORIGIN)
+
+    def ring(points):
+        return [projection.inverse((x * math.cos(a) - y * math.sin(a)) * unit,
+                                   (x * math.sin(a) + y * math.cos(a)) * unit) for x, y in points]
+    return ring(outer), ring(hole)
+
+
+def bench_coverage(hectares: float, repeats: int) -> dict:
+    """Time polygon coverage planning (angle search, decomposition, ordering)"""
+    outer, hole = _test_area(hectares)
+    times = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        algorithm = AreaCoverageAlgorithm(AreaConfig(polygon=outer, holes=[hole]))
+        times.append(time.perf_counter() - t0)
+
+    plan = algorithm.plan
+    fixed = AreaCoverageAlgorithm(AreaConfig(polygon=outer, holes=[hole], sweep_angle_deg=0.0)).plan
+    return {
+        'plan_ms': statistics.median(times) * 1000,
+        'cells': len(algorithm.grid),
+        'angle_deg': plan.sweep_angle_deg,
+        'regions': plan.regions,
+        'turns': plan.turns,
+        'length_m': plan.length_m,
+        'east_turns': fixed.turns,
+        'east_length_m': fixed.length_m,
+    }
+
+
+def bench_mine_map(mines: int, queries: int, seed: int) -> dict:
+    """Mine map insert/query cost against a linear scan over all mines"""
+    rng = random.Random(seed)
+    projection = LocalProjection(*ORIGIN)
+    positions = [projection.inverse(rng.uniform(0, 2000), rng.uniform(0, 500)) for _ in range(mines)]
+    # Every detection is seen twice a few centimetres apart
+    detections = [(lat + rng.gauss(0, 2e-7), lon + rng.gauss(0, 2e-7))
+                  for lat, lon in positions for _ in range(2)]
+    probes = [projection.inverse(rng.uniform(0, 2000), rng.uniform(0, 500)) for _ in range(queries)]
+
+    mine_map = MineMap(projection)
+    t0 = time.perf_counter()
+    for lat, lon in detections:
+        mine_map.add(lat, lon, 0.8)
+    t1 = time.perf_counter()
+    for lat, lon in probes:
+        mine_map.within(lat, lon, 5.0)
+    t2 = time.perf_counter()
+    for lat, lon in probes:
+        mine_map.nearest(lat, lon)
+    t3 = time.perf_counter()
+    for lat, lon in probes:
+        min(projection.distance_m(lat, lon, m_lat, m_lon) for m_lat, m_lon in positions)
+    t4 = time.perf_counter()
+
+    return {
+        'mines': len(mine_map),
+        'add_us': (t1 - t0) / len(detections) * 1e6,
+        'within_us': (t2 - t1) / queries * 1e6,
+        'nearest_us': (t3 - t2) / queries * 1e6,
+        'linear_us': (t4 - t3) / queries * 1e6,
+    }
+
+
+def bench_belief(cells: int, readings: int, seed: int) -> dict:
+    """Belief map update and classification cost on a square map of about `cells` cells"""
+    rng = np.random.default_rng(seed)
+    side = int(math.sqrt(cells))
+    belief = BeliefGrid(0.0, 0.0, side, side, 0.5)
+    extent = (side - 1) * 0.5
+    u = rng.uniform(0, extent, readings)
+    v = rng.uniform(0, extent, readings)
+    p = rng.uniform(0.02, 0.98, readings)
+
+    t0 = time.perf_counter()
+    for k in range(readings):
+        belief.observe(u[k], v[k], p[k], 1.0)
+    t1 = time.perf_counter()
+    for k in range(readings):
+        belief.classify_at(u[k], v[k])
+    t2 = time.perf_counter()
+    belief.classify()
+    t3 = time.perf_counter()
+    belief.observe_many(u, v, p, 1.0)
+    t4 = time.perf_counter()
+
+    return {
+        'cells': side * side,
+        'mb': belief.nbytes() / 1e6,
+        'observe_us': (t1 - t0) / readings * 1e6,
+        'classify_at_us': (t2 - t1) / readings * 1e6,
+        'classify_ms': (t3 - t2) * 1e3,
+        'batch_us': (t4 - t3) / readings * 1e6,
+    }
+
+
+def bench_partition(sizes, seed: int) -> List[dict]:
+    """Makespan of corridor and polygon missions split across 1..N drones launched near the start"""
+    rng = random.Random(seed)
+    projection = LocalProjection(*ORIGIN)
+    corridor = CorridorConfig(start=ORIGIN, goal=_corridor_goal(2000), corridor_width_m=4, num_lines=5)
+    outer, hole = _test_area(10)
+    area = AreaConfig(polygon=outer, holes=[hole])
+
+    rows = []
+    for n in sizes:
+        vehicles = [Vehicle(f"drone-{k}", projection.inverse(rng.uniform(-50, 0), rng.uniform(-50, 0)))
+                    for k in range(n)]
+        row = {'drones': n}
+        for name, partition, config in (('corridor', partition_corridor, corridor),
+                                        ('area', partition_polygon, area)):
+            t0 = time.perf_counter()
+            assignments = partition(config, vehicles)
+            row[f'{name}_ms'] = (time.perf_counter() - t0) * 1000
+            row[f'{name}_makespan_min'] = max(a.estimated_time_s for a in assignments) / 60
+        rows.append(row)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MineFinder planner benchmarks")
+    parser.add_argument('--length', type=float, default=1000.0, help="Corridor length (m)")
+    parser.add_argument('--width', type=float, default=50.0, help="Corridor width (m)")
+    parser.add_argument('--resolution', type=float, default=0.25, help="Grid resolution (m)")
+    parser.add_argument('--mines', type=int, nargs='*', default=[0, 50, 200], help="Mine counts to test")
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--replan-lengths', type=float, nargs='*', default=[250, 500, 1000, 2000],
+                        help="Corridor lengths (m) for the D* Lite replanning benchmark")
+    parser.add_argument('--replan-mines', type=int, default=40, help="Detections per replanning run")
+    parser.add_argument('--sweep-length', type=float, default=200.0, help="Corridor length (m) for the sweep benchmark")
+    parser.add_argument('--sweep-width', type=float, default=10.0, help="Corridor width (m) for the sweep benchmark")
+    parser.add_argument('--sweep-mines', type=int, nargs='*', default=[0, 5, 20],
+                        help="Mine counts for the full vs adaptive sweep benchmark")
+    parser.add_argument('--coverage-hectares', type=float, nargs='*', default=[1, 10, 50],
+                        help="Polygon areas (ha) for the coverage planning benchmark")
+    parser.add_argument('--map-mines', type=int, nargs='*', default=[1000, 10000],
+                        help="Mine counts for the mine map benchmark")
+    parser.add_argument('--fleet-sizes', type=int, nargs='*', default=[1, 2, 4, 8],
+                        help="Drone counts for the partitioning benchmark")
+    parser.add_argument('--belief-cells', type=int, nargs='*', default=[10**6],
+                        help="Belief map sizes (cells) to test")
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.ERROR)
+
+    if args.mines:
+        print(f"Safe path: {args.length:.0f} m x {args.width:.0f} m corridor at {args.resolution} m")
+    for count in args.mines:
+        r = bench_safe_path(args.length, args.width, args.resolution, count, args.repeats, args.seed)
+        print(f"  mines={count:4d}  cells={r['cells']:,}  build={r['build_ms']:.1f} ms  "
+              f"inflate={r['inflate_ms']:.1f} ms  search={r['search_ms']:.1f} ms  "
+              f"total={r['total_ms']:.1f} ms  waypoints={r['waypoints']:.0f} (raw {r['raw_waypoints']:.0f}, "
+              f"simplify={r['simplify_ms']:.1f} ms)  length={r['length_m']:.0f} m (raw {r['raw_length_m']:.0f} m)")
+        print(f"             full-grid A*={r['exact_ms']:.1f} ms  coarse-to-fine path longer by "
+              f"at most {r['excess_m']:.2f} m")
+
+    if args.replan_lengths:
+        print(f"Replanning: {args.replan_mines} detections, {args.width:.0f} m wide at 0.5 m")
+    for length in args.replan_lengths:
+        r = bench_replanning(length, args.width, 0.5, args.replan_mines, args.seed)
+        print(f"  length={length:5.0f} m  init={r['init_ms']:.1f} ms  "
+              f"D* Lite repair p50={r['repair_p50_ms']:.2f} ms mean={r['repair_mean_ms']:.2f} ms  "
+              f"path p50={r['path_p50_ms']:.1f} ms  final={r['final_ms']:.1f} ms  "
+              f"full A* p50={r['full_p50_ms']:.1f} ms mean={r['full_mean_ms']:.1f} ms")
+
+    if args.sweep_mines:
+        num_lines = int(args.sweep_width) + 1
+        print(f"Sweep: {args.sweep_length:.0f} m x {args.sweep_width:.0f} m, {num_lines} lines, "
+              f"5 m/s, 2 s hover per cell")
+    for count in args.sweep_mines:
+        r = bench_adaptive(args.sweep_length, args.sweep_width, num_lines, count, 5.0, 2.0, args.seed)
+        for mode in ('full', 'adaptive'):
+            m = r[mode]
+            print(f"  mines={count:3d}  {mode:8s}  cells={m['cells']:5d}  distance={m['distance_m']:7.0f} m  "
+                  f"found={m['mines_found']:3d}  {m['min_per_ha']:.0f} min/ha")
+
+    if args.coverage_hectares:
+        print("Coverage: U-shaped polygon with a hole, 1 m lines (east-west sweep for reference)")
+    for hectares in args.coverage_hectares:
+        r = bench_coverage(hectares, args.repeats)
+        print(f"  area={hectares:5.1f} ha  plan={r['plan_ms']:.0f} ms  cells={r['cells']:,}  "
+              f"angle={r['angle_deg']:.0f}°  regions={r['regions']}  turns={r['turns']} ({r['east_turns']})  "
+              f"path={r['length_m'] / 1000:.1f} km ({r['east_length_m'] / 1000:.1f} km)")
+
+    if args.map_mines:
+        print("Mine map: 2 detections per mine over 2000 m x 500 m")
+    for count in args.map_mines:
+        r = bench_mine_map(count, 200, args.seed)
+        print(f"  mines={r['mines']:6d}  add={r['add_us']:.1f} us  within 5 m={r['within_us']:.1f} us  "
+              f"nearest={r['nearest_us']:.1f} us  linear nearest={r['linear_us']:.0f} us")
+
+    if args.fleet_sizes:
+        print("Partitioning: 2 km x 4 m corridor (5 lines) and 10 ha polygon, launches near the start")
+        rows = bench_partition(args.fleet_sizes, args.seed)
+        for r in rows:
+            print(f"  drones={r['drones']}  corridor {r['corridor_makespan_min']:.0f} min "
+                  f"(x{rows[0]['corridor_makespan_min'] / r['corridor_makespan_min']:.2f}, "
+                  f"{r['corridor_ms']:.0f} ms)  area {r['area_makespan_min']:.0f} min "
+                  f"(x{rows[0]['area_makespan_min'] / r['area_makespan_min']:.2f}, {r['area_ms']:.0f} ms)")
+
+    if args.belief_cells:
+        print("Belief map: 0.5 m cells, 1 m footprint, 20000 readings")
+    for cells in args.belief_cells:
+        r = bench_belief(cells, 20000, args.seed)
+        print(f"  cells={r['cells']:,} ({r['mb']:.0f} MB)  observe={r['observe_us']:.1f} us  "
+              f"classify_at={r['classify_at_us']:.1f} us  classify all={r['classify_ms']:.1f} ms  "
+              f"batched={r['batch_us']:.2f} us/reading")
+
+
+if __name__ == '__main__':
+    main()
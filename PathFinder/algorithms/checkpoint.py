@@ -0,0 +1,169 @@
+"""Append-only mission checkpoints for resuming a sweep"""
+
+import os
+import json
+import struct
+import logging
+import dataclasses
+from typing import Optional, Union
+
+import numpy as np
+
+from .scan_grid import STATUS_UNSCANNED, STATUS_MINE
+from .corridor_sweep import CorridorSweepAlgorithm, CorridorConfig
+from .area_coverage import AreaCoverageAlgorithm, AreaConfig
+
+
+# results.bin: fixed header followed by one packed record per scan result
+MAGIC = b'MFCK'
+VERSION = 1
+HEADER = struct.Struct('<4sHH')  # magic, version, record size
+RECORD_DTYPE = np.dtype([('cell', '<u4'), ('status', 'u1'), ('confidence', '<f4')])
+_RECORD = struct.Struct('<IBf')
+# Status of the marker written when cells left in flight are queued for rescanning
+REQUEUED = 0xFF
+
+SweepAlgorithm = Union[CorridorSweepAlgorithm, AreaCoverageAlgorithm]
+
+
+class MissionCheckpoint:
+    """
+    Checkpoint of one mission on disk.
+
+    mission.json holds the mission configuration; results.bin is an
+    append-only log of (cell, status, confidence) records, 9 bytes each,
+    written and flushed after every scan result. Cells flown past before
+    their result arrived are logged with the unscanned status, so batched
+    and out-of-order results replay in the order they happened. The grid
+    is rebuilt from the configuration and the log replayed, so the index,
+    refined cells, mine map and safe path come back exactly as they were.
+    A record torn by a power cut is ignored; cells whose results never
+    arrived are flown again.
+    """
+
+    def __init__(self, directory: str, mission_id: str):
+        self.mission_id = mission_id
+        self.path = os.path.join(directory, mission_id)
+        self.config_path = os.path.join(self.path, 'mission.json')
+        self.results_path = os.path.join(self.path, 'results.bin')
+        self.log = logging.getLogger(__name__)
+        self._file = None
+
+    def exists(self) -> bool:
+        return os.path.exists(self.config_path) and os.path.exists(self.results_path)
+
+    def create(self, algorithm: SweepAlgorithm):
+        """Start a new checkpoint for a fresh mission (replaces any old one)"""
+        os.makedirs(self.path, exist_ok=True)
+        kind = 'area' if isinstance(algorithm, AreaCoverageAlgorithm) else 'corridor'
+        meta = {
+            'mission_id': self.mission_id,
+            'kind': kind,
+            'config': dataclasses.asdict(algorithm.config),
+            'cells': len(algorithm.grid),
+        }
+        tmp = self.config_path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(meta, f)
+        os.replace(tmp, self.config_path)
+
+        self.close()
+        self._file = open(self.results_path, 'wb')
+        self._file.write(HEADER.pack(MAGIC, VERSION, RECORD_DTYPE.itemsize))
+        self._sync()
+        algorithm.checkpoint = self
+
+    def append(self, cell: int, status: int, confidence: float):
+        """Persist one scan result"""
+        if self._file is None:
+            return
+        self._file.write(_RECORD.pack(cell, status, confidence))
+        self._sync()
+
+    def _sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def read_results(self) -> np.ndarray:
+        """All complete records as a structured array (memory-mapped)"""
+        size = os.path.getsize(self.results_path)
+        with open(self.results_path, 'rb') as f:
+            magic, version, record_size = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC or version != VERSION or record_size != RECORD_DTYPE.itemsize:
+            raise ValueError(f"Unsupported checkpoint format in {self.results_path}")
+
+        count = (size - HEADER.size) // RECORD_DTYPE.itemsize
+        if count == 0:
+            return np.zeros(0, dtype=RECORD_DTYPE)
+        return np.memmap(self.results_path, dtype=RECORD_DTYPE, mode='r',
+                         offset=HEADER.size, shape=(count,))
+
+    def load(self) -> SweepAlgorithm:
+        """Rebuild the mission algorithm and replay its results; appends continue the log"""
+        with open(self.config_path) as f:
+            meta = json.load(f)
+
+        config = meta['config']
+        if meta['kind'] == 'area':
+            config['polygon'] = [tuple(p) for p in config['polygon']]
+            config['holes'] = [[tuple(p) for p in hole] for hole in config['holes']]
+            if config.get('start') is not None:
+                config['start'] = tuple(config['start'])
+            algorithm = AreaCoverageAlgorithm(AreaConfig(**config))
+        else:
+            config['start'] = tuple(config['start'])
+            config['goal'] = tuple(config['goal'])
+            algorithm = CorridorSweepAlgorithm(CorridorConfig(**config))
+
+        records = self.read_results()
+        for record in records:
+            cell, status = int(record['cell']), int(record['status'])
+            if status == REQUEUED:
+                algorithm.requeue_in_flight()
+                continue
+            if cell in algorithm.in_flight and status != STATUS_UNSCANNED:
+                algorithm.record_cell_result(cell, status == STATUS_MINE, float(record['confidence']))
+                continue
+            if cell != algorithm.current_cell_idx:
+                raise ValueError(f"Checkpoint record for cell {cell} does not match "
+                                 f"replayed cell {algorithm.current_cell_idx}")
+            if status == STATUS_UNSCANNED:
+                algorithm.mark_in_flight()
+            else:
+                algorithm.record_scan_result(status == STATUS_MINE, float(record['confidence']))
+        replayed = len(records)
+        del records
+
+        # Drop a torn trailing record before appending again
+        self.close()
+        self._file = open(self.results_path, 'r+b')
+        self._file.truncate(HEADER.size + replayed * RECORD_DTYPE.itemsize)
+        self._file.seek(0, os.SEEK_END)
+        algorithm.checkpoint = self
+
+        # Results lost in flight: rescan those cells next
+        lost = algorithm.requeue_in_flight()
+        if lost:
+            self.append(0, REQUEUED, 0.0)
+            self.log.info(f"Rescanning {len(lost)} cells whose results were in flight")
+
+        self.log.info(f"Resumed mission {self.mission_id}: {replayed} results replayed, "
+                      f"continuing at cell {algorithm.current_cell_idx}/{len(algorithm.grid)}")
+        return algorithm
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    @staticmethod
+    def latest(directory: str) -> Optional[str]:
+        """Mission id of the most recently written checkpoint in directory"""
+        if not os.path.isdir(directory):
+            return None
+        candidates = []
+        for name in os.listdir(directory):
+            results = os.path.join(directory, name, 'results.bin')
+            if os.path.exists(results):
+                candidates.append((os.path.getmtime(results), name))
+        return max(candidates)[1] if candidates else None
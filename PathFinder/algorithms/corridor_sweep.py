@@ -1,11 +1,23 @@
 """Corridor sweep scanning algorithm"""
 
-import math
 import logging
 from dataclasses import dataclass
-from typing import List, Tuple, Optional, Set
+from collections import deque
+from typing import List, Tuple, Optional, Callable, Deque, Set
 from enum import Enum
 
+import numpy as np
+
+from navigation.geodesy import LocalProjection, CorridorFrame
+from .scan_grid import ScanGrid, ScanCell, STATUS_UNSCANNED, STATUS_CLEAR, STATUS_MINE, STATUS_UNCERTAIN
+from .safe_path import SafePathPlanner, PlannerConfig, OccupancyGrid
+from .dstar_lite import DStarLitePlanner
+from .mine_map import MineMap
+from .occupancy import BeliefGrid, detection_probability
+
+# ScanCell is re-exported: it lived here before the scan grid moved to scan_grid.py
+__all__ = ['SweepState', 'CorridorConfig', 'CorridorSweepAlgorithm', 'ScanCell']
+
 
 class SweepState(Enum):
     """States of the scanning process"""
@@ -16,18 +28,6 @@ class SweepState(Enum):
     COMPLETE = "complete"
 
 
-@dataclass
-class ScanCell:
-    """Individual scan cell in the grid"""
-    x_m: float
-    y_m: float
-    lat: float
-    lon: float
-    scanned: bool = False
-    result: Optional[str] = None  # 'clear' | 'mine'
-    confidence: float = 0.0
-
-
 @dataclass
 class CorridorConfig:
     """Configuration for corridor sweep"""
@@ -38,6 +38,18 @@ class CorridorConfig:
     num_lines: int = 3            # Number of parallel scan lines
     altitude_m: float = 10.0      # Flight altitude
     expansion_margin_m: float = 2.0  # How far to expand if mine found
+    mine_circumvention_radius_m: float = 2.0  # Keep-out radius for safe path
+    mine_merge_radius_m: float = 0.5  # Detections closer than this are the same mine
+    path_resolution_m: float = 0.5   # Occupancy grid resolution for safe path
+    smooth_path: bool = False        # Spline-smooth the simplified safe path
+    adaptive: bool = False           # Coarse pass first, refine only around hits
+    coarse_factor: int = 3           # Coarse pass keeps every Nth line and cell
+    refine_confidence: float = 0.3   # Readings at or above this are refined even if clear
+    coarse_altitude_m: Optional[float] = None  # Coarse pass altitude for a wider footprint (None = altitude_m)
+    footprint_m: Optional[float] = None  # Detector footprint side at altitude_m (None = scan_cell_size_m)
+    mine_probability: float = 0.7    # Fused probability at or above which a cell is a mine
+    clear_probability: float = 0.3   # Fused probability at or below which a cell is clear
+    risk_weight: float = 4.0         # Path cost per unit mine probability on uncertain ground
 
 
 class CorridorSweepAlgorithm:
@@ -48,175 +60,411 @@ class CorridorSweepAlgorithm:
     1. Generate scan grid covering corridor from A to B
     2. Fly snake pattern (forward, shift, backward, shift, forward...)
     3. At each cell: hover, capture thermal, run detection
-    4. If mine found: mark cell, optionally expand scan area
-    5. After complete sweep: calculate safe path using A*
+    4. If mine found: mark cell, repair safe path (D* Lite), optionally expand scan area
+    5. After complete sweep: publish final safe path
+    
+    In adaptive mode the snake pattern only visits every coarse_factor-th
+    line and cell. Positive or ambiguous readings queue the full-resolution
+    cells around them (plus expansion_margin_m), which are flown next
+    (EXPANDING) before the coarse pass resumes.
+    
+    Every reading is also fused into a log-odds belief map aligned with the
+    planning grid. Cells whose fused probability ends up between the clear
+    and mine thresholds are marked uncertain and made proportionally more
+    expensive for the safe path instead of being treated as clear.
+    
+    With batched or pipelined inference the mission loop moves past a cell
+    with mark_in_flight() and hands its result back later through
+    record_cell_result(); results may arrive in any order.
     """
     
     def __init__(self, config: CorridorConfig):
         self.config = config
         self.state = SweepState.IDLE
-        self.cells: List[ScanCell] = []
+        self.grid: Optional[ScanGrid] = None
         self.current_cell_idx = 0
-        self.detected_mines: Set[Tuple[float, float]] = set()
+        self._base_cells = 0
+        self._next_base_idx = 1
+        self._pending: Deque[int] = deque()
+        self._in_flight: Set[int] = set()
         self.safe_path: List[Tuple[float, float]] = []
+        self.replanner: Optional[DStarLitePlanner] = None
+        self.on_path_update: Optional[Callable[[List[Tuple[float, float]]], None]] = None
+        self.checkpoint = None  # MissionCheckpoint, set when the mission is persisted
         self.log = logging.getLogger(__name__)
         
+        # Per-mission projection shared by the scan grid and the planners
+        self.projection = LocalProjection(*config.start)
+        self.frame = CorridorFrame(config.start, config.goal, self.projection)
+        self.detected_mines = MineMap(self.projection, config.mine_merge_radius_m)
+        
         self._generate_scan_grid()
+        self._init_replanner()
+        self._init_belief()
     
     def _generate_scan_grid(self):
         """Generate scan cells covering the corridor"""
-        start = self.config.start
-        goal = self.config.goal
-        
-        # Calculate corridor direction vector
-        dx = goal[1] - start[1]  # lon difference
-        dy = goal[0] - start[0]  # lat difference
-        length_deg = math.sqrt(dx*dx + dy*dy)
-        
-        # Approximate conversion (varies by latitude)
-        meters_per_deg_lat = 111320
-        meters_per_deg_lon = 111320 * math.cos(math.radians(start[0]))
-        
-        length_m = math.sqrt(
-            (dy * meters_per_deg_lat)**2 + 
-            (dx * meters_per_deg_lon)**2
-        )
-        
-        # Unit direction vector
-        if length_m > 0:
-            dir_x = dx / length_deg
-            dir_y = dy / length_deg
-        else:
-            dir_x, dir_y = 1, 0
-        
-        # Perpendicular vector (for corridor width)
-        perp_x = -dir_y
-        perp_y = dir_x
-        
-        # Generate grid
-        cell_size_deg_lat = self.config.scan_cell_size_m / meters_per_deg_lat
-        cell_size_deg_lon = self.config.scan_cell_size_m / meters_per_deg_lon
+        length_m = self.frame.length_m
         
         num_cells_length = int(length_m / self.config.scan_cell_size_m) + 1
+        num_lines = self.config.num_lines
         
-        line_spacing_m = self.config.corridor_width_m / (self.config.num_lines - 1) if self.config.num_lines > 1 else 0
+        self._num_cols = num_cells_length
+        self._line_spacing_m = self.config.corridor_width_m / (num_lines - 1) if num_lines > 1 else 0
         
-        self.log.info(f"Generating scan grid: {self.config.num_lines} lines × {num_cells_length} cells")
+        self.log.info(f"Generating scan grid: {num_lines} lines × {num_cells_length} cells")
         self.log.info(f"Corridor: {length_m:.1f}m long, {self.config.corridor_width_m:.1f}m wide")
         
-        for line_idx in range(self.config.num_lines):
-            # Offset from center line
-            offset_m = (line_idx - (self.config.num_lines - 1) / 2) * line_spacing_m
-            offset_deg_lat = offset_m * perp_y / meters_per_deg_lat
-            offset_deg_lon = offset_m * perp_x / meters_per_deg_lon
-            
-            cells_in_line = []
-            for i in range(num_cells_length):
-                progress = i / max(num_cells_length - 1, 1)
-                
-                lat = start[0] + dy * progress + offset_deg_lat
-                lon = start[1] + dx * progress + offset_deg_lon
-                
-                x_m = i * self.config.scan_cell_size_m
-                y_m = offset_m + self.config.corridor_width_m / 2
-                
-                cells_in_line.append(ScanCell(
-                    x_m=x_m,
-                    y_m=y_m,
-                    lat=lat,
-                    lon=lon
-                ))
-            
-            # Snake pattern: alternate direction for each line
-            if line_idx % 2 == 1:
-                cells_in_line.reverse()
-            
-            self.cells.extend(cells_in_line)
+        # Full-resolution lattice: index of each (line, col) cell in the grid, -1 if not queued
+        step = max(int(self.config.coarse_factor), 1) if self.config.adaptive else 1
+        self._lattice_idx = np.full((num_lines, num_cells_length), -1, dtype=np.int32)
+        base_lines = self._lattice_subset(num_lines, step)
+        base_cols = self._lattice_subset(num_cells_length, step)
+        
+        # Lattice indices in visiting order; odd lines are reversed (snake pattern)
+        line = np.repeat(base_lines[:, None], base_cols.size, axis=1)
+        col = np.tile(base_cols, (base_lines.size, 1))
+        col[1::2] = col[1::2, ::-1]
+        line, col = line.ravel(), col.ravel()
         
-        self.log.info(f"Generated {len(self.cells)} scan cells")
+        self.grid = ScanGrid(*self._lattice_positions(line, col), line=line, col=col)
+        self._lattice_idx[line, col] = np.arange(len(self.grid))
+        self._base_cells = len(self.grid)
+        
+        if step > 1:
+            self.log.info(f"Adaptive sweep: coarse pass of {len(self.grid)} cells "
+                          f"({base_lines.size} lines, every {step}th cell)")
+        self.log.info(f"Generated {len(self.grid)} scan cells ({self.grid.nbytes() / 1e6:.1f} MB)")
         self.state = SweepState.SCANNING
     
+    @staticmethod
+    def _lattice_subset(n: int, step: int) -> np.ndarray:
+        """Every step-th index of range(n), always including the last one"""
+        idx = np.arange(0, n, step, dtype=np.int32)
+        if idx[-1] != n - 1:
+            idx = np.append(idx, np.int32(n - 1))
+        return idx
+    
+    def _lattice_local(self, line, col):
+        """Corridor frame (u, v) of full-resolution lattice cells"""
+        # Offset of each line from the center line
+        offset_m = (line - (self.config.num_lines - 1) / 2) * self._line_spacing_m
+        progress = col / max(self._num_cols - 1, 1)
+        return progress * self.frame.length_m, offset_m
+    
+    def _lattice_positions(self, line: np.ndarray, col: np.ndarray):
+        """(lat, lon, x_m, y_m) of full-resolution lattice cells"""
+        u, offset_m = self._lattice_local(line, col)
+        
+        lat, lon = self.frame.to_geo_many(u, offset_m)
+        x_m = col * self.config.scan_cell_size_m
+        y_m = offset_m + self.config.corridor_width_m / 2
+        return lat, lon, x_m, y_m
+    
+    def _planner_config(self) -> PlannerConfig:
+        return PlannerConfig(
+            grid_resolution_m=self.config.path_resolution_m,
+            mine_circumvention_radius_m=self.config.mine_circumvention_radius_m,
+            risk_weight=self.config.risk_weight,
+            smooth_path=self.config.smooth_path
+        )
+    
+    def _init_replanner(self):
+        """Start incremental safe path planning (unscanned ground assumed passable)"""
+        try:
+            self.replanner = DStarLitePlanner(
+                self.config.start,
+                self.config.goal,
+                self.config.corridor_width_m,
+                self._planner_config(),
+                frame=self.frame
+            )
+            self.safe_path = self.replanner.find_path()
+        except Exception as e:
+            self.log.error(f"Failed to initialise replanner: {e}")
+            self.replanner = None
+    
+    def _init_belief(self):
+        """Belief map on the same cells as the planning grid"""
+        if self.replanner is not None:
+            geometry = self.replanner.grid
+        else:
+            geometry = OccupancyGrid(self.frame, self.config.corridor_width_m,
+                                     resolution_m=self.config.path_resolution_m)
+        self.belief = BeliefGrid.like(
+            geometry,
+            mine_threshold=self.config.mine_probability,
+            clear_threshold=self.config.clear_probability
+        )
+    
+    def _footprint_m(self, idx: int) -> float:
+        """Detector footprint side for a cell; scales with flight altitude"""
+        footprint = self.config.footprint_m or self.config.scan_cell_size_m
+        if self.config.adaptive and idx < self._base_cells and self.config.coarse_altitude_m:
+            footprint *= self.config.coarse_altitude_m / self.config.altitude_m
+        return footprint
+    
+    @property
+    def cells(self) -> ScanGrid:
+        """Scan cells in visiting order (indexable, yields ScanCell views)"""
+        return self.grid
+    
     def get_next_waypoint(self) -> Optional[Tuple[float, float, float]]:
         """Get next scan position (lat, lon, alt)"""
-        if self.current_cell_idx >= len(self.cells):
+        idx = self.current_cell_idx
+        if idx >= len(self.grid):
             return None
         
-        cell = self.cells[self.current_cell_idx]
-        return (cell.lat, cell.lon, self.config.altitude_m)
+        altitude = self.config.altitude_m
+        if self.config.adaptive and idx < self._base_cells and self.config.coarse_altitude_m:
+            altitude = self.config.coarse_altitude_m
+        
+        return (float(self.grid.lat[idx]), float(self.grid.lon[idx]), altitude)
     
     def record_scan_result(self, mine_detected: bool, confidence: float):
         """Record detection result for current cell"""
-        if self.current_cell_idx >= len(self.cells):
+        idx = self.current_cell_idx
+        if idx >= len(self.grid):
             return
         
-        cell = self.cells[self.current_cell_idx]
-        cell.scanned = True
-        cell.result = 'mine' if mine_detected else 'clear'
-        cell.confidence = confidence
+        self._apply_result(idx, mine_detected, confidence)
+        self._advance()
+        self._check_complete()
+    
+    def mark_in_flight(self) -> int:
+        """
+        Move past the current cell before its result is known. Returns the
+        cell index to hand to record_cell_result(), or -1 if none is left.
+        """
+        idx = self.current_cell_idx
+        if idx >= len(self.grid):
+            return -1
         
+        if self.checkpoint is not None:
+            self.checkpoint.append(idx, STATUS_UNSCANNED, 0.0)
+        self._in_flight.add(idx)
+        self._advance()
+        return idx
+    
+    def record_cell_result(self, idx: int, mine_detected: bool, confidence: float):
+        """Record the result of a cell left in flight (any order)"""
+        if idx not in self._in_flight:
+            self.log.warning(f"Ignoring result for cell {idx}: not awaiting a result")
+            return
+        
+        self._in_flight.discard(idx)
+        # Checked before the result: refinement cells appended to the grid would
+        # turn the past-the-end index into one of them
+        finished = self.current_cell_idx >= len(self.grid)
+        self._apply_result(idx, mine_detected, confidence)
+        # Refinements queued after the last cell was flown restart the sweep
+        if finished and self._pending:
+            self._advance()
+        self._check_complete()
+    
+    @property
+    def in_flight(self) -> Set[int]:
+        """Cells flown past whose results have not arrived yet"""
+        return self._in_flight
+    
+    def requeue_in_flight(self) -> List[int]:
+        """Fly cells whose results were lost (e.g. in flight at a power cut) again, next"""
+        cells = sorted(self._in_flight)
+        if not cells:
+            return cells
+        self._in_flight.clear()
+        if self.current_cell_idx < len(self.grid):
+            self._pending.appendleft(self.current_cell_idx)
+        self._pending.extendleft(reversed(cells))
+        self._advance()
+        return cells
+    
+    def _apply_result(self, idx: int, mine_detected: bool, confidence: float):
+        """Fuse one cell's detection result into the grid, mine map and safe path"""
+        # The checkpoint keeps the raw verdict; replaying it rebuilds the belief map
+        if self.checkpoint is not None:
+            self.checkpoint.append(idx, STATUS_MINE if mine_detected else STATUS_CLEAR, confidence)
+        
+        # Fuse into the belief map; the cell takes the fused verdict
+        u, v = self._lattice_local(int(self.grid.line[idx]), int(self.grid.col[idx]))
+        p_mine = detection_probability(mine_detected, confidence, self.config.mine_probability)
+        window = self.belief.observe(u, v, p_mine, self._footprint_m(idx))
+        status = self.belief.classify_at(u, v)
+        mine_detected = mine_detected or status == STATUS_MINE
         if mine_detected:
-            self.detected_mines.add((cell.lat, cell.lon))
-            self.log.warning(f"Mine detected at ({cell.lat:.6f}, {cell.lon:.6f}) with confidence {confidence:.2f}")
+            status = STATUS_MINE
+        self.grid.mark(idx, mine_detected, confidence, status)
         
-        self.current_cell_idx += 1
+        # Repairs only reach back to the cell just read, so they stay local
+        if self.replanner is not None:
+            self.replanner.move_start(float(self.grid.lat[idx]), float(self.grid.lon[idx]))
         
-        # Check if sweep complete
-        if self.current_cell_idx >= len(self.cells):
+        if mine_detected:
+            lat, lon = float(self.grid.lat[idx]), float(self.grid.lon[idx])
+            mine, new = self.detected_mines.add(lat, lon, confidence)
+            if new:
+                self.log.warning(f"Mine detected at ({lat:.6f}, {lon:.6f}) with confidence {confidence:.2f}")
+            else:
+                self.log.info(f"Detection merged into mine at ({mine.lat:.6f}, {mine.lon:.6f}), "
+                              f"{mine.detections} detections, fused confidence {mine.fused_confidence:.2f}")
+            # A merged mine may have shifted; blocking is cumulative so this only adds cells
+            self._replan_for_mine(mine.lat, mine.lon)
+        else:
+            self._replan_for_risk(window)
+        
+        if self.config.adaptive and (mine_detected or status == STATUS_UNCERTAIN or
+                                     confidence >= self.config.refine_confidence):
+            self._queue_refinement(idx)
+    
+    def _check_complete(self):
+        """Finish once every cell is flown and every result is in"""
+        if self.current_cell_idx >= len(self.grid) and not self._in_flight and self.state != SweepState.COMPLETE:
             self.state = SweepState.COMPLETE
             self.log.info(f"Scan complete. Detected {len(self.detected_mines)} mines.")
             self._calculate_safe_path()
     
+    def _advance(self):
+        """Move to the next cell: queued refinements first, then the base pattern"""
+        if self._pending:
+            self.current_cell_idx = self._pending.popleft()
+            self.state = SweepState.EXPANDING
+        elif self._next_base_idx < self._base_cells:
+            self.current_cell_idx = self._next_base_idx
+            self._next_base_idx += 1
+            self.state = SweepState.SCANNING
+        else:
+            self.current_cell_idx = len(self.grid)
+    
+    def _queue_refinement(self, idx: int):
+        """Queue unvisited full-resolution cells around a positive or ambiguous reading"""
+        line, col = int(self.grid.line[idx]), int(self.grid.col[idx])
+        
+        # Coarse cells stand in for the full-resolution cells up to their neighbours,
+        # including the one they sit on, which is rescanned at full resolution
+        reach = 0
+        if idx < self._base_cells:
+            reach = max(int(self.config.coarse_factor), 1) - 1
+            self._lattice_idx[line, col] = -1
+        margin_cols = int(np.ceil(self.config.expansion_margin_m / self.config.scan_cell_size_m))
+        margin_lines = (int(np.ceil(self.config.expansion_margin_m / self._line_spacing_m))
+                        if self._line_spacing_m > 0 else 0)
+        
+        num_lines, num_cols = self._lattice_idx.shape
+        l_lo, l_hi = max(line - reach - margin_lines, 0), min(line + reach + margin_lines, num_lines - 1)
+        c_lo, c_hi = max(col - reach - margin_cols, 0), min(col + reach + margin_cols, num_cols - 1)
+        
+        window = self._lattice_idx[l_lo:l_hi + 1, c_lo:c_hi + 1]
+        lines, cols = np.nonzero(window < 0)
+        if lines.size == 0:
+            return
+        lines += l_lo
+        cols += c_lo
+        
+        # Snake through the patch, starting from the side nearest the current cell
+        order = np.lexsort((cols, lines))
+        lines, cols = lines[order], cols[order]
+        flip = (lines - l_lo) % 2 == (1 if col - c_lo < c_hi - col else 0)
+        for l in np.unique(lines[flip]):
+            sel = lines == l
+            cols[sel] = cols[sel][::-1]
+        
+        new_idx = self.grid.append(*self._lattice_positions(lines, cols), line=lines, col=cols)
+        self._lattice_idx[lines, cols] = new_idx
+        
+        # Visit the new patch before anything queued earlier
+        self._pending.extendleft(reversed(new_idx.tolist()))
+        self.log.info(f"Expanding scan: {new_idx.size} fine cells around ({line}, {col})")
+    
+    def _replan_for_mine(self, lat: float, lon: float):
+        """Repair the current safe path around a newly detected mine"""
+        if self.replanner is None:
+            return
+        
+        try:
+            if not self.replanner.add_mine(lat, lon):
+                return
+            self._update_safe_path("Safe path repaired")
+        except Exception as e:
+            self.log.error(f"Failed to repair safe path: {e}")
+    
+    def _replan_for_risk(self, window):
+        """Re-weight planning cells whose mine probability changed and repair the path"""
+        if self.replanner is None or window[0] == window[1]:
+            return
+        
+        try:
+            multipliers = self.belief.risk_multipliers(window, self.config.risk_weight)
+            # Clear ground keeps multiplier 1, so clear readings cost nothing here
+            if not self.replanner.update_costs(window, multipliers):
+                return
+            self._update_safe_path("Safe path re-weighted for uncertain ground")
+        except Exception as e:
+            self.log.error(f"Failed to re-weight safe path: {e}")
+    
+    def _update_safe_path(self, message: str):
+        """Take the repaired path; log and publish it unless it was and still is unavailable"""
+        was_available = bool(self.safe_path)
+        self.safe_path = self.replanner.find_path()
+        if not self.safe_path and not was_available:
+            return  # Still blocked: the replanner warned when it became so
+        self.log.info(f"{message}: {len(self.safe_path)} waypoints")
+        
+        if self.on_path_update:
+            self.on_path_update(self.safe_path)
+    
     def _calculate_safe_path(self):
-        """Use A* to find safe path avoiding detected mines"""
+        """Final safe path avoiding detected mines"""
+        if self.replanner is not None:
+            # Repaired ahead of every reading; finish the stretch back to the corridor start
+            self.replanner.move_start(*self.config.start)
+            self.safe_path = self.replanner.find_path()
+            self.log.info(f"Calculated safe path with {len(self.safe_path)} waypoints")
+            return
+        
+        # Fall back to a full A* search
         try:
-            # Try to import existing pathfinder
-            import sys
-            import os
-            pathfinder_path = os.path.join(os.path.dirname(__file__), '..', 'pi_gps')
-            if os.path.exists(pathfinder_path):
-                sys.path.insert(0, pathfinder_path)
-                from pathfinder import Pathfinder, PathfinderConfig
-                
-                pf_config = PathfinderConfig(
-                    mine_circumvention_radius_m=2.0,
-                    grid_resolution_m=0.5
-                )
-                pathfinder = Pathfinder(pf_config)
-                
-                # Add detected mines
-                for mine_lat, mine_lon in self.detected_mines:
-                    # Note: pathfinder expects (x, y) in local coords
-                    # This is a simplified version - proper coordinate transformation needed
-                    pathfinder.add_mine(mine_lon, mine_lat)
-                
-                # Find path
-                start = (self.config.start[1], self.config.start[0])
-                goal = (self.config.goal[1], self.config.goal[0])
-                
-                self.safe_path = pathfinder.find_path(start, goal)
-                self.log.info(f"Calculated safe path with {len(self.safe_path)} waypoints")
-            else:
-                self.log.warning("Pathfinder not available, safe path not calculated")
+            planner = SafePathPlanner(
+                self.config.start,
+                self.config.goal,
+                self.config.corridor_width_m,
+                self._planner_config(),
+                frame=self.frame
+            )
+            
+            for mine_lat, mine_lon in self.detected_mines.positions():
+                planner.add_mine(mine_lat, mine_lon)
+            everything = (0, self.belief.ny, 0, self.belief.nx)
+            planner.grid.set_cost(everything, self.belief.risk_multipliers(everything, self.config.risk_weight))
+            
+            self.safe_path = planner.find_path()
+            self.log.info(f"Calculated safe path with {len(self.safe_path)} waypoints")
                 
         except Exception as e:
             self.log.error(f"Failed to calculate safe path: {e}")
     
     def get_safe_path(self) -> List[Tuple[float, float]]:
-        """Get calculated safe path after sweep complete"""
+        """Get current best safe path (final once sweep is complete)"""
         return self.safe_path
     
     def get_progress(self) -> float:
         """Get scan progress (0.0 - 1.0)"""
-        if len(self.cells) == 0:
+        if len(self.grid) == 0:
             return 0.0
-        return self.current_cell_idx / len(self.cells)
+        if self.current_cell_idx >= len(self.grid) and not self._in_flight:
+            return 1.0
+        return self.grid.scanned_count() / len(self.grid)
     
     def get_statistics(self) -> dict:
         """Get current scan statistics"""
         return {
-            'total_cells': len(self.cells),
-            'scanned_cells': self.current_cell_idx,
+            'total_cells': len(self.grid),
+            'scanned_cells': self.grid.scanned_count(),
+            'clear_cells': self.grid.count(STATUS_CLEAR),
+            'mine_cells': self.grid.count(STATUS_MINE),
+            'uncertain_cells': self.grid.count(STATUS_UNCERTAIN),
+            'refined_cells': len(self.grid) - self._base_cells,
             'mines_detected': len(self.detected_mines),
+            'detections': sum(m.detections for m in self.detected_mines),
             'progress': self.get_progress(),
             'state': self.state.value
         }
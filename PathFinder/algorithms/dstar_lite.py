@@ -0,0 +1,335 @@
+"""Incremental safe path replanning with D* Lite"""
+
+import heapq
+import math
+import logging
+from typing import List, Tuple, Optional, Iterable
+
+import numpy as np
+
+from navigation.geodesy import CorridorFrame
+from .safe_path import OccupancyGrid, PlannerConfig, octile_distance, SQRT2
+from .path_smoothing import waypoints_from_nodes
+
+
+# Tolerance for comparing path costs that differ only by float rounding
+KEY_EPS = 1e-6
+
+
+class DStarLitePlanner:
+    """
+    D* Lite replanner over a corridor occupancy grid.
+
+    The search runs backwards from the goal and keeps its g/rhs values and
+    open list between calls. Unscanned ground is assumed passable, so the
+    search starts out fully solved. Its start follows the sweep: move_start()
+    puts it on the current path level with the cell just scanned, and the
+    key modifier km keeps queued keys valid as it moves. A new mine or cost
+    change only re-expands cells between the change and the current start,
+    so the repair does not grow with the corridor. Repairs further back stay
+    queued until the start moves back over them, at the latest when the
+    final path is planned from the corridor start.
+
+    Mines only ever add blocked cells, so once the goal is covered or the
+    corridor closed it stays that way. find_path() warns once when the path
+    becomes unavailable (blocked_reason says why) and returns [] without
+    searching until a cell or the start changes.
+    """
+
+    def __init__(self, start: Tuple[float, float], goal: Tuple[float, float],
+                 corridor_width_m: float, config: Optional[PlannerConfig] = None,
+                 frame: Optional[CorridorFrame] = None):
+        self.config = config or PlannerConfig()
+        self.start = start
+        self.goal = goal
+        self.grid = OccupancyGrid(
+            frame or CorridorFrame(start, goal), corridor_width_m,
+            resolution_m=self.config.grid_resolution_m,
+            margin_m=self.config.corridor_margin_m
+        )
+        self.mines: List[Tuple[float, float]] = []
+        self.log = logging.getLogger(__name__)
+
+        grid = self.grid
+        start_cell = grid.cell_of(*grid.to_local(*start))
+        goal_cell = grid.cell_of(*grid.to_local(*goal))
+        self.start_node = grid.node_of(*start_cell)
+        self.goal_node = grid.node_of(*goal_cell)
+        # Cells the start has moved through, ending at the start itself
+        self._trail = [self.start_node]
+        self._last_node = self.start_node
+        self._km = 0.0
+        self.blocked_reason: Optional[str] = None  # Why the last find_path found no path
+        self._changed = True  # A cell or the start changed since the last find_path
+
+        s, res = grid.stride, grid.resolution_m
+        diag = res * SQRT2
+
+        # A fresh grid is open ground, where the octile distance to the goal is
+        # the exact cost-to-go: every cell starts consistent and nothing is queued
+        gy, gx = divmod(self.goal_node, s)
+        dy = np.abs(np.arange(grid.ny + 2) - gy)[:, None]
+        dx = np.abs(np.arange(s) - gx)[None, :]
+        cost_to_go = res * np.maximum(dx, dy) + (diag - res) * np.minimum(dx, dy)
+        cost_to_go[grid.blocked != 0] = math.inf
+        self._blocked = grid.blocked_flat
+        self._cost = grid.cost_flat
+        self._g = cost_to_go.ravel().tolist()
+        self._rhs = list(self._g)
+        self._open: List[Tuple[float, float, int]] = []
+        self._open_key = {}
+
+        # (offset, cost, corner offsets); diagonals may not clip a blocked corner
+        self._moves = ((1, res, 0, 0), (-1, res, 0, 0), (s, res, 0, 0), (-s, res, 0, 0),
+                       (s + 1, diag, 1, s), (s - 1, diag, -1, s),
+                       (-s + 1, diag, 1, -s), (-s - 1, diag, -1, -s))
+
+        self.expansions = 0
+
+    # --- D* Lite core ---
+
+    def _h(self, node: int) -> float:
+        """Heuristic distance from the start; 0 when running as Dijkstra"""
+        if not self.config.use_heuristic:
+            return 0.0
+        return octile_distance(self.grid, node, self.start_node)
+
+    def _key(self, node: int) -> Tuple[float, float]:
+        m = min(self._g[node], self._rhs[node])
+        return (m + self._h(node) + self._km, m)
+
+    def _push(self, node: int):
+        key = self._key(node)
+        self._open_key[node] = key
+        heapq.heappush(self._open, (key[0], key[1], node))
+
+    def _update_vertex(self, node: int):
+        # Closed-form and summed costs may differ in the last bits; that is not a change
+        if abs(self._g[node] - self._rhs[node]) > KEY_EPS:
+            self._push(node)
+        else:
+            self._open_key.pop(node, None)
+
+    def _best_rhs(self, node: int) -> float:
+        """One-step lookahead: min over successors of edge cost + g"""
+        blocked, g, cell_cost = self._blocked, self._g, self._cost
+        if blocked[node]:
+            return math.inf
+        best = math.inf
+        for step, cost, sx, sy in self._moves:
+            nb = node + step
+            if blocked[nb] or (sx and (blocked[node + sx] or blocked[node + sy])):
+                continue
+            value = cost * cell_cost[nb] + g[nb]
+            if value < best:
+                best = value
+        return best
+
+    def _top_key(self) -> Tuple[float, float]:
+        """Smallest valid key in the open list (drops stale heap entries)"""
+        heap, open_key = self._open, self._open_key
+        while heap:
+            k1, k2, node = heap[0]
+            if open_key.get(node) == (k1, k2):
+                return (k1, k2)
+            heapq.heappop(heap)
+        return (math.inf, math.inf)
+
+    def _compute_shortest_path(self):
+        g, rhs = self._g, self._rhs
+        blocked, moves, cell_cost = self._blocked, self._moves, self._cost
+        open_key = self._open_key
+        start, goal = self.start_node, self.goal_node
+        if start != self._last_node:
+            # Keys queued before the move under-estimate by at most this much
+            if self.config.use_heuristic:
+                self._km += octile_distance(self.grid, self._last_node, start)
+            self._last_node = start
+
+        while True:
+            top = self._top_key()
+            if top[0] == math.inf:
+                break
+            m = min(g[start], rhs[start])
+            k1, k2 = m + self._km, m
+            # Keys within rounding noise of the start key count as equal on k1,
+            # otherwise nodes on an equally long path stay inconsistent
+            below = top[0] < k1 - KEY_EPS or (top[0] <= k1 + KEY_EPS and top[1] < k2)
+            if not (below or abs(rhs[start] - g[start]) > KEY_EPS):
+                break
+
+            _, _, node = heapq.heappop(self._open)
+            del open_key[node]
+            # Queued under an older start: requeue with its current key
+            if self._key(node)[0] > top[0] + KEY_EPS:
+                self._push(node)
+                continue
+            self.expansions += 1
+
+            if g[node] > rhs[node]:
+                # Overconsistent: settle and relax predecessors
+                g[node] = g_node = rhs[node]
+                w = cell_cost[node]
+                for step, cost, sx, sy in moves:
+                    nb = node + step
+                    if blocked[nb] or (sx and (blocked[node + sx] or blocked[node + sy])):
+                        continue
+                    if nb != goal and cost * w + g_node < rhs[nb] - KEY_EPS:
+                        rhs[nb] = cost * w + g_node
+                        self._update_vertex(nb)
+            else:
+                # Underconsistent: invalidate and let dependants find new routes
+                g_old = g[node]
+                w = cell_cost[node]
+                g[node] = math.inf
+                if node != goal:
+                    rhs[node] = self._best_rhs(node)
+                self._update_vertex(node)
+                for step, cost, sx, sy in moves:
+                    nb = node + step
+                    if blocked[nb] or nb == goal:
+                        continue
+                    if abs(rhs[nb] - (cost * w + g_old)) <= KEY_EPS:
+                        rhs[nb] = self._best_rhs(nb)
+                        self._update_vertex(nb)
+
+    def _cells_changed(self, nodes: Iterable[int]):
+        """Re-evaluate every vertex whose outgoing edges touch a changed cell"""
+        stride = self.grid.stride
+        self._changed = True
+        affected = set()
+        for node in nodes:
+            for dy in (-stride, 0, stride):
+                for dx in (-1, 0, 1):
+                    affected.add(node + dy + dx)
+
+        for node in affected:
+            if node != self.goal_node:
+                self._rhs[node] = self._best_rhs(node)
+                self._update_vertex(node)
+
+    def _next_node(self, node: int) -> int:
+        """Successor minimising edge cost + g, or -1 if none is reachable"""
+        g, blocked, cell_cost = self._g, self._blocked, self._cost
+        best, best_nb = math.inf, -1
+        for step, cost, sx, sy in self._moves:
+            nb = node + step
+            if blocked[nb] or (sx and (blocked[node + sx] or blocked[node + sy])):
+                continue
+            value = cost * cell_cost[nb] + g[nb]
+            if value < best:
+                best, best_nb = value, nb
+        return best_nb
+
+    def _u_of(self, node: int) -> float:
+        """Along-track position of a node in metres"""
+        return self.grid.cell_center(node)[0]
+
+    def _unblock_start(self):
+        """Step back along the trail until the start is outside every circumvention radius"""
+        trail = self._trail
+        while len(trail) > 1 and self._blocked[trail[-1]]:
+            trail.pop()
+        if trail[-1] != self.start_node:
+            self.start_node = trail[-1]
+            self._changed = True
+
+    def _repair(self):
+        """Bring the path from the current start up to date (nothing to do once the goal is covered)"""
+        self._unblock_start()
+        if not self._blocked[self.start_node] and not self._blocked[self.goal_node]:
+            self._compute_shortest_path()
+
+    # --- public API ---
+
+    def move_start(self, lat: float, lon: float):
+        """
+        Plan from the current path where it passes a position, normally the
+        cell the sweep just read, less one circumvention radius so a mine
+        found there does not cover the start. Moving forward follows the
+        path; moving back retraces the cells the start has already visited.
+        Call it with the corridor start for the final full-length path.
+        """
+        target = self.grid.to_local(lat, lon)[0] - self.config.mine_circumvention_radius_m
+        trail = self._trail
+        if self._u_of(trail[-1]) < target:
+            # The path ahead of the start is consistent after the last repair
+            node = trail[-1]
+            while node != self.goal_node and self._g[node] < math.inf:
+                nb = self._next_node(node)
+                if nb < 0 or self._u_of(nb) > target:
+                    break
+                trail.append(nb)
+                node = nb
+        else:
+            while len(trail) > 1 and self._u_of(trail[-1]) > target:
+                trail.pop()
+        self._unblock_start()
+
+    def add_mine(self, lat: float, lon: float) -> bool:
+        """
+        Block a mine's circumvention radius and repair the current path.
+        Returns True if any planning cell changed.
+        """
+        self.mines.append((lat, lon))
+        u, v = self.grid.to_local(lat, lon)
+        changed = self.grid.inflate_disk(u, v, self.config.mine_circumvention_radius_m)
+        if changed.size == 0:
+            return False
+
+        self._cells_changed(changed.tolist())
+        self._repair()
+        return True
+
+    def update_costs(self, window, multipliers) -> bool:
+        """
+        Set cell cost multipliers for an interior (iy0, iy1, ix0, ix1) window
+        and repair the current path. Returns True if any cost changed.
+        """
+        changed = self.grid.set_cost(window, multipliers)
+        if changed.size == 0:
+            return False
+
+        self._cells_changed(changed.tolist())
+        self._repair()
+        return True
+
+    def path_nodes(self) -> List[int]:
+        """Follow the g gradient from start to goal; [] if the goal is cut off"""
+        node = self.start_node
+        if self._g[node] == math.inf:
+            return []
+
+        path = [node]
+        visited = {node}
+        while node != self.goal_node:
+            node = self._next_node(node)
+            if node < 0 or self._g[node] == math.inf or node in visited:
+                return []
+            visited.add(node)
+            path.append(node)
+        return path
+
+    def find_path(self) -> List[Tuple[float, float]]:
+        """Current best safe path from the planning start to the goal as (lat, lon) waypoints"""
+        if self.blocked_reason is not None and not self._changed:
+            return []
+        self._changed = False
+
+        nodes = []
+        if self._blocked[self.start_node] or self._blocked[self.goal_node]:
+            reason = "Start or goal within mine circumvention radius"
+        else:
+            self._compute_shortest_path()
+            nodes = self.path_nodes()
+            reason = None if nodes else f"No safe path found around {len(self.mines)} mines"
+
+        if reason is not None:
+            if self.blocked_reason is None:
+                self.log.warning(reason)
+            self.blocked_reason = reason
+            return []
+        if self.blocked_reason is not None:
+            self.log.info("Safe path available again")
+            self.blocked_reason = None
+        return waypoints_from_nodes(self.grid, nodes, self.config)
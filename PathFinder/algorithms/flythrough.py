@@ -0,0 +1,123 @@
+"""Continuous fly-through scanning: match frames captured in flight to scan cells"""
+
+import bisect
+import math
+from typing import Any, List, Tuple
+
+import numpy as np
+
+
+def claim_line(algorithm, max_cells: int = 0) -> List[int]:
+    """
+    Mark the run of upcoming cells that can be flown as one straight pass
+    in flight, and return their indices in visiting order.
+
+    A run continues while cells stay on the same sweep line and altitude,
+    keep the direction of the first step, and are no further apart than
+    1.5 times that step. Works with any algorithm exposing the waypoint
+    interface (get_next_waypoint, mark_in_flight, current_cell_idx, grid).
+    """
+    grid = algorithm.grid
+    cells: List[int] = []
+    first = algorithm.get_next_waypoint()
+    if first is None:
+        return cells
+    line = int(grid.line[algorithm.current_cell_idx])
+    prev = (float(grid.x_m[algorithm.current_cell_idx]), float(grid.y_m[algorithm.current_cell_idx]))
+    step = None
+
+    while not max_cells or len(cells) < max_cells:
+        waypoint = algorithm.get_next_waypoint()
+        if waypoint is None:
+            break
+        idx = algorithm.current_cell_idx
+        if cells:
+            if int(grid.line[idx]) != line or waypoint[2] != first[2]:
+                break
+            d = (float(grid.x_m[idx]) - prev[0], float(grid.y_m[idx]) - prev[1])
+            length = math.hypot(*d)
+            if length == 0:
+                break
+            if step is None:
+                step = (d, length)
+            elif length > 1.5 * step[1] or d[0] * step[0][0] + d[1] * step[0][1] <= 0:
+                break
+            prev = (float(grid.x_m[idx]), float(grid.y_m[idx]))
+        cells.append(algorithm.mark_in_flight())
+    return cells
+
+
+class LineScan:
+    """
+    One straight pass over a run of cells at constant speed.
+
+    Frames are added with the local (east, north) position they were
+    captured at. A frame covers the cells whose centres fall inside its
+    square footprint (aligned with the flight direction); each cell keeps
+    the frames_per_cell covering frames centred nearest to it, nearest
+    first. A cell is released as soon as the vehicle has flown past it,
+    since later frames can only be further away, so frames are held only
+    while they can still win a cell.
+    """
+
+    def __init__(self, cells: List[int], east, north, footprint_m: float, frames_per_cell: int = 1):
+        self.cells = list(cells)
+        east = np.asarray(east, dtype=np.float64)
+        north = np.asarray(north, dtype=np.float64)
+        self.origin = np.array([east[0], north[0]])
+        d = np.array([east[-1] - east[0], north[-1] - north[0]])
+        length = float(np.hypot(*d))
+        self.direction = d / length if length > 0 else np.array([1.0, 0.0])
+        self.along = (east - self.origin[0]) * self.direction[0] + (north - self.origin[1]) * self.direction[1]
+        self.across = (north - self.origin[1]) * self.direction[0] - (east - self.origin[0]) * self.direction[1]
+        self.half = footprint_m / 2
+        self.frames_per_cell = max(int(frames_per_cell), 1)
+
+        n = len(self.cells)
+        self._kept: List[List[Tuple[float, int, Any]]] = [[] for _ in range(n)]
+        self._worst = np.full(n, np.inf)  # Distance a frame must beat to be kept
+        self._covered = np.zeros(n, dtype=bool)
+        self._released = np.zeros(n, dtype=bool)
+        self.frames = 0
+
+    def add(self, frame: Any, east: float, north: float) -> List[Tuple[int, List[Any]]]:
+        """Place a frame; returns (cell, frames) for every cell now flown past"""
+        self.frames += 1
+        rel = np.array([east, north]) - self.origin
+        s = rel[0] * self.direction[0] + rel[1] * self.direction[1]
+        c = rel[1] * self.direction[0] - rel[0] * self.direction[1]
+
+        da = np.abs(self.along - s)
+        dc = np.abs(self.across - c)
+        dist = np.hypot(da, dc)
+        better = (da <= self.half) & (dc <= self.half) & (dist < self._worst) & ~self._released
+        for i in np.nonzero(better)[0]:
+            kept = self._kept[i]
+            # The frame counter breaks distance ties without comparing frames
+            bisect.insort(kept, (float(dist[i]), self.frames, frame))
+            del kept[self.frames_per_cell:]
+            if len(kept) == self.frames_per_cell:
+                self._worst[i] = kept[-1][0]
+            self._covered[i] = True
+
+        return self._release((self.along <= s) & self._covered)
+
+    @property
+    def uncovered(self) -> int:
+        """Cells no frame has covered yet"""
+        return int(np.count_nonzero(~self._covered & ~self._released))
+
+    def finish(self) -> Tuple[List[Tuple[int, List[Any]]], List[int]]:
+        """Release the remaining covered cells; also returns cells no frame covered"""
+        ready = self._release(self._covered)
+        missed = [self.cells[i] for i in np.nonzero(~self._released)[0]]
+        self._released[:] = True
+        return ready, missed
+
+    def _release(self, mask: np.ndarray) -> List[Tuple[int, List[Any]]]:
+        out = []
+        for i in np.nonzero(mask & ~self._released)[0]:
+            out.append((self.cells[i], [frame for _, _, frame in self._kept[i]]))
+            self._kept[i] = []
+            self._released[i] = True
+        return out
@@ -0,0 +1,173 @@
+"""Spatial index of detected mines"""
+
+import math
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from navigation.geodesy import LocalProjection
+
+
+@dataclass
+class DetectedMine:
+    """One mine, possibly merged from several detections"""
+    lat: float
+    lon: float
+    east: float              # Local metres in the mine map's projection
+    north: float
+    confidence: float        # Highest single-detection confidence
+    fused_confidence: float  # 1 - prod(1 - c) over all merged detections
+    detections: int = 1
+
+
+class MineMap:
+    """
+    Detected mines in a uniform hash grid over local metres.
+
+    Detections closer than merge_radius_m to a known mine are merged into
+    it: the position becomes the confidence-weighted mean, confidence keeps
+    the maximum and fused_confidence combines all detections as independent
+    evidence. Radius and nearest-neighbour queries only visit the buckets
+    that can contain an answer.
+    """
+
+    def __init__(self, projection: LocalProjection, merge_radius_m: float = 0.5,
+                 bucket_size_m: Optional[float] = None):
+        self.projection = projection
+        self.merge_radius_m = merge_radius_m
+        self.bucket_size_m = bucket_size_m or max(merge_radius_m, 5.0)
+        self._mines: List[DetectedMine] = []
+        self._buckets: Dict[Tuple[int, int], List[int]] = {}
+        # Sum of detection weights behind each mine's position
+        self._weights: List[float] = []
+
+    def _bucket(self, east: float, north: float) -> Tuple[int, int]:
+        return (math.floor(east / self.bucket_size_m), math.floor(north / self.bucket_size_m))
+
+    def _candidates(self, east: float, north: float, radius_m: float) -> Iterator[int]:
+        """Ids of mines in every bucket overlapping the query disk"""
+        bx0, by0 = self._bucket(east - radius_m, north - radius_m)
+        bx1, by1 = self._bucket(east + radius_m, north + radius_m)
+        buckets = self._buckets
+        if (bx1 - bx0 + 1) * (by1 - by0 + 1) > len(buckets):
+            # Large query: cheaper to walk the occupied buckets
+            for (bx, by), ids in buckets.items():
+                if bx0 <= bx <= bx1 and by0 <= by <= by1:
+                    yield from ids
+            return
+        for bx in range(bx0, bx1 + 1):
+            for by in range(by0, by1 + 1):
+                ids = buckets.get((bx, by))
+                if ids:
+                    yield from ids
+
+    def add(self, lat: float, lon: float, confidence: float) -> Tuple[DetectedMine, bool]:
+        """
+        Add a detection. Returns the mine it belongs to and whether it is new
+        (False when merged into an existing mine).
+        """
+        east, north = self.projection.forward(lat, lon)
+        nearest = self._nearest_id(east, north, self.merge_radius_m)
+        weight = max(confidence, 1e-6)
+
+        if nearest is None:
+            mine = DetectedMine(lat, lon, east, north, confidence, confidence)
+            self._mines.append(mine)
+            self._weights.append(weight)
+            self._buckets.setdefault(self._bucket(east, north), []).append(len(self._mines) - 1)
+            return mine, True
+
+        mine = self._mines[nearest]
+        old_bucket = self._bucket(mine.east, mine.north)
+        total = self._weights[nearest] + weight
+        mine.east += (east - mine.east) * weight / total
+        mine.north += (north - mine.north) * weight / total
+        mine.lat, mine.lon = self.projection.inverse(mine.east, mine.north)
+        mine.confidence = max(mine.confidence, confidence)
+        mine.fused_confidence = 1 - (1 - mine.fused_confidence) * (1 - confidence)
+        mine.detections += 1
+        self._weights[nearest] = total
+
+        new_bucket = self._bucket(mine.east, mine.north)
+        if new_bucket != old_bucket:
+            self._buckets[old_bucket].remove(nearest)
+            if not self._buckets[old_bucket]:
+                del self._buckets[old_bucket]
+            self._buckets.setdefault(new_bucket, []).append(nearest)
+        return mine, False
+
+    def _nearest_id(self, east: float, north: float, max_distance_m: float) -> Optional[int]:
+        best, best_d = None, max_distance_m
+        for i in self._candidates(east, north, max_distance_m):
+            m = self._mines[i]
+            d = math.hypot(m.east - east, m.north - north)
+            if d <= best_d:
+                best, best_d = i, d
+        return best
+
+    def within(self, lat: float, lon: float, radius_m: float) -> List[DetectedMine]:
+        """Mines within radius_m of a GPS position"""
+        east, north = self.projection.forward(lat, lon)
+        found = []
+        for i in self._candidates(east, north, radius_m):
+            m = self._mines[i]
+            if math.hypot(m.east - east, m.north - north) <= radius_m:
+                found.append(m)
+        return found
+
+    def near_mine(self, lat: float, lon: float, radius_m: float) -> bool:
+        """True if any mine lies within radius_m of a GPS position"""
+        east, north = self.projection.forward(lat, lon)
+        for i in self._candidates(east, north, radius_m):
+            m = self._mines[i]
+            if math.hypot(m.east - east, m.north - north) <= radius_m:
+                return True
+        return False
+
+    def nearest(self, lat: float, lon: float,
+                max_distance_m: float = math.inf) -> Optional[Tuple[DetectedMine, float]]:
+        """Closest mine and its distance in metres, or None"""
+        if not self._mines:
+            return None
+        east, north = self.projection.forward(lat, lon)
+
+        # Search rings of buckets outwards until no closer mine can exist
+        bx, by = self._bucket(east, north)
+        size = self.bucket_size_m
+        best, best_d = None, max_distance_m
+        ring = 0
+        while True:
+            for x in range(bx - ring, bx + ring + 1):
+                for y in (range(by - ring, by + ring + 1) if x in (bx - ring, bx + ring)
+                          else (by - ring, by + ring)):
+                    for i in self._buckets.get((x, y), ()):
+                        m = self._mines[i]
+                        d = math.hypot(m.east - east, m.north - north)
+                        if d <= best_d:
+                            best, best_d = m, d
+            # Any unvisited bucket is at least ring * size away
+            if ring * size > best_d:
+                break
+            if (2 * ring + 1) ** 2 > len(self._buckets):
+                # Sparse map far from the query: finish with a linear scan
+                for m in self._mines:
+                    d = math.hypot(m.east - east, m.north - north)
+                    if d <= best_d:
+                        best, best_d = m, d
+                break
+            ring += 1
+        return (best, best_d) if best is not None else None
+
+    def positions(self) -> List[Tuple[float, float]]:
+        """(lat, lon) of every mine"""
+        return [(m.lat, m.lon) for m in self._mines]
+
+    def __len__(self) -> int:
+        return len(self._mines)
+
+    def __iter__(self) -> Iterator[DetectedMine]:
+        return iter(self._mines)
+
+    def __contains__(self, position) -> bool:
+        """A (lat, lon) position counts as contained if it is within the merge radius of a mine"""
+        lat, lon = position
+        return self.near_mine(lat, lon, self.merge_radius_m)
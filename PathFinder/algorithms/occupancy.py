@@ -0,0 +1,188 @@
+"""Bayesian log-odds occupancy map of mine probability"""
+
+import math
+from typing import Tuple
+
+import numpy as np
+
+from .scan_grid import STATUS_UNSCANNED, STATUS_CLEAR, STATUS_MINE, STATUS_UNCERTAIN
+
+
+def logit(p):
+    return np.log(p / (1 - p))
+
+
+class BeliefGrid:
+    """
+    Per-cell mine probability stored as log-odds in a float32 raster.
+
+    Cell (ix, iy) is centred on (u0 + ix * res, v0 + iy * res), matching
+    OccupancyGrid, so beliefs map one-to-one onto planning cells. Every
+    detector output is fused with a standard inverse sensor model: the
+    log-odds of the reading (relative to the prior) is added to every cell
+    under the footprint, scaled by the fraction of the cell the footprint
+    covers. Updates touch only the footprint window, so they cost a few
+    microseconds regardless of map size.
+    """
+
+    def __init__(self, u0: float, v0: float, nx: int, ny: int, resolution_m: float,
+                 prior: float = 0.5, mine_threshold: float = 0.7, clear_threshold: float = 0.3,
+                 p_limits: Tuple[float, float] = (0.02, 0.98), max_log_odds: float = 8.0):
+        self.u0 = u0
+        self.v0 = v0
+        self.nx = nx
+        self.ny = ny
+        self.resolution_m = resolution_m
+        self.prior = prior
+        self.mine_threshold = mine_threshold
+        self.clear_threshold = clear_threshold
+        self.p_limits = p_limits
+        self.max_log_odds = max_log_odds
+
+        self._l0 = float(logit(prior))
+        # Thresholds get a little slack for float32 rounding of the stored log-odds
+        self._mine_l = float(logit(mine_threshold)) - 1e-4
+        self._clear_l = float(logit(clear_threshold)) + 1e-4
+        self.log_odds = np.full((ny, nx), self._l0, dtype=np.float32)
+        # Total footprint coverage seen by each cell; 0 = never observed
+        self.coverage = np.zeros((ny, nx), dtype=np.float32)
+
+    @classmethod
+    def like(cls, grid, **kwargs) -> 'BeliefGrid':
+        """Belief raster with the same geometry as an OccupancyGrid"""
+        return cls(grid.u0, grid.v0, grid.nx, grid.ny, grid.resolution_m, **kwargs)
+
+    def _overlap(self, lo: float, hi: float, origin: float, n: int):
+        """First cell index and per-cell covered fraction of the interval [lo, hi] on one axis"""
+        res = self.resolution_m
+        # Cell i spans origin + (i - 0.5) * res .. origin + (i + 0.5) * res
+        a = (lo - origin) / res + 0.5
+        b = (hi - origin) / res + 0.5
+        i0, i1 = max(int(math.floor(a)), 0), min(int(math.ceil(b)), n)
+        # Footprints span a handful of cells, so plain Python beats small-array NumPy here
+        return i0, [min(i + 1, b) - max(i, a) for i in range(i0, i1)]
+
+    def observe(self, u: float, v: float, p_mine: float,
+                footprint_m: float) -> Tuple[int, int, int, int]:
+        """
+        Fuse one reading whose square footprint of side footprint_m is
+        centred on (u, v). Returns the updated window (iy0, iy1, ix0, ix1).
+        """
+        lo, hi = self.p_limits
+        p = min(max(p_mine, lo), hi)
+        evidence = math.log(p / (1 - p)) - self._l0
+
+        half = footprint_m / 2
+        ix0, fx = self._overlap(u - half, u + half, self.u0, self.nx)
+        iy0, fy = self._overlap(v - half, v + half, self.v0, self.ny)
+        if not fx or not fy:
+            return (0, 0, 0, 0)
+
+        weight = np.outer(np.array(fy, dtype=np.float32), np.array(fx, dtype=np.float32))
+        iy1, ix1 = iy0 + len(fy), ix0 + len(fx)
+        window = self.log_odds[iy0:iy1, ix0:ix1]
+        window += evidence * weight
+        np.clip(window, -self.max_log_odds, self.max_log_odds, out=window)
+        self.coverage[iy0:iy1, ix0:ix1] += weight
+        return (iy0, iy1, ix0, ix1)
+
+    def observe_many(self, u: np.ndarray, v: np.ndarray, p_mine: np.ndarray, footprint_m: float):
+        """
+        Fuse a batch of readings at once (e.g. replayed or simulated flights).
+        Footprints are approximated by whole cells: every cell whose centre
+        lies inside a footprint receives the full evidence.
+        """
+        lo, hi = self.p_limits
+        p = np.clip(np.asarray(p_mine, dtype=np.float64), lo, hi)
+        evidence = (np.log(p / (1 - p)) - self._l0).astype(np.float32)
+
+        res = self.resolution_m
+        k = max(int(round(footprint_m / res)), 1)
+        # Cells covered by a k x k footprint centred on each reading
+        ix = np.floor((np.asarray(u) - self.u0) / res + 0.5 - (k - 1) / 2).astype(np.int64)
+        iy = np.floor((np.asarray(v) - self.v0) / res + 0.5 - (k - 1) / 2).astype(np.int64)
+        offsets = np.arange(k)
+        cx = (ix[:, None, None] + offsets[None, None, :]).repeat(k, axis=1)
+        cy = (iy[:, None, None] + offsets[None, :, None]).repeat(k, axis=2)
+        inside = (cx >= 0) & (cx < self.nx) & (cy >= 0) & (cy < self.ny)
+        flat = (cy * self.nx + cx)[inside]
+        values = np.broadcast_to(evidence[:, None, None], inside.shape)[inside]
+
+        delta = np.bincount(flat, weights=values, minlength=self.nx * self.ny)
+        touched = np.bincount(flat, minlength=self.nx * self.ny)
+        self.log_odds += delta.reshape(self.ny, self.nx).astype(np.float32)
+        np.clip(self.log_odds, -self.max_log_odds, self.max_log_odds, out=self.log_odds)
+        self.coverage += touched.reshape(self.ny, self.nx).astype(np.float32)
+
+    def cell_of(self, u: float, v: float):
+        """(ix, iy) of the cell containing (u, v), or None outside the map"""
+        ix = int(round((u - self.u0) / self.resolution_m))
+        iy = int(round((v - self.v0) / self.resolution_m))
+        if 0 <= ix < self.nx and 0 <= iy < self.ny:
+            return ix, iy
+        return None
+
+    def probability_at(self, u: float, v: float) -> float:
+        """Mine probability of the cell containing (u, v) (prior outside the map)"""
+        cell = self.cell_of(u, v)
+        if cell is None:
+            return self.prior
+        return float(1 / (1 + math.exp(-float(self.log_odds[cell[1], cell[0]]))))
+
+    def classify_at(self, u: float, v: float) -> int:
+        """Status code of the cell containing (u, v)"""
+        cell = self.cell_of(u, v)
+        if cell is None or self.coverage[cell[1], cell[0]] <= 0:
+            return STATUS_UNSCANNED
+        l = self.log_odds[cell[1], cell[0]]
+        if l >= self._mine_l:
+            return STATUS_MINE
+        if l <= self._clear_l:
+            return STATUS_CLEAR
+        return STATUS_UNCERTAIN
+
+    def probabilities(self, window=None) -> np.ndarray:
+        """Mine probability per cell (optionally for an (iy0, iy1, ix0, ix1) window)"""
+        l = self.log_odds if window is None else self.log_odds[window[0]:window[1], window[2]:window[3]]
+        return 1 / (1 + np.exp(-l))
+
+    def classify(self, window=None) -> np.ndarray:
+        """Status code per cell: unscanned, clear, mine or uncertain"""
+        if window is None:
+            l, seen = self.log_odds, self.coverage
+        else:
+            iy0, iy1, ix0, ix1 = window
+            l, seen = self.log_odds[iy0:iy1, ix0:ix1], self.coverage[iy0:iy1, ix0:ix1]
+        status = np.full(l.shape, STATUS_UNCERTAIN, dtype=np.uint8)
+        status[l <= self._clear_l] = STATUS_CLEAR
+        status[l >= self._mine_l] = STATUS_MINE
+        status[seen <= 0] = STATUS_UNSCANNED
+        return status
+
+    def risk_multipliers(self, window, risk_weight: float) -> np.ndarray:
+        """
+        Planner cost multiplier per cell: 1 for unobserved or clear ground,
+        1 + risk_weight * p once the fused probability leaves the clear band.
+        """
+        iy0, iy1, ix0, ix1 = window
+        l = self.log_odds[iy0:iy1, ix0:ix1]
+        seen = self.coverage[iy0:iy1, ix0:ix1] > 0
+        risky = seen & (l > self._clear_l)
+        p = 1 / (1 + np.exp(-l))
+        return np.where(risky, 1 + risk_weight * p, 1.0).astype(np.float32)
+
+    def nbytes(self) -> int:
+        return self.log_odds.nbytes + self.coverage.nbytes
+
+
+def detection_probability(mine_detected: bool, confidence: float, mine_threshold: float) -> float:
+    """
+    Mine probability implied by one detector verdict. Confidence is read as
+    the probability of the reported class; a positive verdict never counts
+    as weaker evidence than the mine threshold, so failsafe 'assume mine'
+    results still mark the cell.
+    """
+    c = min(max(confidence, 0.0), 1.0)
+    if mine_detected:
+        return max(c, 1 - c, mine_threshold)
+    return min(c, 1 - c)
@@ -0,0 +1,269 @@
+"""Split a corridor or polygon between several attachments"""
+
+import math
+import logging
+import dataclasses
+from dataclasses import dataclass
+from typing import Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+from navigation.geodesy import LocalProjection, CorridorFrame
+from .corridor_sweep import CorridorConfig
+from .area_coverage import AreaConfig, best_sweep_angle, _rings_to_edges, _rotate, _sweep_intersections
+from .mine_map import MineMap
+
+
+log = logging.getLogger(__name__)
+
+
+@dataclass
+class Vehicle:
+    """One attachment-carrying drone available for a partitioned mission"""
+    attachment_id: str
+    launch: Tuple[float, float]      # (lat, lon) take-off and landing point
+    flight_time_min: float = 15.0    # Usable battery budget per sortie
+    speed_ms: float = 5.0            # Cruise speed
+    hover_s: float = 2.0             # Hover, capture and detection time per scan cell
+    turn_s: float = 4.0              # Extra time per line turn
+
+
+@dataclass
+class Assignment:
+    """Sub-area given to one vehicle"""
+    vehicle: Vehicle
+    config: Union[CorridorConfig, AreaConfig]
+    estimated_time_s: float          # Transit out and back plus scanning
+    within_budget: bool
+
+
+def _split_sequence(work_s: List[np.ndarray], points: np.ndarray,
+                    vehicles: List[Vehicle], launches: np.ndarray) -> List[Tuple[int, int, float]]:
+    """
+    Split an ordered run of work units (corridor columns or sweep lines)
+    into one contiguous range per vehicle, minimising the time until the
+    last vehicle lands (makespan).
+
+    work_s[k] holds each unit's scan time for vehicle k; points are unit
+    positions used for transit. Vehicles must already be ordered along the
+    run. Binary search on the makespan; for a candidate makespan each
+    vehicle greedily takes the longest range it can fly out to, scan and
+    return from within both the makespan and its battery budget.
+    Returns (first unit, end unit, time) per vehicle.
+    """
+    n = len(points)
+    prefix = [np.concatenate([[0.0], np.cumsum(w)]) for w in work_s]
+    transit = [np.hypot(points[:, 0] - launches[k, 0], points[:, 1] - launches[k, 1]) / v.speed_ms
+               for k, v in enumerate(vehicles)]
+
+    def range_time(k, i, j):
+        # Fly out to the nearer end, scan, fly back from the other end
+        return float(prefix[k][j] - prefix[k][i] + transit[k][i] + transit[k][j - 1])
+
+    def assign(limit, use_budget):
+        ranges, i = [], 0
+        for k, v in enumerate(vehicles):
+            cap = min(limit, v.flight_time_min * 60) if use_budget else limit
+            j = i
+            if k == len(vehicles) - 1:
+                j = n
+            else:
+                while j < n and range_time(k, i, j + 1) <= cap:
+                    j += 1
+            ranges.append((i, j, range_time(k, i, j) if j > i else 0.0))
+            i = j
+        return ranges
+
+    def feasible(limit, use_budget):
+        ranges = assign(limit, use_budget)
+        i, j, t = ranges[-1]
+        cap = min(limit, vehicles[-1].flight_time_min * 60) if use_budget else limit
+        return t <= cap
+
+    upper = max(range_time(k, 0, n) for k in range(len(vehicles)))
+    use_budget = feasible(upper, True)
+    if not use_budget:
+        log.warning("Battery budgets cannot cover the area in one sortie; "
+                    "balancing on time only (missions will need mission_resume)")
+
+    lo, hi = 0.0, upper
+    for _ in range(50):
+        mid = (lo + hi) / 2
+        if feasible(mid, use_budget):
+            hi = mid
+        else:
+            lo = mid
+        if hi - lo < 0.5:
+            break
+    return assign(hi, use_budget)
+
+
+def _order_vehicles(vehicles: List[Vehicle], projection: LocalProjection,
+                    axis_xy: Tuple[float, float]) -> Tuple[List[Vehicle], np.ndarray]:
+    """Vehicles sorted by launch position along axis, with launch points in local metres"""
+    launches = np.array([projection.forward(*v.launch) for v in vehicles])
+    key = launches @ np.asarray(axis_xy)
+    order = np.argsort(key, kind='stable')
+    return [vehicles[k] for k in order], launches[order]
+
+
+def partition_corridor(config: CorridorConfig, vehicles: List[Vehicle]) -> List[Assignment]:
+    """
+    Split a corridor along its length into consecutive sub-corridors, one
+    per vehicle, balanced by flight time including transit.
+    """
+    if not vehicles:
+        raise ValueError("Need at least one vehicle")
+
+    projection = LocalProjection(*config.start)
+    frame = CorridorFrame(config.start, config.goal, projection)
+    cell = config.scan_cell_size_m
+
+    # Units are corridor columns (all lines at one position along the corridor)
+    columns = int(frame.length_m / cell) + 1
+    u = np.linspace(0.0, frame.length_m, columns)
+    e0, n0 = projection.forward(*config.start)
+    points = np.column_stack([e0 + u * frame.dir_e, n0 + u * frame.dir_n])
+
+    ordered, launches = _order_vehicles(vehicles, projection, (frame.dir_e, frame.dir_n))
+    line_change_m = config.corridor_width_m / max(config.num_lines - 1, 1)
+    work = []
+    for v in ordered:
+        per_column = config.num_lines * (v.hover_s + cell / v.speed_ms)
+        # Each sub-corridor turns num_lines - 1 times; spread over its columns
+        work.append(np.full(columns, per_column + (config.num_lines - 1) *
+                            (v.turn_s + line_change_m / v.speed_ms) / max(columns, 1)))
+
+    assignments = []
+    for v, (i, j, t) in zip(ordered, _split_sequence(work, points, ordered, launches)):
+        if j <= i:
+            continue
+        # Fly the sub-corridor starting from the end nearer the launch point
+        start, goal = frame.to_geo(u[i], 0.0), frame.to_geo(u[j - 1], 0.0)
+        if (projection.distance_m(*v.launch, *goal) < projection.distance_m(*v.launch, *start)):
+            start, goal = goal, start
+        sub = dataclasses.replace(config, start=start, goal=goal)
+        assignments.append(Assignment(v, sub, t, t <= v.flight_time_min * 60))
+    return assignments
+
+
+def _clip_ring(ring: np.ndarray, lo: float, hi: float) -> np.ndarray:
+    """Clip a ring (in sweep-frame coordinates) to the strip lo <= y <= hi (Sutherland-Hodgman)"""
+    for bound, keep_above in ((lo, True), (hi, False)):
+        if len(ring) == 0:
+            break
+        out = []
+        prev = ring[-1]
+        prev_in = prev[1] >= bound if keep_above else prev[1] <= bound
+        for cur in ring:
+            cur_in = cur[1] >= bound if keep_above else cur[1] <= bound
+            if cur_in != prev_in:
+                t = (bound - prev[1]) / (cur[1] - prev[1])
+                out.append(prev + t * (cur - prev))
+            if cur_in:
+                out.append(cur)
+            prev, prev_in = cur, cur_in
+        ring = np.array(out)
+    return ring
+
+
+def partition_polygon(config: AreaConfig, vehicles: List[Vehicle]) -> List[Assignment]:
+    """
+    Split a polygon into strips of whole sweep lines, one per vehicle,
+    balanced by flight time including transit. All strips share the sweep
+    angle chosen for the full area so their lines line up.
+    """
+    if not vehicles:
+        raise ValueError("Need at least one vehicle")
+
+    projection = LocalProjection(*config.polygon[0])
+    outer = np.column_stack(projection.forward_many(*np.asarray(config.polygon, dtype=np.float64).T))
+    holes = [np.column_stack(projection.forward_many(*np.asarray(h, dtype=np.float64).T))
+             for h in config.holes]
+    edges = _rings_to_edges([outer] + holes)
+    spacing = config.line_spacing_m
+
+    angle_deg = best_sweep_angle(outer, edges, config)
+    angle = math.radians(angle_deg)
+
+    # Units are sweep lines
+    ys, xs = _sweep_intersections(edges, angle, spacing)
+    valid = ~np.isnan(xs)
+    length = np.nansum(xs[:, 1::2], axis=1) - np.nansum(xs[:, 0::2], axis=1)
+    segments = valid.sum(axis=1) // 2
+    mid_x = np.where(valid.any(axis=1), (np.nanmin(np.where(valid, xs, np.inf), axis=1) +
+                                         np.nanmax(np.where(valid, xs, -np.inf), axis=1)) / 2, 0.0)
+    points = np.column_stack(_rotate(mid_x, ys, -angle))
+
+    # Sweep lines are stacked along the across-track axis
+    ordered, launches = _order_vehicles(vehicles, projection, (-math.sin(angle), math.cos(angle)))
+    work = [length * (v.hover_s / config.scan_cell_size_m + 1 / v.speed_ms) + segments * v.turn_s
+            for v in ordered]
+
+    # Sweep-frame rings for clipping
+    rings = [np.column_stack(_rotate(r[:, 0], r[:, 1], angle)) for r in [outer] + holes]
+
+    assignments = []
+    for v, (i, j, t) in zip(ordered, _split_sequence(work, points, ordered, launches)):
+        if j <= i:
+            continue
+        # Strip boundaries halfway between lines keep every line inside exactly one strip
+        lo, hi = ys[i] - spacing / 2, ys[j - 1] + spacing / 2
+        clipped = [_clip_ring(r, lo, hi) for r in rings]
+        if len(clipped[0]) < 3:
+            continue
+
+        def to_geo(ring):
+            east, north = _rotate(ring[:, 0], ring[:, 1], -angle)
+            lat, lon = projection.inverse_many(east, north)
+            return list(zip(lat.tolist(), lon.tolist()))
+
+        sub = dataclasses.replace(
+            config,
+            polygon=to_geo(clipped[0]),
+            holes=[to_geo(h) for h in clipped[1:] if len(h) >= 3],
+            start=v.launch,
+            sweep_angle_deg=angle_deg
+        )
+        assignments.append(Assignment(v, sub, t, t <= v.flight_time_min * 60))
+    return assignments
+
+
+def mission_commands(mission_id: str, assignments: List[Assignment],
+                     parameters: Optional[dict] = None) -> List[Tuple[str, dict]]:
+    """
+    mission_start commands for each assignment as (attachment_id, payload),
+    in the format MineFinderAttachment._handle_mission_start reads.
+    """
+    commands = []
+    for k, a in enumerate(assignments):
+        params = dict(parameters or {})
+        cfg = a.config
+        params.update({'grid_size_m': cfg.scan_cell_size_m, 'altitude_m': cfg.altitude_m})
+        payload = {'type': 'mission_start', 'mission_id': f"{mission_id}-{k + 1}",
+                   'parent_mission_id': mission_id}
+        if isinstance(cfg, AreaConfig):
+            payload['polygon'] = [{'lat': lat, 'lon': lon} for lat, lon in cfg.polygon]
+            payload['holes'] = [[{'lat': lat, 'lon': lon} for lat, lon in h] for h in cfg.holes]
+            if cfg.start:
+                payload['start'] = {'lat': cfg.start[0], 'lon': cfg.start[1]}
+            params.update({'line_spacing_m': cfg.line_spacing_m, 'sweep_angle_deg': cfg.sweep_angle_deg})
+        else:
+            payload['start'] = {'lat': cfg.start[0], 'lon': cfg.start[1]}
+            payload['goal'] = {'lat': cfg.goal[0], 'lon': cfg.goal[1]}
+            params.update({'corridor_width_m': cfg.corridor_width_m, 'num_lines': cfg.num_lines,
+                           'adaptive': cfg.adaptive, 'coarse_factor': cfg.coarse_factor,
+                           'coarse_altitude_m': cfg.coarse_altitude_m})
+        payload['parameters'] = params
+        commands.append((a.vehicle.attachment_id, payload))
+    return commands
+
+
+def merge_detections(mine_map: MineMap, detections: Iterable[dict]) -> MineMap:
+    """Fold published detection events (any attachment) into one mine map"""
+    for d in detections:
+        if d.get('result') != 'mine':
+            continue
+        position = d['position']
+        mine_map.add(position['lat'], position['lon'], float(d.get('confidence', 0.0)))
+    return mine_map
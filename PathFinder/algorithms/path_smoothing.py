@@ -0,0 +1,165 @@
+"""Reduce grid paths to the few waypoints a vehicle actually needs"""
+
+import math
+from typing import List, Tuple
+
+import numpy as np
+
+
+def segment_clear(grid, a, b, cost_limit: float = 1.0) -> bool:
+    """
+    Whether the straight segment a -> b (local u, v) stays on free cells of
+    the inflated occupancy grid whose cost multiplier does not exceed
+    cost_limit. The segment is sampled every quarter cell.
+    """
+    res = grid.resolution_m
+    length = math.hypot(b[0] - a[0], b[1] - a[1])
+    n = max(int(math.ceil(length / (res / 4))), 1) + 1
+    t = np.linspace(0.0, 1.0, n)
+    ix = np.rint((a[0] + t * (b[0] - a[0]) - grid.u0) / res).astype(np.int64)
+    iy = np.rint((a[1] + t * (b[1] - a[1]) - grid.v0) / res).astype(np.int64)
+    if ix.min() < 0 or iy.min() < 0 or ix.max() >= grid.nx or iy.max() >= grid.ny:
+        return False
+    if grid.blocked[iy + 1, ix + 1].any():
+        return False
+    return bool(grid.cost[iy + 1, ix + 1].max() <= cost_limit + 1e-6)
+
+
+class _PathGeometry:
+    """Original grid path with the checks the simplification stages share"""
+
+    def __init__(self, grid, nodes: List[int]):
+        self.grid = grid
+        self.points = np.array([grid.cell_center(n) for n in nodes], dtype=np.float64)
+        self._costs = grid.cost.ravel()[nodes]
+
+    def clear(self, i: int, j: int, a=None, b=None) -> bool:
+        """
+        Whether a segment may replace the original path between nodes i and j.
+        It must avoid blocked cells and never cross riskier ground than the
+        stretch of path it replaces.
+        """
+        limit = float(self._costs[min(i, j):max(i, j) + 1].max())
+        a = self.points[i] if a is None else a
+        b = self.points[j] if b is None else b
+        return segment_clear(self.grid, a, b, limit)
+
+
+def douglas_peucker(path: _PathGeometry, tolerance_m: float) -> List[int]:
+    """
+    Douglas-Peucker over the original path, returning kept node indices.
+    A span is only collapsed to a straight segment when every dropped point
+    lies within tolerance_m of it and the segment itself passes the safety
+    check; otherwise it is split at the furthest point.
+    """
+    pts = path.points
+    n = len(pts)
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        i, j = stack.pop()
+        if j - i < 2:
+            continue
+        d = pts[j] - pts[i]
+        rel = pts[i + 1:j] - pts[i]
+        norm = math.hypot(d[0], d[1])
+        if norm > 0:
+            dev = np.abs(d[0] * rel[:, 1] - d[1] * rel[:, 0]) / norm
+        else:
+            dev = np.hypot(rel[:, 0], rel[:, 1])
+        k = int(np.argmax(dev))
+        if dev[k] <= tolerance_m and path.clear(i, j):
+            continue
+        # Split at the furthest point, or the middle for a straight but unsafe span
+        split = i + 1 + k if dev[k] > 0 else (i + j) // 2
+        keep[split] = True
+        stack.append((i, split))
+        stack.append((split, j))
+    return np.nonzero(keep)[0].tolist()
+
+
+def shortcut(path: _PathGeometry, idx: List[int]) -> List[int]:
+    """Line-of-sight string pulling: skip every waypoint the previous kept one can see past"""
+    if len(idx) <= 2:
+        return list(idx)
+    result = [idx[0]]
+    anchor, k = idx[0], 1
+    while k < len(idx) - 1:
+        if not path.clear(anchor, idx[k + 1]):
+            anchor = idx[k]
+            result.append(anchor)
+        k += 1
+    result.append(idx[-1])
+    return result
+
+
+def smooth(path: _PathGeometry, idx: List[int], step_m: float) -> np.ndarray:
+    """
+    Centripetal Catmull-Rom spline through the kept waypoints, sampled about
+    every step_m. Spans whose curve fails the safety check stay straight.
+    """
+    pts = path.points[idx]
+    if len(pts) < 3:
+        return pts
+    padded = np.vstack([2 * pts[0] - pts[1], pts, 2 * pts[-1] - pts[-2]])
+
+    out = [pts[0]]
+    for s in range(len(pts) - 1):
+        p0, p1, p2, p3 = padded[s:s + 4]
+        samples = max(int(math.ceil(np.hypot(*(p2 - p1)) / step_m)), 1)
+        curve = _catmull_rom(p0, p1, p2, p3, samples)
+        prev = p1
+        safe = True
+        for q in curve:
+            if not path.clear(idx[s], idx[s + 1], prev, q):
+                safe = False
+                break
+            prev = q
+        out.extend(curve if safe else [p2])
+    return np.array(out)
+
+
+def _catmull_rom(p0, p1, p2, p3, samples: int) -> np.ndarray:
+    """Points on the centripetal Catmull-Rom segment p1 -> p2, excluding p1, including p2"""
+    def knot(t, a, b):
+        return t + max(math.hypot(*(b - a)), 1e-9) ** 0.5
+
+    t0 = 0.0
+    t1 = knot(t0, p0, p1)
+    t2 = knot(t1, p1, p2)
+    t3 = knot(t2, p2, p3)
+    t = np.linspace(t1, t2, samples + 1)[1:, None]
+
+    a1 = (t1 - t) / (t1 - t0) * p0 + (t - t0) / (t1 - t0) * p1
+    a2 = (t2 - t) / (t2 - t1) * p1 + (t - t1) / (t2 - t1) * p2
+    a3 = (t3 - t) / (t3 - t2) * p2 + (t - t2) / (t3 - t2) * p3
+    b1 = (t2 - t) / (t2 - t0) * a1 + (t - t0) / (t2 - t0) * a2
+    b2 = (t3 - t) / (t3 - t1) * a2 + (t - t1) / (t3 - t1) * a3
+    return (t2 - t) / (t2 - t1) * b1 + (t - t1) / (t2 - t1) * b2
+
+
+def simplify_nodes(grid, nodes: List[int], tolerance_m: float = 0.25,
+                   smoothing: bool = False, smooth_step_m: float = 1.0) -> np.ndarray:
+    """
+    Reduce a grid path (flat padded node indices) to local (u, v) waypoints:
+    safety-checked Douglas-Peucker, then line-of-sight shortcutting, then
+    optional spline smoothing. Every output segment stays on free cells of
+    the inflated mine map and on ground no riskier than the original path.
+    """
+    if len(nodes) <= 2:
+        return np.array([grid.cell_center(n) for n in nodes], dtype=np.float64).reshape(-1, 2)
+    path = _PathGeometry(grid, nodes)
+    idx = shortcut(path, douglas_peucker(path, tolerance_m))
+    if smoothing:
+        return smooth(path, idx, smooth_step_m)
+    return path.points[idx]
+
+
+def waypoints_from_nodes(grid, nodes: List[int], config) -> List[Tuple[float, float]]:
+    """(lat, lon) waypoints for a planner path, simplified as PlannerConfig asks"""
+    if not config.simplify_path:
+        return [grid.to_geo(*grid.cell_center(n)) for n in nodes]
+    points = simplify_nodes(grid, nodes, config.simplify_tolerance_m,
+                            config.smooth_path, config.smooth_step_m)
+    return [grid.to_geo(float(u), float(v)) for u, v in points]
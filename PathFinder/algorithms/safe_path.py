@@ -0,0 +1,363 @@
+"""Grid-based safe path planning around detected mines"""
+
+import heapq
+import math
+import logging
+from dataclasses import dataclass
+from typing import List, Tuple, Optional
+
+import numpy as np
+
+from navigation.geodesy import CorridorFrame
+from .path_smoothing import waypoints_from_nodes
+
+
+SQRT2 = math.sqrt(2.0)
+
+
+@dataclass
+class PlannerConfig:
+    """Configuration for safe path planning"""
+    grid_resolution_m: float = 0.5             # Size of one occupancy cell
+    mine_circumvention_radius_m: float = 2.0   # Keep-out radius around each mine
+    corridor_margin_m: float = 0.0             # Extra width usable outside the scanned corridor
+    use_heuristic: bool = True                 # False runs plain Dijkstra
+    coarse_factor: int = 3                     # Fine cells per side of a coarse-search cell (1 = fine search only)
+    coarse_band_cells: int = 1                 # Coarse cells either side of the coarse path open to the fine search
+    risk_weight: float = 4.0                   # Extra cost per unit mine probability on uncertain ground
+    simplify_path: bool = True                 # Reduce the cell path to the waypoints actually needed
+    simplify_tolerance_m: float = 0.25         # Douglas-Peucker deviation allowed per dropped waypoint
+    smooth_path: bool = False                  # Fit a spline through the simplified waypoints
+    smooth_step_m: float = 1.0                 # Spline sample spacing
+
+
+class OccupancyGrid:
+    """
+    Metric occupancy grid aligned with a corridor.
+
+    Cells are indexed in the corridor frame (u along travel, v to the left).
+    Cells are stored row-major (v rows, u columns) with a one-cell blocked
+    border so neighbour lookups never need bounds checks. Each cell also has
+    a cost multiplier (>= 1) applied to every step into it.
+
+    Searches read flat copies of both layers (blocked_flat, cost_flat) that
+    inflate_disk and set_cost keep in step, so a query never re-converts the
+    whole grid.
+    """
+
+    def __init__(self, frame: CorridorFrame, width_m: float,
+                 resolution_m: float = 0.5, margin_m: float = 0.0):
+        self.frame = frame
+        self.resolution_m = resolution_m
+        self.length_m = frame.length_m
+
+        half_width = width_m / 2 + margin_m
+        self.u0 = -margin_m
+        self.v0 = -half_width
+        self.nx = int(math.ceil((self.length_m + 2 * margin_m) / resolution_m)) + 1
+        self.ny = int(math.ceil(2 * half_width / resolution_m)) + 1
+
+        # Padded storage: interior cell (ix, iy) lives at [iy + 1, ix + 1]
+        self.blocked = np.ones((self.ny + 2, self.nx + 2), dtype=np.uint8)
+        self.blocked[1:-1, 1:-1] = 0
+        self.cost = np.ones((self.ny + 2, self.nx + 2), dtype=np.float32)
+        self.stride = self.nx + 2
+
+        self.blocked_flat = bytearray(self.blocked.tobytes())
+        self.cost_flat = [1.0] * self.cost.size
+
+    # --- coordinate transforms ---
+
+    def to_local(self, lat: float, lon: float) -> Tuple[float, float]:
+        """GPS position to corridor frame (u, v) in metres"""
+        return self.frame.to_local(lat, lon)
+
+    def to_geo(self, u: float, v: float) -> Tuple[float, float]:
+        """Corridor frame (u, v) in metres to GPS position (lat, lon)"""
+        return self.frame.to_geo(u, v)
+
+    def cell_of(self, u: float, v: float) -> Optional[Tuple[int, int]]:
+        """Interior cell (ix, iy) containing a local point, or None if outside"""
+        ix = int(round((u - self.u0) / self.resolution_m))
+        iy = int(round((v - self.v0) / self.resolution_m))
+        if 0 <= ix < self.nx and 0 <= iy < self.ny:
+            return ix, iy
+        return None
+
+    def node_of(self, ix: int, iy: int) -> int:
+        """Flat padded index of an interior cell"""
+        return (iy + 1) * self.stride + (ix + 1)
+
+    def cell_center(self, node: int) -> Tuple[float, float]:
+        """Local (u, v) centre of a flat padded index"""
+        py, px = divmod(node, self.stride)
+        return (self.u0 + (px - 1) * self.resolution_m,
+                self.v0 + (py - 1) * self.resolution_m)
+
+    # --- obstacles ---
+
+    def inflate_disk(self, u: float, v: float, radius_m: float) -> np.ndarray:
+        """
+        Block every cell whose centre lies within radius_m of (u, v).
+        Returns the flat padded indices of cells that changed.
+        """
+        res = self.resolution_m
+        cx = (u - self.u0) / res
+        cy = (v - self.v0) / res
+        r = radius_m / res
+
+        x_lo, x_hi = max(int(math.ceil(cx - r)), 0), min(int(math.floor(cx + r)), self.nx - 1)
+        y_lo, y_hi = max(int(math.ceil(cy - r)), 0), min(int(math.floor(cy + r)), self.ny - 1)
+        if x_lo > x_hi or y_lo > y_hi:
+            return np.empty(0, dtype=np.int64)
+
+        xs = np.arange(x_lo, x_hi + 1)
+        ys = np.arange(y_lo, y_hi + 1)
+        disk = (xs[None, :] - cx) ** 2 + (ys[:, None] - cy) ** 2 <= r * r
+
+        window = self.blocked[y_lo + 1:y_hi + 2, x_lo + 1:x_hi + 2]
+        newly = disk & (window == 0)
+        window[newly] = 1
+
+        iy, ix = np.nonzero(newly)
+        nodes = (iy + y_lo + 1) * self.stride + (ix + x_lo + 1)
+        blocked_flat = self.blocked_flat
+        for node in nodes.tolist():
+            blocked_flat[node] = 1
+        return nodes
+
+    def set_cost(self, window, multipliers: np.ndarray) -> np.ndarray:
+        """
+        Set the cost multipliers of an interior (iy0, iy1, ix0, ix1) window.
+        Returns the flat padded indices of cells whose multiplier changed.
+        """
+        iy0, iy1, ix0, ix1 = window
+        view = self.cost[iy0 + 1:iy1 + 1, ix0 + 1:ix1 + 1]
+        changed = view != multipliers
+        view[changed] = multipliers[changed]
+        iy, ix = np.nonzero(changed)
+        nodes = (iy + iy0 + 1) * self.stride + (ix + ix0 + 1)
+        cost_flat = self.cost_flat
+        for node, value in zip(nodes.tolist(), view[changed].tolist()):
+            cost_flat[node] = value
+        return nodes
+
+    def is_blocked(self, node: int) -> bool:
+        """Whether a flat padded index is impassable"""
+        return bool(self.blocked_flat[node])
+
+
+def octile_distance(grid: OccupancyGrid, a: int, b: int) -> float:
+    """
+    Octile distance in metres between two flat padded indices.
+    Admissible and consistent on an 8-connected grid.
+    """
+    ay, ax = divmod(a, grid.stride)
+    by, bx = divmod(b, grid.stride)
+    dx, dy = abs(ax - bx), abs(ay - by)
+    if dx < dy:
+        dx, dy = dy, dx
+    return grid.resolution_m * (dx + (SQRT2 - 1) * dy)
+
+
+def astar(grid: OccupancyGrid, start: int, goal: int, use_heuristic: bool = True,
+          coarse_factor: int = 1, band_cells: int = 1) -> List[int]:
+    """
+    Binary-heap A* over the occupancy grid.
+    Returns the flat padded node indices from start to goal, or [] if unreachable.
+    Diagonal steps may not cut the corner of a blocked cell. Step costs are
+    scaled by the destination cell's cost multiplier. The octile heuristic is
+    evaluated only for the nodes the search actually reaches.
+
+    With coarse_factor > 1 a search on a grid of coarse_factor x coarse_factor
+    blocks runs first, and the fine search only opens cells within band_cells
+    blocks of the coarse path. The result is safe but may be slightly longer
+    than the optimum. The first coarse search treats a block as open if any
+    of its cells is; if the band then holds no path, a block must be open
+    throughout, and failing that the whole grid is searched.
+    """
+    blocked = grid.blocked_flat
+    if blocked[start] or blocked[goal]:
+        return []
+
+    if coarse_factor > 1:
+        for optimistic in (True, False):
+            band = _coarse_band(grid, start, goal, coarse_factor, band_cells, use_heuristic, optimistic)
+            if band is None:
+                continue
+            path = _search(band, grid.cost_flat, grid.stride, grid.resolution_m, start, goal, use_heuristic)
+            if path:
+                return path
+    return _search(blocked, grid.cost_flat, grid.stride, grid.resolution_m, start, goal, use_heuristic)
+
+
+def _coarse_band(grid: OccupancyGrid, start: int, goal: int, factor: int, band_cells: int,
+                 use_heuristic: bool, optimistic: bool) -> Optional[bytearray]:
+    """
+    Blocked layer of the fine grid with everything outside the band around
+    a coarse path closed off, or None if the coarse search finds no path.
+    An optimistic block takes the lowest blocked flag and cost of its cells,
+    a pessimistic one the highest, so its path only crosses open ground.
+    The blocks of the start and goal are always open.
+    """
+    ny, nx = grid.ny, grid.nx
+    cy, cx = -(-ny // factor), -(-nx // factor)
+    combine = np.minimum if optimistic else np.maximum
+
+    def blocks(layer: np.ndarray, fill) -> np.ndarray:
+        """Per-block reduction of an interior layer, with a padded border of fill"""
+        fine = np.full((cy * factor, cx * factor), fill, dtype=layer.dtype)
+        fine[:ny, :nx] = layer[1:-1, 1:-1]
+        # Strided slices: much faster than reducing a 4-d reshape over two axes
+        rows = fine[::factor].copy()
+        for i in range(1, factor):
+            combine(rows, fine[i::factor], out=rows)
+        coarse = np.full((cy + 2, cx + 2), fill, dtype=layer.dtype)
+        inner = coarse[1:-1, 1:-1]
+        inner[:] = rows[:, ::factor]
+        for i in range(1, factor):
+            combine(inner, rows[:, i::factor], out=inner)
+        return coarse
+
+    stride = cx + 2
+
+    def block_of(node: int) -> int:
+        py, px = divmod(node, grid.stride)
+        return ((py - 1) // factor + 1) * stride + (px - 1) // factor + 1
+
+    coarse_start, coarse_goal = block_of(start), block_of(goal)
+    coarse_blocked = bytearray(blocks(grid.blocked, 1).tobytes())
+    coarse_blocked[coarse_start] = coarse_blocked[coarse_goal] = 0
+    coarse_path = _search(coarse_blocked, blocks(grid.cost, 1.0).ravel().tolist(), stride,
+                          grid.resolution_m * factor, coarse_start, coarse_goal, use_heuristic)
+    if not coarse_path:
+        return None
+
+    inside = np.zeros(len(coarse_blocked), dtype=bool)
+    inside[coarse_path] = True
+    inside = inside.reshape(cy + 2, cx + 2)
+    for _ in range(band_cells):
+        grown = inside.copy()
+        grown[1:] |= inside[:-1]
+        grown[:-1] |= inside[1:]
+        inside = grown.copy()
+        inside[:, 1:] |= grown[:, :-1]
+        inside[:, :-1] |= grown[:, 1:]
+
+    band = grid.blocked.copy()
+    outside = ~np.repeat(np.repeat(inside[1:-1, 1:-1], factor, axis=0), factor, axis=1)[:ny, :nx]
+    band[1:-1, 1:-1] |= outside
+    return bytearray(band.tobytes())
+
+
+def _search(blocked, cell_cost: List[float], s: int, res: float, start: int, goal: int,
+            use_heuristic: bool) -> List[int]:
+    """A* over flat padded blocked/cost layers with row stride s and cell size res"""
+    diag = res * SQRT2
+    # Octile distance: res * (dx + dy) + (diag - 2 * res) * min(dx, dy); zero for Dijkstra
+    straight = res if use_heuristic else 0.0
+    corner = diag - 2 * res if use_heuristic else 0.0
+    gy, gx = divmod(goal, s)
+    moves = ((1, res, 0, 0), (-1, res, 0, 0), (s, res, 0, 0), (-s, res, 0, 0),
+             (s + 1, diag, 1, s), (s - 1, diag, -1, s),
+             (-s + 1, diag, 1, -s), (-s - 1, diag, -1, -s))
+
+    inf = math.inf
+    g = [inf] * len(blocked)
+    parent = {start: -1}
+    closed = bytearray(len(blocked))
+    g[start] = 0.0
+    push, pop = heapq.heappush, heapq.heappop
+    open_heap = [(0.0, start)]
+
+    while open_heap:
+        _, node = pop(open_heap)
+        if node == goal:
+            break
+        if closed[node]:
+            continue
+        closed[node] = 1
+        g_node = g[node]
+
+        for step, cost, sx, sy in moves:
+            nb = node + step
+            if blocked[nb] or closed[nb]:
+                continue
+            # Diagonal moves may not clip a blocked corner
+            if sx and (blocked[node + sx] or blocked[node + sy]):
+                continue
+            ng = g_node + cost * cell_cost[nb]
+            if ng < g[nb]:
+                g[nb] = ng
+                parent[nb] = node
+                ny, nx = divmod(nb, s)
+                dx = nx - gx if nx > gx else gx - nx
+                dy = ny - gy if ny > gy else gy - ny
+                push(open_heap, (ng + straight * (dx + dy) + corner * (dx if dx < dy else dy), nb))
+    else:
+        return []
+
+    path = []
+    node = goal
+    while node != -1:
+        path.append(node)
+        node = parent[node]
+    path.reverse()
+    return path
+
+
+class SafePathPlanner:
+    """
+    Plans a safe ground path along a corridor, keeping every waypoint at
+    least mine_circumvention_radius_m away from detected mines.
+    """
+
+    def __init__(self, start: Tuple[float, float], goal: Tuple[float, float],
+                 corridor_width_m: float, config: Optional[PlannerConfig] = None,
+                 frame: Optional[CorridorFrame] = None):
+        self.config = config or PlannerConfig()
+        self.start = start
+        self.goal = goal
+        self.grid = OccupancyGrid(
+            frame or CorridorFrame(start, goal), corridor_width_m,
+            resolution_m=self.config.grid_resolution_m,
+            margin_m=self.config.corridor_margin_m
+        )
+        self.mines: List[Tuple[float, float]] = []
+        self.log = logging.getLogger(__name__)
+
+    def add_mine(self, lat: float, lon: float):
+        """Mark a mine and its circumvention radius as impassable"""
+        self.mines.append((lat, lon))
+        u, v = self.grid.to_local(lat, lon)
+        self.grid.inflate_disk(u, v, self.config.mine_circumvention_radius_m)
+
+    def find_path(self, start: Optional[Tuple[float, float]] = None,
+                  goal: Optional[Tuple[float, float]] = None) -> List[Tuple[float, float]]:
+        """
+        Find the shortest safe path between two GPS positions (defaults to
+        the corridor start and goal). Returns (lat, lon) waypoints or [],
+        simplified unless the config turns that off.
+        """
+        start = start or self.start
+        goal = goal or self.goal
+
+        start_cell = self.grid.cell_of(*self.grid.to_local(*start))
+        goal_cell = self.grid.cell_of(*self.grid.to_local(*goal))
+        if start_cell is None or goal_cell is None:
+            self.log.warning("Start or goal outside planning grid")
+            return []
+
+        start_node = self.grid.node_of(*start_cell)
+        goal_node = self.grid.node_of(*goal_cell)
+        if self.grid.is_blocked(start_node) or self.grid.is_blocked(goal_node):
+            self.log.warning("Start or goal within mine circumvention radius")
+            return []
+
+        nodes = astar(self.grid, start_node, goal_node, self.config.use_heuristic,
+                      self.config.coarse_factor, self.config.coarse_band_cells)
+        if not nodes:
+            self.log.warning(f"No safe path found around {len(self.mines)} mines")
+            return []
+
+        return waypoints_from_nodes(self.grid, nodes, self.config)
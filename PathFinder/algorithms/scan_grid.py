@@ -0,0 +1,174 @@
+"""Array-backed storage for scan cells"""
+
+from typing import Iterator, Optional
+
+import numpy as np
+
+
+# Per-cell status codes stored in ScanGrid.status
+STATUS_UNSCANNED = 0
+STATUS_CLEAR = 1
+STATUS_MINE = 2
+STATUS_UNCERTAIN = 3  # Scanned, but fused evidence is between the clear and mine thresholds
+
+_RESULT_BY_STATUS = {STATUS_UNSCANNED: None, STATUS_CLEAR: 'clear', STATUS_MINE: 'mine',
+                     STATUS_UNCERTAIN: 'uncertain'}
+_STATUS_BY_RESULT = {v: k for k, v in _RESULT_BY_STATUS.items()}
+
+
+class ScanCell:
+    """
+    Lightweight view of one cell in a ScanGrid.
+    Exposes the same attributes as the old per-cell dataclass; reads and
+    writes go straight to the grid arrays.
+    """
+
+    __slots__ = ('_grid', '_idx')
+
+    def __init__(self, grid: 'ScanGrid', idx: int):
+        self._grid = grid
+        self._idx = idx
+
+    @property
+    def index(self) -> int:
+        return self._idx
+
+    @property
+    def x_m(self) -> float:
+        return float(self._grid.x_m[self._idx])
+
+    @property
+    def y_m(self) -> float:
+        return float(self._grid.y_m[self._idx])
+
+    @property
+    def lat(self) -> float:
+        return float(self._grid.lat[self._idx])
+
+    @property
+    def lon(self) -> float:
+        return float(self._grid.lon[self._idx])
+
+    @property
+    def scanned(self) -> bool:
+        return bool(self._grid.status[self._idx] != STATUS_UNSCANNED)
+
+    @scanned.setter
+    def scanned(self, value: bool):
+        if not value:
+            self._grid.status[self._idx] = STATUS_UNSCANNED
+        elif self._grid.status[self._idx] == STATUS_UNSCANNED:
+            self._grid.status[self._idx] = STATUS_CLEAR
+
+    @property
+    def result(self) -> Optional[str]:
+        return _RESULT_BY_STATUS[int(self._grid.status[self._idx])]
+
+    @result.setter
+    def result(self, value: Optional[str]):
+        self._grid.status[self._idx] = _STATUS_BY_RESULT[value]
+
+    @property
+    def confidence(self) -> float:
+        return float(self._grid.confidence[self._idx])
+
+    @confidence.setter
+    def confidence(self, value: float):
+        self._grid.confidence[self._idx] = value
+
+    def __repr__(self) -> str:
+        return (f"ScanCell(x_m={self.x_m:.2f}, y_m={self.y_m:.2f}, lat={self.lat:.7f}, "
+                f"lon={self.lon:.7f}, scanned={self.scanned}, result={self.result!r}, "
+                f"confidence={self.confidence:.2f})")
+
+
+class ScanGrid:
+    """
+    Struct-of-arrays store for scan cells, kept in visiting order.
+
+    Coordinates, status codes and confidences live in flat NumPy arrays so
+    large grids cost a few dozen bytes per cell and can be built, queried
+    and summarised with vectorized operations.
+    """
+
+    _FIELDS = (('lat', np.float64), ('lon', np.float64), ('x_m', np.float32), ('y_m', np.float32),
+               ('line', np.int32), ('col', np.int32), ('status', np.uint8), ('confidence', np.float32))
+
+    def __init__(self, lat, lon, x_m, y_m, line=None, col=None):
+        lat = np.asarray(lat, dtype=np.float64).ravel()
+        n = lat.size
+        self._size = 0
+        self._buffers = {name: np.zeros(n, dtype=dtype) for name, dtype in self._FIELDS}
+        self._bind()
+        self.append(lat, lon, x_m, y_m, line, col)
+
+    def _bind(self):
+        """Expose the used part of each buffer as a public array attribute"""
+        for name, _ in self._FIELDS:
+            setattr(self, name, self._buffers[name][:self._size])
+
+    def append(self, lat, lon, x_m, y_m, line=None, col=None) -> np.ndarray:
+        """
+        Add unscanned cells at the end of the grid (amortised O(1) per cell).
+        Returns the indices of the new cells.
+        """
+        lat = np.asarray(lat, dtype=np.float64).ravel()
+        n = lat.size
+        columns = {'lat': lat, 'lon': lon, 'x_m': x_m, 'y_m': y_m,
+                   'line': 0 if line is None else line, 'col': 0 if col is None else col}
+        for name in ('lon', 'x_m', 'y_m'):
+            if np.size(columns[name]) != n:
+                raise ValueError("ScanGrid coordinate arrays must have equal length")
+
+        start, end = self._size, self._size + n
+        capacity = self._buffers['lat'].size
+        if end > capacity:
+            new_capacity = max(end, capacity * 2, 16)
+            for name, buf in self._buffers.items():
+                grown = np.zeros(new_capacity, dtype=buf.dtype)
+                grown[:start] = buf[:start]
+                self._buffers[name] = grown
+
+        for name, values in columns.items():
+            self._buffers[name][start:end] = np.ravel(values)
+        self._buffers['status'][start:end] = STATUS_UNSCANNED
+        self._buffers['confidence'][start:end] = 0.0
+
+        self._size = end
+        self._bind()
+        return np.arange(start, end)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, idx: int) -> ScanCell:
+        n = len(self)
+        if idx < 0:
+            idx += n
+        if not 0 <= idx < n:
+            raise IndexError("scan cell index out of range")
+        return ScanCell(self, idx)
+
+    def __iter__(self) -> Iterator[ScanCell]:
+        for idx in range(len(self)):
+            yield ScanCell(self, idx)
+
+    def mark(self, idx: int, mine_detected: bool, confidence: float, status: Optional[int] = None):
+        """Store the detection result for a cell (status overrides the binary verdict)"""
+        if status is None:
+            status = STATUS_MINE if mine_detected else STATUS_CLEAR
+        self.status[idx] = status
+        self.confidence[idx] = confidence
+
+    def count(self, status: int) -> int:
+        """Number of cells with the given status code"""
+        return int(np.count_nonzero(self.status == status))
+
+    def scanned_count(self) -> int:
+        """Number of cells that have a result"""
+        return int(np.count_nonzero(self.status != STATUS_UNSCANNED))
+
+    def nbytes(self) -> int:
+        """Memory held by the cell arrays"""
+        return sum(a.nbytes for a in (self.lat, self.lon, self.x_m, self.y_m,
+                                      self.line, self.col, self.status, self.confidence))
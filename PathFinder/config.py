@@ -18,6 +18,7 @@ class MQTTConfig:
     use_tls: bool = os.getenv("MQTT_USE_TLS", "true").lower() == "true"
     username: Optional[str] = os.getenv("MQTT_USERNAME")
     password: Optional[str] = os.getenv("MQTT_PASSWORD")
+    publish_queue: int = int(os.getenv("MQTT_PUBLISH_QUEUE", "64"))  # Messages waiting on the publisher thread
 
 
 @dataclass
@@ -28,6 +29,8 @@ class DroneConfig:
     default_altitude_m: float = float(os.getenv("DEFAULT_ALTITUDE_M", "10.0"))
     default_speed_ms: float = float(os.getenv("DEFAULT_SPEED_MS", "5.0"))
     waypoint_accept_radius_m: float = float(os.getenv("WAYPOINT_ACCEPT_RADIUS_M", "2.0"))
+    scan_mode: str = os.getenv("SCAN_MODE", "stop")  # stop (hover at each cell) | continuous (fly lines, capture in flight)
+    scan_speed_ms: float = float(os.getenv("SCAN_SPEED_MS", "2.0"))  # Ground speed along lines in continuous mode
 
 
 @dataclass
@@ -55,6 +58,12 @@ class SensorConfig:
     type: str = os.getenv("SENSOR_TYPE", "simulator")  # simulator | flir_vue_pro
     flir_device_id: int = int(os.getenv("FLIR_DEVICE_ID", "0"))
     test_images_dir: Optional[str] = os.getenv("TEST_IMAGES_DIR", "./test_images")
+    test_images_pool: str = os.getenv("TEST_IMAGES_POOL", "off")  # off (decode every capture) | memory | mmap (.npy cache)
+    test_images_pool_mb: float = float(os.getenv("TEST_IMAGES_POOL_MB", "512"))  # memory: budget before LRU eviction
+    test_images_cache_dir: str = os.getenv("TEST_IMAGES_CACHE_DIR", "")  # mmap cache (default: <TEST_IMAGES_DIR>/.image_pool)
+    capture_hz: float = float(os.getenv("CAPTURE_HZ", "5.0"))  # Frame rate in continuous scan mode
+    capture_latency_ms: float = float(os.getenv("CAPTURE_LATENCY_MS", "0"))  # Exposure to frame timestamp
+    flir_ring_frames: int = int(os.getenv("FLIR_RING_FRAMES", "4"))  # Newest frames kept by the grabber thread
 
 
 @dataclass
@@ -63,6 +72,11 @@ class SimulatorConfig:
     mine_probability: float = float(os.getenv("MINE_PROBABILITY", "0.05"))
     simulated_speed_ms: float = float(os.getenv("SIM_SPEED_MS", "2.0"))
     telemetry_hz: float = float(os.getenv("TELEMETRY_HZ", "5.0"))
+    detector: str = os.getenv("SIM_DETECTOR", "random")  # random (coin flip at MINE_PROBABILITY) | minefield
+    seed: int = int(os.getenv("SIM_SEED", "0"))  # Minefield layout and detector noise
+    mine_density_ha: float = float(os.getenv("SIM_MINE_DENSITY_HA", "20"))
+    detection_rate: float = float(os.getenv("SIM_DETECTION_RATE", "0.95"))  # Surface mine, frame centre, default altitude
+    false_alarm_rate: float = float(os.getenv("SIM_FALSE_ALARM_RATE", "0.02"))
 
 
 @dataclass
@@ -71,6 +85,29 @@ class MLConfig:
     checkpoint_path: str = os.getenv("ML_CHECKPOINT", "./demo-MiniCenter/fold_1_best.pt")
     confidence_threshold: float = float(os.getenv("ML_CONFIDENCE_THRESHOLD", "0.5"))
     device: str = os.getenv("ML_DEVICE", "cpu")  # cpu | cuda
+    backend: str = os.getenv("ML_BACKEND", "torch")  # torch | torchscript | onnx | int8
+    model_path: str = os.getenv("ML_MODEL_PATH", "")  # Exported model (default: next to the checkpoint)
+    threads: int = int(os.getenv("ML_THREADS", "0"))  # Inference CPU threads, 0 = library default
+    batch_size: int = int(os.getenv("ML_BATCH_SIZE", "4"))  # Frames per inference batch
+    batch_wait_ms: float = float(os.getenv("ML_BATCH_WAIT_MS", "20"))  # Max wait to fill a batch
+    queue_depth: int = int(os.getenv("ML_QUEUE_DEPTH", "8"))  # Frames waiting for inference before capture blocks
+    worker_process: bool = os.getenv("ML_WORKER_PROCESS", "false").lower() == "true"  # Run the model in its own process
+    worker_slots: int = int(os.getenv("ML_WORKER_SLOTS", "8"))  # Shared-memory frame slots for the worker
+    frames_per_cell: int = int(os.getenv("ML_FRAMES_PER_CELL", "1"))  # Frames fused into one cell verdict
+    fusion: str = os.getenv("ML_FUSION", "mean")  # mean | max | vote
+    early_stop_confidence: float = float(os.getenv("ML_EARLY_STOP_CONFIDENCE", "0.9"))  # Stop adding frames once this sure
+
+
+@dataclass
+class RecorderConfig:
+    """Flight recorder: every frame, pose and detection of a mission on disk"""
+    enabled: bool = os.getenv("RECORDER_ENABLED", "false").lower() == "true"
+    directory: str = os.getenv("RECORDER_DIR", "./recordings")  # One subdirectory per mission
+    codec: str = os.getenv("RECORDER_CODEC", "jpeg")  # jpeg | raw (lossless, ~30 MB/s at 30 fps 640x512)
+    jpeg_quality: int = int(os.getenv("RECORDER_JPEG_QUALITY", "90"))
+    segment_mb: float = float(os.getenv("RECORDER_SEGMENT_MB", "256"))  # Start a new segment file past this size
+    queue_mb: float = float(os.getenv("RECORDER_QUEUE_MB", "64"))  # Frames waiting for the writer; more are dropped
+    sync_s: float = float(os.getenv("RECORDER_SYNC_S", "1.0"))  # fsync interval
 
 
 @dataclass
@@ -79,6 +116,7 @@ class AttachmentConfig:
     attachment_id: str = os.getenv("ATTACHMENT_ID", "minefinder-pi-001")
     attachment_name: str = os.getenv("ATTACHMENT_NAME", "MineFinder Drone Unit 1")
     mode: str = os.getenv("MODE", "simulator")  # simulator | real
+    checkpoint_dir: str = os.getenv("CHECKPOINT_DIR", "./checkpoints")  # Mission state for mission_resume
     
     mqtt: MQTTConfig = field(default_factory=MQTTConfig)
     drone: DroneConfig = field(default_factory=DroneConfig)
@@ -87,6 +125,7 @@ class AttachmentConfig:
     sensor: SensorConfig = field(default_factory=SensorConfig)
     simulator: SimulatorConfig = field(default_factory=SimulatorConfig)
     ml: MLConfig = field(default_factory=MLConfig)
+    recorder: RecorderConfig = field(default_factory=RecorderConfig)
 
 
 # Global config instance
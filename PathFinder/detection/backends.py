@@ -0,0 +1,220 @@
+"""Inference backends for the mine classifier: eager torch, TorchScript, ONNX Runtime, int8"""
+
+import io
+import copy
+import os
+import sys
+import platform
+from typing import Any, Dict, Union
+
+import numpy as np
+
+try:
+    import torch
+    TORCH_AVAILABLE = True
+except ImportError:
+    TORCH_AVAILABLE = False
+
+try:
+    import onnxruntime as ort
+    ONNXRUNTIME_AVAILABLE = True
+except ImportError:
+    ONNXRUNTIME_AVAILABLE = False
+
+
+BACKENDS = ('torch', 'torchscript', 'onnx', 'int8')
+
+# File written by the export tool for each converted backend, next to the checkpoint
+EXPORT_SUFFIXES = {
+    'torchscript': '.ts',
+    'onnx': '.onnx',
+    'int8': '.int8.ts',
+}
+
+
+def export_path(checkpoint_path: str, backend: str) -> str:
+    """Where the export tool writes (and MineDetector looks for) a converted model"""
+    return os.path.splitext(checkpoint_path)[0] + EXPORT_SUFFIXES[backend]
+
+
+def load_reference_model(checkpoint_path: str):
+    """
+    The trained checkpoint through the EXP_T-ML-LWIR LandmineDetector wrapper.
+    The wrapper exposes the torch module as .model and its device as .device.
+    """
+    ml_path = os.path.join(os.path.dirname(__file__), '..', 'EXP_T-ML-LWIR')
+    if not os.path.exists(ml_path):
+        raise FileNotFoundError(f"ML path not found: {ml_path}")
+    if ml_path not in sys.path:
+        sys.path.insert(0, ml_path)
+    from main import LandmineDetector
+    return LandmineDetector(checkpoint_path)
+
+
+def wrapper_input_spec(wrapper) -> Dict[str, Any]:
+    """
+    Input size, normalisation and mine class index the wrapper declares.
+    
+    Looks for a torchvision-style .transform (the last Resize/CenterCrop
+    size, Normalize mean and std) and for .class_names or .classes (the
+    first name containing 'mine' that is not a negation). Only what the
+    wrapper exposes is returned; the caller keeps its defaults for the rest.
+    """
+    spec = {}
+    for step in getattr(getattr(wrapper, 'transform', None), 'transforms', ()):
+        size = getattr(step, 'size', None)
+        if isinstance(size, int) or (isinstance(size, (list, tuple)) and len(size) in (1, 2)
+                                     and len(set(size)) == 1):
+            spec['size'] = int(size if isinstance(size, int) else size[0])
+        if hasattr(step, 'mean') and hasattr(step, 'std'):
+            spec['mean'] = np.asarray(step.mean, dtype=np.float32)
+            spec['std'] = np.asarray(step.std, dtype=np.float32)
+    names = getattr(wrapper, 'class_names', None) or getattr(wrapper, 'classes', None)
+    if isinstance(names, (list, tuple)):
+        for index, name in enumerate(names):
+            words = str(name).lower().replace('-', '_').replace(' ', '_').split('_')
+            if any('mine' in word for word in words) and not {'no', 'non', 'not'} & set(words):
+                spec['mine_class'] = index
+                break
+    return spec
+
+
+def mine_probabilities(logits: np.ndarray, mine_class: int = 1) -> np.ndarray:
+    """Probability of the mine class (index mine_class), or of a single sigmoid output"""
+    logits = np.asarray(logits, dtype=np.float64)
+    if logits.shape[1] == 1:
+        return 1.0 / (1.0 + np.exp(-logits[:, 0]))
+    z = logits - logits.max(axis=1, keepdims=True)
+    e = np.exp(z)
+    return e[:, mine_class] / e.sum(axis=1)
+
+
+def set_threads(threads: int):
+    """Limit torch intra-op threads (0 keeps the library default)"""
+    if threads and TORCH_AVAILABLE:
+        torch.set_num_threads(threads)
+
+
+class TorchBackend:
+    """Runs a torch module, eager or TorchScript, on a float32 NCHW batch"""
+
+    def __init__(self, module, device: str = 'cpu', name: str = 'torch'):
+        self.name = name
+        self.device = torch.device(device) if isinstance(device, str) else device
+        self.module = module.eval() if hasattr(module, 'eval') else module
+
+    def __call__(self, batch: np.ndarray) -> np.ndarray:
+        """(n, 3, H, W) float32 -> (n, classes) logits"""
+        # from_numpy shares memory with the preprocessing buffer; CPU inference needs no copy
+        x = torch.from_numpy(batch).to(self.device, non_blocking=True)
+        with torch.inference_mode():
+            return self.module(x).float().cpu().numpy()
+
+
+class OnnxBackend:
+    """Runs an exported ONNX graph with ONNX Runtime"""
+
+    name = 'onnx'
+
+    def __init__(self, model: Union[str, bytes], device: str = 'cpu', threads: int = 0):
+        if not ONNXRUNTIME_AVAILABLE:
+            raise RuntimeError("onnxruntime is not installed")
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+        providers = ['CPUExecutionProvider']
+        if str(device).startswith('cuda') and 'CUDAExecutionProvider' in ort.get_available_providers():
+            providers.insert(0, 'CUDAExecutionProvider')
+        self.session = ort.InferenceSession(model, options, providers=providers)
+        self.input_name = self.session.get_inputs()[0].name
+
+    def __call__(self, batch: np.ndarray) -> np.ndarray:
+        return self.session.run(None, {self.input_name: batch})[0]
+
+
+def _example_input(net, size: int) -> 'torch.Tensor':
+    """Tracing input on the same device as the module's weights"""
+    param = next(net.parameters(), None)
+    return torch.zeros(1, 3, size, size, device=param.device if param is not None else 'cpu')
+
+
+def _select_quantized_engine():
+    """qnnpack is the int8 kernel set for ARM (Raspberry Pi); fbgemm is the x86 default"""
+    engines = torch.backends.quantized.supported_engines
+    if platform.machine().lower() in ('aarch64', 'arm64', 'armv7l') and 'qnnpack' in engines:
+        torch.backends.quantized.engine = 'qnnpack'
+
+
+def to_torchscript(net, size: int):
+    """Trace and freeze: weights become constants and conv + batch norm are folded"""
+    net = net.eval()
+    with torch.no_grad():
+        traced = torch.jit.trace(net, _example_input(net, size))
+    return torch.jit.freeze(traced)
+
+
+def to_int8(net, size: int):
+    """
+    Dynamic int8 quantization: Linear weights are stored as int8 and
+    activations quantized on the fly. Convolutions stay float32, so the
+    gain depends on how much of the network is fully connected.
+    """
+    _select_quantized_engine()
+    # Quantized kernels are CPU only; convert a copy so the float model stays usable
+    cpu_net = copy.deepcopy(net).cpu().eval()
+    quantized = torch.ao.quantization.quantize_dynamic(cpu_net, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+    with torch.no_grad():
+        return torch.jit.trace(quantized, _example_input(quantized, size))
+
+
+def to_onnx(net, size: int, f: Union[str, io.BytesIO]):
+    """ONNX graph with a dynamic batch dimension"""
+    net = net.eval()
+    torch.onnx.export(
+        net, _example_input(net, size), f,
+        input_names=['input'], output_names=['logits'],
+        dynamic_axes={'input': {0: 'batch'}, 'logits': {0: 'batch'}},
+        opset_version=17,
+    )
+
+
+def backend_from_module(name: str, net, device: str = 'cpu', size: int = 224, threads: int = 0):
+    """Convert an in-memory torch module for the named backend (no files written)"""
+    if name == 'torch':
+        return TorchBackend(net.to(device), device)
+    if name == 'torchscript':
+        return TorchBackend(to_torchscript(net.to(device), size), device, name)
+    if name == 'int8':
+        return TorchBackend(to_int8(net, size), 'cpu', name)
+    if name == 'onnx':
+        buffer = io.BytesIO()
+        to_onnx(net, size, buffer)
+        return OnnxBackend(buffer.getvalue(), device, threads)
+    raise ValueError(f"Unknown inference backend: {name} (expected one of {', '.join(BACKENDS)})")
+
+
+def backend_from_file(name: str, path: str, device: str = 'cpu', threads: int = 0):
+    """Load a model written by the export tool"""
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Exported model not found: {path} (run python -m detection.export_model)")
+    if name == 'onnx':
+        return OnnxBackend(path, device, threads)
+    if name in ('torchscript', 'int8'):
+        if name == 'int8':
+            _select_quantized_engine()
+            device = 'cpu'
+        return TorchBackend(torch.jit.load(path, map_location=device), device, name)
+    raise ValueError(f"Backend {name} has no exported file format")
+
+
+def save_backend_model(name: str, net, path: str, size: int = 224):
+    """Convert net for the named backend and write it to path"""
+    if name == 'onnx':
+        to_onnx(net, size, path)
+    elif name == 'torchscript':
+        torch.jit.save(to_torchscript(net, size), path)
+    elif name == 'int8':
+        torch.jit.save(to_int8(net, size), path)
+    else:
+        raise ValueError(f"Backend {name} has no exported file format")
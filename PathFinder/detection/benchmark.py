@@ -0,0 +1,589 @@
+#!/usr/bin/env python3
+"""
+Detector benchmarks.
+
+Usage (from the PathFinder directory):
+    python -m detection.benchmark
+    python -m detection.benchmark --frames 500 --width 640 --height 512
+    python -m detection.benchmark --batch-sizes 1 2 4 8 16 --threads 4
+    python -m detection.benchmark --batch-sizes --backends torch torchscript onnx int8
+    python -m detection.benchmark --batch-sizes --backends torch onnx --checkpoint ./demo-MiniCenter/fold_1_best.pt
+    python -m detection.benchmark --batch-sizes --minefield-cells 1000000 4000000
+
+Detector harness (MineDetector end to end, per mode/backend, frame size and batch size):
+    python -m detection.benchmark --batch-sizes --detector simulator torch onnx --sizes 640x512 320x256 --json out.json
+    python -m detection.benchmark --batch-sizes --detector int8 --images ./test_images --detector-batch 1 4 8
+
+Control-plane jitter under full inference load, in-process versus worker process:
+    python -m detection.benchmark --batch-sizes --control-jitter 10
+
+Every run can be written to a JSON file (--json) together with the commit,
+host and library versions, so results can be compared across commits and
+hardware.
+"""
+
+import argparse
+import glob
+import json
+import os
+import platform
+import queue
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from typing import List, Optional
+
+try:
+    import resource
+    RESOURCE_AVAILABLE = True
+except ImportError:
+    RESOURCE_AVAILABLE = False
+
+import numpy as np
+from PIL import Image
+
+from config import config
+from .mine_detector import MineDetector, Preprocessor, INPUT_SIZE, IMAGENET_MEAN, IMAGENET_STD, TORCH_AVAILABLE, \
+    CV2_AVAILABLE
+from .inference_queue import InferenceQueue
+from .backends import BACKENDS, backend_from_module, load_reference_model, mine_probabilities, set_threads
+from .minefield import DetectorModel, Minefield, MinefieldConfig, SimulatedDetector
+from .process_detector import ProcessDetector
+from sensors.frame import Frame
+
+if CV2_AVAILABLE:
+    import cv2
+
+
+def _legacy_preprocess(image: Image.Image) -> np.ndarray:
+    """Previous per-frame path: JPEG to a temp file, read back, decode, resize, normalise"""
+    with tempfile.NamedTemporaryFile(suffix='.jpg', delete=False) as f:
+        temp_path = f.name
+        image.save(temp_path)
+    try:
+        loaded = Image.open(temp_path).convert('RGB').resize((INPUT_SIZE, INPUT_SIZE), Image.BILINEAR)
+        x = np.asarray(loaded, dtype=np.float32) / 255.0
+        x = (x - IMAGENET_MEAN) / IMAGENET_STD
+        return x.transpose(2, 0, 1)[None].copy()
+    finally:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+
+
+def _percentiles(samples) -> dict:
+    ms = np.asarray(samples) * 1000
+    return {'p50_ms': float(np.percentile(ms, 50)), 'p95_ms': float(np.percentile(ms, 95)),
+            'p99_ms': float(np.percentile(ms, 99)), 'mean_ms': float(ms.mean())}
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process so far (None where unsupported)"""
+    if not RESOURCE_AVAILABLE:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / 2**20 if sys.platform == 'darwin' else peak / 2**10
+
+
+def environment() -> dict:
+    """Commit, host and library versions the numbers were measured with"""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    versions = {'python': platform.python_version(), 'numpy': np.__version__}
+    for name in ('torch', 'onnxruntime', 'cv2'):
+        module = sys.modules.get(name)
+        if module is not None:
+            versions[name] = getattr(module, '__version__', 'unknown')
+    return {
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'commit': commit,
+        'host': platform.node(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpus': os.cpu_count(),
+        'versions': versions,
+    }
+
+
+def bench_preprocess(frames: int, width: int, height: int, seed: int) -> dict:
+    """Per-frame preprocessing latency: temp-file JPEG round trip versus in-memory buffers"""
+    rng = np.random.default_rng(seed)
+    pool = [rng.integers(0, 256, (height, width, 3), dtype=np.uint8) for _ in range(8)]
+    images = [Image.fromarray(a) for a in pool]
+    preprocess = Preprocessor()
+
+    legacy, from_image, from_array = [], [], []
+    for k in range(frames):
+        t0 = time.perf_counter()
+        _legacy_preprocess(images[k % len(images)])
+        t1 = time.perf_counter()
+        preprocess(np.asarray(images[k % len(images)]))
+        t2 = time.perf_counter()
+        preprocess(pool[k % len(pool)])
+        t3 = time.perf_counter()
+        legacy.append(t1 - t0)
+        from_image.append(t2 - t1)
+        from_array.append(t3 - t2)
+
+    # Same image through both paths; the JPEG round trip is lossy
+    a = _legacy_preprocess(images[0])
+    b = preprocess(pool[0])
+    return {
+        'legacy': _percentiles(legacy),
+        'image': _percentiles(from_image),
+        'array': _percentiles(from_array),
+        'max_abs_diff': float(np.abs(a - b).max()),
+    }
+
+
+def _bgr_to_rgb(frame: np.ndarray) -> np.ndarray:
+    return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB) if CV2_AVAILABLE else np.ascontiguousarray(frame[:, :, ::-1])
+
+
+def bench_sensor_path(frames: int, width: int, height: int, seed: int) -> dict:
+    """
+    Grabbed BGR buffer to model input: the previous sensor path (colour
+    conversion, PIL image, array again) versus a BGR Frame reordered inside
+    preprocessing. Counts the bytes allocated per frame on each path.
+    """
+    import tracemalloc
+
+    rng = np.random.default_rng(seed)
+    pool = [rng.integers(0, 256, (height, width, 3), dtype=np.uint8) for _ in range(8)]
+    preprocess = Preprocessor()
+
+    def via_pil(bgr):
+        image = Image.fromarray(_bgr_to_rgb(bgr))
+        preprocess(np.asarray(image.convert('RGB')))
+
+    def via_frame(bgr):
+        frame = Frame(bgr, channels='BGR')
+        preprocess(frame.data, channels=frame.channels)
+
+    result = {}
+    for name, path in (('pil', via_pil), ('frame', via_frame)):
+        for k in range(3):
+            path(pool[k % len(pool)])
+        samples = []
+        for k in range(frames):
+            t0 = time.perf_counter()
+            path(pool[k % len(pool)])
+            samples.append(time.perf_counter() - t0)
+        result[name] = _percentiles(samples)
+
+        # numpy reports its buffers to tracemalloc; PIL's own pixel memory is not counted
+        tracemalloc.start()
+        for k in range(20):
+            path(pool[k % len(pool)])
+        allocated = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        result[name]['peak_alloc_kb'] = allocated / 1024
+
+    a = preprocess(_bgr_to_rgb(pool[0])).copy()
+    b = preprocess(pool[0], channels='BGR')
+    result['max_abs_diff'] = float(np.abs(a - b).max())
+    return result
+
+
+def _stand_in_network():
+    """ResNet-18 with two outputs and random weights, same input as the mine classifier"""
+    import torchvision
+    return torchvision.models.resnet18(num_classes=2)
+
+
+def bench_batching(batch_sizes, frames: int, width: int, height: int, seed: int) -> list:
+    """CPU throughput of the inference queue for each maximum batch size"""
+    rng = np.random.default_rng(seed)
+    pool = [rng.integers(0, 256, (height, width, 3), dtype=np.uint8) for _ in range(8)]
+    net = _stand_in_network()
+
+    rows = []
+    for size in batch_sizes:
+        detector = MineDetector.from_module(net, max_batch=size)
+        detector.detect_batch(pool[:size])  # Warm-up
+        service = InferenceQueue(detector, max_batch=size, max_wait_s=0.05)
+        service.start()
+
+        t0 = time.perf_counter()
+        futures = [service.submit(k, pool[k % len(pool)]) for k in range(frames)]
+        for future in futures:
+            future.result()
+        elapsed = time.perf_counter() - t0
+        service.close()
+
+        rows.append({
+            'batch': size,
+            'images_per_s': frames / elapsed,
+            'mean_batch': service.mean_batch,
+            'ms_per_image': elapsed / frames * 1000,
+        })
+    return rows
+
+
+def bench_backends(names, net, frames: int, batch: int, width: int, height: int, seed: int,
+                   threads: int = 0) -> list:
+    """
+    Latency of each inference backend on the same network, and how closely
+    its mine probabilities follow eager torch (the accuracy cost of the
+    conversion; int8 is the only lossy one)
+    """
+    rng = np.random.default_rng(seed)
+    preprocess = Preprocessor(max_batch=batch)
+    inputs = []
+    for _ in range(8):
+        for slot in range(batch):
+            preprocess(rng.integers(0, 256, (height, width, 3), dtype=np.uint8), slot)
+        inputs.append(preprocess.input.copy())
+
+    reference = None
+    rows = []
+    for name in names:
+        t0 = time.perf_counter()
+        try:
+            backend = backend_from_module(name, net, 'cpu', INPUT_SIZE, threads)
+        except Exception as e:
+            rows.append({'backend': name, 'error': str(e)})
+            continue
+        convert_s = time.perf_counter() - t0
+
+        probabilities = np.concatenate([mine_probabilities(backend(x)) for x in inputs])  # Also warms up
+        if reference is None:
+            reference = probabilities
+        samples = []
+        for k in range(frames):
+            t0 = time.perf_counter()
+            backend(inputs[k % len(inputs)])
+            samples.append(time.perf_counter() - t0)
+
+        row = {'backend': name, 'convert_s': convert_s, 'images_per_s': batch * frames / sum(samples)}
+        row.update(_percentiles(samples))
+        row['max_abs_diff'] = float(np.abs(probabilities - reference).max())
+        row['label_agreement'] = float(np.mean((probabilities >= 0.5) == (reference >= 0.5)))
+        rows.append(row)
+    return rows
+
+
+def bench_minefield(cells: int, seed: int, cell_m: float = 0.5, altitude_m: float = 10.0) -> dict:
+    """
+    Simulated detection over a square grid of cells on the synthetic
+    minefield: time per pass, achieved detection and false alarm rates, and
+    whether a second run with the same seed reproduces every probability
+    """
+    side = int(np.ceil(np.sqrt(cells)))
+    east, north = np.meshgrid(np.arange(side) * cell_m, np.arange(side) * cell_m)
+    east, north = east.ravel()[:cells], north.ravel()[:cells]
+
+    runs = []
+    for _ in range(2):
+        sim = SimulatedDetector(Minefield(MinefieldConfig(seed=seed)), DetectorModel(reference_altitude_m=altitude_m))
+        t0 = time.perf_counter()
+        probabilities = sim.detect_local(east, north, altitude_m)
+        runs.append((time.perf_counter() - t0, probabilities))
+    truth = sim.truth(east, north, cell_m / 2)
+    mine = runs[0][1] >= 0.5
+
+    return {
+        'cells': cells,
+        'area_ha': cells * cell_m ** 2 / 10_000,
+        'mines': int(truth.sum()),
+        'seconds': runs[0][0],
+        'cells_per_s': cells / runs[0][0],
+        'detection_rate': float(mine[truth].mean()) if truth.any() else float('nan'),
+        'false_alarm_rate': float(mine[~truth].mean()),
+        'deterministic': bool(np.array_equal(runs[0][1], runs[1][1])),
+    }
+
+
+def load_frames(images_dir: Optional[str], count: int, width: int, height: int, seed: int) -> List[np.ndarray]:
+    """Decoded RGB frames from a directory, or synthetic arrays of the given size"""
+    if images_dir:
+        paths = sorted(p for ext in ('*.jpg', '*.jpeg', '*.png') for p in glob.glob(os.path.join(images_dir, ext)))
+        if not paths:
+            raise FileNotFoundError(f"No images in {images_dir}")
+        return [np.asarray(Image.open(p).convert('RGB')) for p in paths[:count]]
+    rng = np.random.default_rng(seed)
+    return [rng.integers(0, 256, (height, width, 3), dtype=np.uint8) for _ in range(min(count, 8))]
+
+
+def bench_detector(target: str, frame_sets: List[List[np.ndarray]], batch_sizes, calls: int,
+                   checkpoint: Optional[str], threads: int = 0, warmup: int = 3) -> list:
+    """
+    MineDetector end to end (preprocessing, inference, result dicts) for one
+    mode or backend: model load time, then latency per call and images/s for
+    each frame set and batch size. detect() is timed for batch 1,
+    detect_batch() above.
+    """
+    rss_before = peak_rss_mb()
+    t0 = time.perf_counter()
+    if target == 'simulator':
+        detector = MineDetector('simulator', max_batch=max(batch_sizes))
+    else:
+        detector = MineDetector('real', checkpoint, max_batch=max(batch_sizes), backend=target,
+                                device='cpu', threads=threads)
+    load_s = time.perf_counter() - t0
+    if detector.mode != 'real' and target != 'simulator':
+        return [{'target': target, 'error': f"model did not load ({detector.load_state})", 'load_s': load_s}]
+    backend = detector.backend.name if detector.backend is not None else target
+
+    rows = []
+    for frames, batch in ((frames, batch) for frames in frame_sets for batch in batch_sizes):
+        chunks = [[frames[(k * batch + j) % len(frames)] for j in range(batch)] for k in range(len(frames))]
+        run = (lambda c: detector.detect(c[0])) if batch == 1 else detector.detect_batch
+        for k in range(warmup):
+            run(chunks[k % len(chunks)])
+        samples = []
+        for k in range(calls):
+            t1 = time.perf_counter()
+            run(chunks[k % len(chunks)])
+            samples.append(time.perf_counter() - t1)
+
+        row = {
+            'target': target,
+            'backend': backend,
+            'width': int(frames[0].shape[1]),
+            'height': int(frames[0].shape[0]),
+            'batch': batch,
+            'calls': calls,
+            'images_per_s': batch * calls / sum(samples),
+            'load_s': load_s,
+            'peak_rss_mb': peak_rss_mb(),
+            'rss_before_load_mb': rss_before,
+        }
+        row.update(_percentiles(samples))
+        rows.append(row)
+    return rows
+
+
+class _GilBoundBackend:
+    """
+    Stand-in network that holds the GIL for about work_ms per frame, like
+    the Python-side share of decoding, preprocessing and inference does
+    """
+
+    name = 'gil-bound stand-in'
+
+    def __init__(self, work_ms: float):
+        self.work_ms = work_ms
+
+    def __call__(self, batch: np.ndarray) -> np.ndarray:
+        for _ in range(len(batch)):
+            end = time.perf_counter() + self.work_ms / 1000
+            while time.perf_counter() < end:
+                sum(range(200))
+        return np.zeros((len(batch), 2), dtype=np.float32)
+
+
+def _gil_bound_detector(work_ms: float = 20.0, max_batch: int = 4) -> MineDetector:
+    """Detector around _GilBoundBackend (module level so a worker process can build it)"""
+    detector = MineDetector('real', max_batch=max_batch)
+    detector.backend = _GilBoundBackend(work_ms)
+    return detector
+
+
+def _control_plane(duration_s: float, period_s: float, load: Optional[threading.Thread]) -> dict:
+    """
+    Heartbeat lateness (a loop sleeping to a fixed schedule) and command
+    latency (handing a message to a waiting handler thread, like a
+    mission_stop arriving on the MQTT thread) over duration_s
+    """
+    lateness, latency = [], []
+    commands: "queue.Queue[Optional[float]]" = queue.Queue()
+
+    def handler():
+        while True:
+            sent = commands.get()
+            if sent is None:
+                return
+            latency.append(time.perf_counter() - sent)
+
+    worker = threading.Thread(target=handler, daemon=True)
+    worker.start()
+    if load is not None:
+        load.start()
+    end = time.perf_counter() + duration_s
+    due = time.perf_counter()
+    while due < end:
+        due += period_s
+        time.sleep(max(due - time.perf_counter(), 0.0))
+        lateness.append(time.perf_counter() - due)
+        commands.put(time.perf_counter())
+    commands.put(None)
+    worker.join()
+
+    return {
+        'heartbeat_late': dict(_percentiles(lateness), max_ms=max(lateness) * 1000),
+        'command_latency': dict(_percentiles(latency), max_ms=max(latency) * 1000),
+    }
+
+
+def bench_control_jitter(duration_s: float, work_ms: float, frames_shape=(512, 640, 3), period_s: float = 0.05,
+                         seed: int = 1) -> list:
+    """
+    Control-plane timing while the inference queue is kept saturated:
+    idle, with the detector in-process, and with it in a worker process fed
+    through shared memory
+    """
+    rng = np.random.default_rng(seed)
+    pool = [rng.integers(0, 256, frames_shape, dtype=np.uint8) for _ in range(8)]
+    rows = [dict(_control_plane(duration_s, period_s, None), setup='idle', images_per_s=0.0)]
+
+    for setup in ('in-process', 'worker process'):
+        if setup == 'in-process':
+            detector = _gil_bound_detector(work_ms)
+        else:
+            detector = ProcessDetector('real', factory=_gil_bound_detector)
+            detector.start_loading()
+            detector.detect_batch(pool[:4])  # Worker up before timing starts
+        service = InferenceQueue(detector, max_batch=4, max_wait_s=0.01, max_pending=8)
+        service.start()
+        stop = threading.Event()
+
+        def feed():
+            k = 0
+            while not stop.is_set():
+                service.submit(k, pool[k % len(pool)])
+                k += 1
+
+        t0 = time.perf_counter()
+        row = _control_plane(duration_s, period_s, threading.Thread(target=feed, daemon=True))
+        stop.set()
+        row.update(setup=setup, images_per_s=service.frames / (time.perf_counter() - t0))
+        service.close(timeout=10)
+        detector.close()
+        rows.append(row)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MineFinder detector benchmarks")
+    parser.add_argument('--frames', type=int, default=200)
+    parser.add_argument('--width', type=int, default=640, help="Frame width (FLIR Vue Pro capture)")
+    parser.add_argument('--height', type=int, default=512, help="Frame height")
+    parser.add_argument('--batch-sizes', type=int, nargs='*', default=[1, 2, 4, 8, 16],
+                        help="Inference queue batch sizes to test (needs torch and torchvision)")
+    parser.add_argument('--threads', type=int, default=None, help="torch intra-op threads")
+    parser.add_argument('--backends', nargs='*', default=[],
+                        help="Inference backends to compare (torch torchscript onnx int8); the first is the reference")
+    parser.add_argument('--backend-batch', type=int, default=1, help="Batch size for the backend comparison")
+    parser.add_argument('--checkpoint', default=None,
+                        help="Compare backends on the trained model (needs EXP_T-ML-LWIR) instead of the stand-in")
+    parser.add_argument('--minefield-cells', type=int, nargs='*', default=[],
+                        help="Simulated detection over this many cells of the synthetic minefield (no torch needed)")
+    parser.add_argument('--detector', nargs='*', default=[], choices=('simulator',) + BACKENDS,
+                        help="Run MineDetector end to end in simulator mode and/or real mode with these backends")
+    parser.add_argument('--sizes', nargs='*', default=[],
+                        help="Frame sizes for the detector harness as WIDTHxHEIGHT (default --width x --height)")
+    parser.add_argument('--images', default=None, help="Feed the detector harness these frames instead of synthetic ones")
+    parser.add_argument('--detector-batch', type=int, nargs='*', default=[1, 4], help="Batch sizes for the detector harness")
+    parser.add_argument('--control-jitter', type=float, default=0, metavar='SECONDS',
+                        help="Measure heartbeat and command latency under inference load, in-process vs worker process")
+    parser.add_argument('--gil-work-ms', type=float, default=20.0,
+                        help="GIL-held time per frame of the stand-in detector in the jitter test")
+    parser.add_argument('--json', default=None, help="Write all results to this JSON file")
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+    report = {'environment': environment(), 'arguments': vars(args)}
+
+    r = bench_preprocess(args.frames, args.width, args.height, args.seed)
+    report['preprocess'] = r
+    print(f"Preprocessing: {args.width}x{args.height} RGB -> 1x3x{INPUT_SIZE}x{INPUT_SIZE}, {args.frames} frames")
+    for name, label in (('legacy', 'temp JPEG'), ('image', 'in-memory (PIL)'), ('array', 'in-memory (array)')):
+        m = r[name]
+        print(f"  {label:18s}  p50={m['p50_ms']:.2f} ms  p95={m['p95_ms']:.2f} ms  mean={m['mean_ms']:.2f} ms")
+    print(f"  max input difference vs temp JPEG path: {r['max_abs_diff']:.2f} (JPEG loss and resampling)")
+
+    r = bench_sensor_path(args.frames, args.width, args.height, args.seed)
+    report['sensor_path'] = r
+    print(f"Sensor to model input: {args.width}x{args.height} BGR grab, {args.frames} frames")
+    for name, label in (('pil', 'RGB copy + PIL'), ('frame', 'BGR Frame')):
+        m = r[name]
+        print(f"  {label:18s}  p50={m['p50_ms']:.2f} ms  p95={m['p95_ms']:.2f} ms  mean={m['mean_ms']:.2f} ms  "
+              f"peak allocated={m['peak_alloc_kb']:.0f} kB")
+    print(f"  max input difference: {r['max_abs_diff']:.2g}")
+
+    if args.minefield_cells:
+        model = DetectorModel()
+        print(f"Synthetic minefield: 0.5 m cells at 10 m, seed {args.seed}, nominal detection "
+              f"{model.detection_rate:.2f} / false alarm {model.false_alarm_rate:.2f} (surface mine, frame centre)")
+        report['minefield'] = [bench_minefield(n, args.seed) for n in args.minefield_cells]
+        for r in report['minefield']:
+            print(f"  {r['cells']:9d} cells ({r['area_ha']:6.1f} ha, {r['mines']:5d} mines)  {r['seconds']:6.2f}s  "
+                  f"{r['cells_per_s'] / 1e6:5.2f} M cells/s  detection {r['detection_rate']:.2f}  "
+                  f"false alarms {r['false_alarm_rate']:.3f}  {'reproducible' if r['deterministic'] else 'NOT reproducible'}")
+
+    if args.detector:
+        checkpoint = args.checkpoint or config.ml.checkpoint_path
+        sizes = [tuple(int(v) for v in size.lower().split('x')) for size in args.sizes] or [(args.width, args.height)]
+        if args.images:
+            sizes = sizes[:1]  # Frames come at their own size
+        print(f"Detector: MineDetector end to end, {args.frames} calls per batch size"
+              f"{f', frames from {args.images}' if args.images else ''}")
+        frame_sets = [load_frames(args.images, args.frames, width, height, args.seed) for width, height in sizes]
+        report['detector'] = []
+        for target in args.detector:
+            rows = bench_detector(target, frame_sets, args.detector_batch, args.frames, checkpoint, args.threads or 0)
+            report['detector'].extend(rows)
+            for r in rows:
+                if 'error' in r:
+                    print(f"  {r['target']:10s} unavailable: {r['error']}")
+                    continue
+                rss = f"{r['peak_rss_mb']:7.1f} MB" if r['peak_rss_mb'] is not None else "    n/a"
+                print(f"  {r['backend']:10s} {r['width']}x{r['height']}  batch={r['batch']:2d}  "
+                      f"{r['images_per_s']:8.1f} images/s  p50={r['p50_ms']:7.2f}  p95={r['p95_ms']:7.2f}  "
+                      f"p99={r['p99_ms']:7.2f} ms  load {r['load_s']:5.2f}s  peak RSS {rss}")
+
+    if args.control_jitter:
+        print(f"Control plane: 50 ms heartbeat and command hand-off for {args.control_jitter:.0f}s each, "
+              f"stand-in detector holding the GIL {args.gil_work_ms:.0f} ms per frame, queue kept full")
+        report['control_jitter'] = bench_control_jitter(args.control_jitter, args.gil_work_ms, seed=args.seed)
+        for r in report['control_jitter']:
+            h, c = r['heartbeat_late'], r['command_latency']
+            print(f"  {r['setup']:15s} heartbeat late p50={h['p50_ms']:6.2f} p99={h['p99_ms']:6.2f} max={h['max_ms']:6.2f} ms"
+                  f"  command p50={c['p50_ms']:6.2f} p99={c['p99_ms']:6.2f} max={c['max_ms']:6.2f} ms"
+                  f"  {r['images_per_s']:5.1f} images/s")
+
+    if (args.batch_sizes or args.backends) and not TORCH_AVAILABLE:
+        print("Batching and backends: torch not installed, skipped")
+    elif args.batch_sizes or args.backends:
+        set_threads(args.threads or 0)
+
+        if args.batch_sizes:
+            import torch
+            print(f"Batching: ResNet-18 stand-in on CPU ({torch.get_num_threads()} threads), {args.frames} frames queued at once")
+            report['batching'] = bench_batching(args.batch_sizes, args.frames, args.width, args.height, args.seed)
+            for r in report['batching']:
+                print(f"  max batch={r['batch']:3d}  mean batch={r['mean_batch']:5.1f}  "
+                      f"{r['images_per_s']:6.1f} images/s  {r['ms_per_image']:.1f} ms/image")
+
+        if args.backends:
+            if args.checkpoint:
+                net, label = load_reference_model(args.checkpoint).model.cpu(), args.checkpoint
+            else:
+                net, label = _stand_in_network(), "ResNet-18 stand-in"
+            print(f"Backends: {label} on CPU, batch {args.backend_batch}, {args.frames} batches, "
+                  f"agreement vs {args.backends[0]}")
+            report['backends'] = bench_backends(args.backends, net, args.frames, args.backend_batch, args.width,
+                                                args.height, args.seed, args.threads or 0)
+            for r in report['backends']:
+                if 'error' in r:
+                    print(f"  {r['backend']:12s} unavailable: {r['error']}")
+                    continue
+                print(f"  {r['backend']:12s} p50={r['p50_ms']:7.2f} ms  p95={r['p95_ms']:7.2f} ms  "
+                      f"{r['images_per_s']:6.1f} images/s  max |dp|={r['max_abs_diff']:.1e}  "
+                      f"labels agree {r['label_agreement'] * 100:5.1f}%  convert {r['convert_s']:.1f}s")
+
+    if args.json:
+        report['environment']['peak_rss_mb'] = peak_rss_mb()
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.json}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Export the mine classifier checkpoint for the faster inference backends.
+
+Each exported model is reloaded from disk and compared with the eager
+checkpoint on the same inputs. A model whose mine probabilities differ by
+more than the tolerance is deleted, so MineDetector never picks it up.
+
+Usage (from the PathFinder directory):
+    python -m detection.export_model
+    python -m detection.export_model --checkpoint ./demo-MiniCenter/fold_1_best.pt --backends onnx int8
+    python -m detection.export_model --images ./test_images --tolerance 1e-3
+"""
+
+import argparse
+import glob
+import os
+import sys
+
+import numpy as np
+from PIL import Image
+
+from config import config
+from .backends import EXPORT_SUFFIXES, TorchBackend, backend_from_file, export_path, load_reference_model, \
+    mine_probabilities, save_backend_model
+from .mine_detector import Preprocessor, INPUT_SIZE
+
+# int8 weights lose precision by design; float exports should match almost exactly
+DEFAULT_TOLERANCE = {'torchscript': 1e-4, 'onnx': 1e-4, 'int8': 0.02}
+
+
+def sample_inputs(images_dir: str, count: int, seed: int):
+    """Preprocessed test images, topped up with random frames to count"""
+    paths = sorted(p for ext in ('*.jpg', '*.jpeg', '*.png')
+                   for p in glob.glob(os.path.join(images_dir, ext)))[:count] if images_dir else []
+    rng = np.random.default_rng(seed)
+    preprocess = Preprocessor(max_batch=count)
+    for slot in range(count):
+        if slot < len(paths):
+            frame = np.asarray(Image.open(paths[slot]).convert('RGB'))
+        else:
+            frame = rng.integers(0, 256, (480, 640, 3), dtype=np.uint8)
+        preprocess(frame, slot)
+    return preprocess.input, len(paths)
+
+
+def compare(reference: np.ndarray, candidate: np.ndarray, threshold: float = 0.5) -> dict:
+    """Agreement between two sets of mine probabilities"""
+    diff = np.abs(reference - candidate)
+    return {
+        'max_abs_diff': float(diff.max()),
+        'mean_abs_diff': float(diff.mean()),
+        'label_agreement': float(np.mean((reference >= threshold) == (candidate >= threshold))),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the mine classifier for the optimized backends")
+    parser.add_argument('--checkpoint', default=config.ml.checkpoint_path)
+    parser.add_argument('--backends', nargs='+', default=list(EXPORT_SUFFIXES), choices=list(EXPORT_SUFFIXES))
+    parser.add_argument('--images', default=config.sensor.test_images_dir,
+                        help="Images used for the agreement check (random frames fill the rest)")
+    parser.add_argument('--samples', type=int, default=32)
+    parser.add_argument('--tolerance', type=float, default=None,
+                        help="Max allowed mine probability difference (default per backend)")
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    wrapper = load_reference_model(args.checkpoint)
+    net = wrapper.model.eval().cpu()
+    batch, real = sample_inputs(args.images, args.samples, args.seed)
+    reference = mine_probabilities(TorchBackend(net, 'cpu')(batch))
+    print(f"Reference: {args.checkpoint} (eager torch), {args.samples} inputs ({real} images)")
+
+    failed = []
+    for name in args.backends:
+        path = export_path(args.checkpoint, name)
+        tolerance = args.tolerance if args.tolerance is not None else DEFAULT_TOLERANCE[name]
+        try:
+            save_backend_model(name, net, path, INPUT_SIZE)
+            # Check the file as it will be loaded on the drone
+            r = compare(reference, mine_probabilities(backend_from_file(name, path)(batch)))
+        except Exception as e:
+            print(f"  {name:12s} FAILED: {e}")
+            if os.path.exists(path):
+                os.unlink(path)
+            failed.append(name)
+            continue
+
+        ok = r['max_abs_diff'] <= tolerance
+        print(f"  {name:12s} {'ok  ' if ok else 'FAIL'}  max |dp|={r['max_abs_diff']:.2e} (tolerance {tolerance:.0e})  "
+              f"mean |dp|={r['mean_abs_diff']:.2e}  labels agree {r['label_agreement'] * 100:.1f}%  "
+              f"{os.path.getsize(path) / 1e6:.1f} MB -> {path}")
+        if not ok:
+            os.unlink(path)
+            failed.append(name)
+
+    if failed:
+        print(f"Not exported: {', '.join(failed)}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
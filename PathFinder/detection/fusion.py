@@ -0,0 +1,99 @@
+"""Fuse several detector frames of one scan cell into a single verdict"""
+
+import math
+from typing import Any, Dict, List, Optional
+
+FUSION_METHODS = ('mean', 'max', 'vote')
+
+
+def failed_result(error: str, sensor: str = 'flir_vue_pro') -> Dict[str, Any]:
+    """A frame (or cell) without a usable verdict; fusion skips it"""
+    return {'mine': None, 'confidence': None, 'sensor': sensor, 'error': error}
+
+
+class CellFusion:
+    """
+    Collects per-frame detector results for one cell.
+
+    Frames are fused by mean or max mine probability, or by majority vote
+    (the fused probability is then the share of mine votes; ties count as
+    mine). Frames without a verdict (inference error, NaN output, capture
+    failure) are skipped rather than decided for. `done` turns true once
+    max_frames verdicts are in, once max_frames + retries attempts were
+    made, or early once the verdict is settled. With p the fused probability
+    and c early_stop_confidence, mean stops when p >= c or p <= 1 - c. Max
+    stops only when p >= c, since a later mine frame would still win over
+    any number of clear ones. Vote stops once a majority of max_frames is
+    reached.
+
+    >>> fusion = CellFusion('max', max_frames=3)
+    >>> fusion.add({'mine': False, 'confidence': 0.02})
+    False
+    >>> fusion.add({'mine': True, 'confidence': 0.95})
+    True
+    >>> fusion.result()['mine']
+    True
+    """
+
+    def __init__(self, method: str = 'mean', max_frames: int = 1, early_stop_confidence: float = 0.9,
+                 threshold: float = 0.5, retries: int = 0):
+        if method not in FUSION_METHODS:
+            raise ValueError(f"Unknown fusion method: {method} (expected one of {', '.join(FUSION_METHODS)})")
+        self.method = method
+        self.max_frames = max(int(max_frames), 1)
+        self.early_stop_confidence = early_stop_confidence
+        self.threshold = threshold
+        self.retries = max(int(retries), 0)
+        self.probabilities: List[float] = []
+        self.attempts = 0
+        self.errors: List[str] = []
+        self.sensor: Optional[str] = None
+
+    def add(self, result: Optional[Dict[str, Any]]) -> bool:
+        """Add one frame's result; returns done"""
+        self.attempts += 1
+        p = result.get('confidence') if result else None
+        if not result or result.get('mine') is None or p is None or not math.isfinite(p):
+            self.errors.append((result or {}).get('error') or 'no result')
+        else:
+            self.probabilities.append(min(max(float(p), 0.0), 1.0))
+            self.sensor = result.get('sensor', self.sensor)
+        return self.done
+
+    @property
+    def probability(self) -> Optional[float]:
+        """Fused mine probability, None without any verdict"""
+        ps = self.probabilities
+        if not ps:
+            return None
+        if self.method == 'max':
+            return max(ps)
+        if self.method == 'vote':
+            return sum(p >= self.threshold for p in ps) / len(ps)
+        return sum(ps) / len(ps)
+
+    @property
+    def done(self) -> bool:
+        n = len(self.probabilities)
+        if n >= self.max_frames or self.attempts >= self.max_frames + self.retries:
+            return True
+        if n == 0:
+            return False
+        if self.method == 'vote':
+            mine_votes = sum(p >= self.threshold for p in self.probabilities)
+            return max(mine_votes, n - mine_votes) * 2 > self.max_frames
+        p = self.probability
+        if self.method == 'max':
+            return p >= self.early_stop_confidence
+        return p >= self.early_stop_confidence or p <= 1 - self.early_stop_confidence
+
+    def result(self) -> Dict[str, Any]:
+        """Fused detector result, with the frames used and attempts made"""
+        p = self.probability
+        if p is None:
+            result = failed_result('; '.join(sorted(set(self.errors))) or 'no frames', self.sensor or 'flir_vue_pro')
+        else:
+            result = {'mine': p >= self.threshold, 'confidence': p, 'sensor': self.sensor}
+        result['frames'] = len(self.probabilities)
+        result['attempts'] = self.attempts
+        return result
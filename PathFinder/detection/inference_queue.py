@@ -0,0 +1,107 @@
+"""Batching inference service in front of MineDetector"""
+
+import time
+import queue
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Any, List, Optional, Tuple
+
+from .mine_detector import MineDetector
+
+
+class InferenceQueue:
+    """
+    Collects frames from the mission loop and runs them through the
+    detector in batches.
+
+    A batch is dispatched as soon as max_batch frames are waiting, or
+    max_wait_s after its first frame arrived, whichever comes first. Each
+    submit() returns a Future resolving to the detector result dict with
+    the submitting cell index added under 'cell', so results can be
+    recorded out of order.
+
+    With max_pending > 0 at most that many frames wait for the detector;
+    submit() then blocks, holding the mission back instead of letting
+    frames pile up in memory when inference is the slower stage.
+    """
+
+    def __init__(self, detector: MineDetector, max_batch: int = 4, max_wait_s: float = 0.02,
+                 max_pending: int = 0):
+        self.detector = detector
+        self.max_batch = max(int(max_batch), 1)
+        self.max_wait_s = max_wait_s
+        self._queue: "queue.Queue[Optional[Tuple[int, Any, Future]]]" = queue.Queue(maxsize=max(int(max_pending), 0))
+        self._thread: Optional[threading.Thread] = None
+        self.batches = 0
+        self.frames = 0
+        self.log = logging.getLogger(__name__)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="inference", daemon=True)
+            self._thread.start()
+
+    def submit(self, cell: int, image) -> Future:
+        """Queue one frame for a scan cell; the future resolves to its detection result (blocks when full)"""
+        future = Future()
+        self._queue.put((cell, image, future))
+        return future
+
+    def close(self, timeout: Optional[float] = None):
+        """Finish queued frames and stop the worker"""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout)
+            self._thread = None
+
+    @property
+    def backlog(self) -> int:
+        return self._queue.qsize()
+
+    @property
+    def mean_batch(self) -> float:
+        return self.frames / self.batches if self.batches else 0.0
+
+    def _collect(self) -> Tuple[List[Tuple[int, Any, Future]], bool]:
+        """Block for the first frame, then gather more until the batch is full or the wait expires"""
+        item = self._queue.get()
+        if item is None:
+            return [], True
+        batch = [item]
+        deadline = time.monotonic() + self.max_wait_s
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            batch, stopping = self._collect()
+            if not batch:
+                continue
+            # Drop frames whose caller already gave up on them
+            batch = [b for b in batch if b[2].set_running_or_notify_cancel()]
+            if not batch:
+                continue
+
+            try:
+                results = self.detector.detect_batch([image for _, image, _ in batch])
+            except Exception as e:
+                self.log.error(f"Inference batch failed: {e}")
+                for _, _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.frames += len(batch)
+            for (cell, _, future), result in zip(batch, results):
+                result['cell'] = cell
+                future.set_result(result)
@@ -0,0 +1,219 @@
+"""Seeded synthetic minefield and detector response model for simulation"""
+
+import logging
+from dataclasses import dataclass
+from statistics import NormalDist
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from navigation.geodesy import LocalProjection
+
+
+@dataclass
+class MinefieldConfig:
+    """Ground truth generation"""
+    seed: int = 0
+    density_per_ha: float = 20.0                      # Mean mines per hectare
+    radius_m: Tuple[float, float] = (0.04, 0.15)      # Mine radius range (AP to small AT)
+    depth_m: Tuple[float, float] = (0.0, 0.15)        # Burial depth range
+    tile_m: float = 50.0                              # Side of the procedurally generated tiles
+
+
+@dataclass
+class DetectorModel:
+    """
+    Detector response (ROC) model.
+
+    detection_rate and false_alarm_rate fix the operating point at
+    probability 0.5 for a surface mine centred under the camera at
+    reference_altitude_m. They set the separability d' of the equal-variance
+    Gaussian score model, which then drops with altitude, burial depth and
+    the mine's distance from the frame centre.
+    """
+    detection_rate: float = 0.95
+    false_alarm_rate: float = 0.02
+    reference_altitude_m: float = 10.0
+    altitude_exponent: float = 1.0   # d' scales with (reference altitude / altitude) ** exponent
+    footprint_m: float = 1.0         # Frame side on the ground at the reference altitude
+    depth_scale_m: float = 0.1       # d' falls by 1/e per this much burial depth
+
+    def __post_init__(self):
+        if not 0 < self.false_alarm_rate < self.detection_rate < 1:
+            raise ValueError("Need 0 < false_alarm_rate < detection_rate < 1")
+
+    @property
+    def threshold(self) -> float:
+        """Score at which the reported probability is 0.5"""
+        return NormalDist().inv_cdf(1 - self.false_alarm_rate)
+
+    @property
+    def d_prime(self) -> float:
+        """Separability at the reference operating point"""
+        return self.threshold - NormalDist().inv_cdf(1 - self.detection_rate)
+
+    def roc(self, d_prime: Optional[float] = None, points: int = 21) -> np.ndarray:
+        """(false alarm rate, detection rate) pairs over a sweep of score thresholds"""
+        d = self.d_prime if d_prime is None else d_prime
+        n = NormalDist()
+        thresholds = np.linspace(-3.0, d + 3.0, points)
+        return np.array([(1 - n.cdf(t), 1 - n.cdf(t - d)) for t in thresholds])
+
+
+class Minefield:
+    """
+    Unbounded synthetic minefield in local metres.
+
+    The plane is split into tiles; each tile draws a Poisson number of mines
+    (uniform position, radius and depth) from a generator seeded with
+    (seed, tile), so any area is reproducible without generating the rest
+    of the field, and query order does not matter.
+    """
+
+    def __init__(self, config: Optional[MinefieldConfig] = None):
+        self.config = config or MinefieldConfig()
+        self._tiles: Dict[Tuple[int, int], np.ndarray] = {}
+
+    def _tile(self, tx: int, ty: int) -> np.ndarray:
+        """(n, 4) array of east, north, radius, depth"""
+        mines = self._tiles.get((tx, ty))
+        if mines is None:
+            cfg = self.config
+            # SeedSequence takes non-negative entropy only
+            rng = np.random.default_rng([cfg.seed & 0xFFFFFFFF, tx + 2**31, ty + 2**31])
+            n = rng.poisson(cfg.density_per_ha * cfg.tile_m ** 2 / 10_000)
+            mines = np.column_stack((
+                (tx + rng.random(n)) * cfg.tile_m,
+                (ty + rng.random(n)) * cfg.tile_m,
+                rng.uniform(*cfg.radius_m, n),
+                rng.uniform(*cfg.depth_m, n),
+            ))
+            self._tiles[(tx, ty)] = mines
+        return mines
+
+    def mines_in(self, east_min: float, north_min: float, east_max: float, north_max: float) -> np.ndarray:
+        """(n, 4) array of east, north, radius, depth of the mines inside the box"""
+        t = self.config.tile_m
+        tiles = [self._tile(tx, ty)
+                 for tx in range(int(np.floor(east_min / t)), int(np.floor(east_max / t)) + 1)
+                 for ty in range(int(np.floor(north_min / t)), int(np.floor(north_max / t)) + 1)]
+        mines = np.concatenate(tiles) if tiles else np.empty((0, 4))
+        inside = ((mines[:, 0] >= east_min) & (mines[:, 0] <= east_max) &
+                  (mines[:, 1] >= north_min) & (mines[:, 1] <= north_max))
+        return mines[inside]
+
+
+class _MineIndex:
+    """Mines hashed into square bins; nearby() visits the 3x3 bins around each query"""
+
+    def __init__(self, mines: np.ndarray, bin_m: float, east_min: float, north_min: float, north_max: float):
+        self.bin_m = bin_m
+        self.origin = (east_min, north_min)
+        # Room for every query bin and its neighbours, so keys cannot collide
+        self.stride = int(np.floor((north_max - north_min) / bin_m)) + 3
+        bx, by = self._bins(mines[:, 0], mines[:, 1])
+        keys = bx * self.stride + by
+        order = np.argsort(keys, kind='stable')
+        self.mines = mines[order]
+        self.keys = keys[order]
+
+    def _bins(self, east: np.ndarray, north: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        # +1 keeps the neighbour offsets non-negative
+        return (np.floor((east - self.origin[0]) / self.bin_m).astype(np.int64) + 1,
+                np.floor((north - self.origin[1]) / self.bin_m).astype(np.int64) + 1)
+
+    def nearby(self, east: np.ndarray, north: np.ndarray):
+        """Yield (query mask, mine rows) pairs covering every mine within one bin of each query"""
+        if not len(self.mines):
+            return
+        bx, by = self._bins(east, north)
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                key = (bx + dx) * self.stride + (by + dy)
+                start = np.searchsorted(self.keys, key, side='left')
+                end = np.searchsorted(self.keys, key, side='right')
+                for k in range(int((end - start).max(initial=0))):
+                    mask = start + k < end
+                    yield mask, self.mines[start[mask] + k]
+
+
+class SimulatedDetector:
+    """
+    Detector output over a Minefield, evaluated for whole batches of frame
+    positions at once.
+
+    Each frame gets a Gaussian score with mean d' of the most visible mine
+    near it (0 without one) and unit variance, reported as the calibrated
+    probability sigmoid(d'_ref * (score - threshold)). Noise comes from one
+    generator seeded with the minefield seed, so the same seed and the same
+    sequence of queries give the same results.
+    """
+
+    def __init__(self, minefield: Optional[Minefield] = None, model: Optional[DetectorModel] = None,
+                 seed: Optional[int] = None):
+        self.minefield = minefield or Minefield()
+        self.model = model or DetectorModel()
+        self.rng = np.random.default_rng([(self.minefield.config.seed if seed is None else seed) & 0xFFFFFFFF, 1])
+        self.projection: Optional[LocalProjection] = None
+        self.log = logging.getLogger(__name__)
+
+    def anchor(self, lat: float, lon: float):
+        """Fix the lat/lon origin of the field (default: first query, rounded to 0.01 deg)"""
+        self.projection = LocalProjection(round(lat, 2), round(lon, 2))
+        self.log.info(f"Synthetic minefield anchored at ({self.projection.origin_lat:.2f}, "
+                      f"{self.projection.origin_lon:.2f}), seed {self.minefield.config.seed}")
+
+    def separability(self, east, north, altitude) -> np.ndarray:
+        """d' of the most visible mine for each frame centre (local metres) and altitude"""
+        east = np.asarray(east, dtype=np.float64).ravel()
+        north = np.asarray(north, dtype=np.float64).ravel()
+        altitude = np.broadcast_to(np.asarray(altitude, dtype=np.float64), east.shape)
+        model = self.model
+        d = np.zeros(east.shape)
+        if not len(east):
+            return d
+
+        altitude = np.maximum(altitude, 0.1)
+        scale = altitude / model.reference_altitude_m
+        sigma = model.footprint_m / 2 * scale         # Off-centre falloff grows with the footprint
+        gain = model.d_prime * scale ** -model.altitude_exponent
+        reach = 4 * float(sigma.max()) + self.minefield.config.radius_m[1]
+
+        mines = self.minefield.mines_in(east.min() - reach, north.min() - reach,
+                                        east.max() + reach, north.max() + reach)
+        index = _MineIndex(mines, reach, east.min() - reach, north.min() - reach, north.max() + reach)
+        for mask, m in index.nearby(east, north):
+            off = np.maximum(np.hypot(east[mask] - m[:, 0], north[mask] - m[:, 1]) - m[:, 2], 0.0)
+            visible = gain[mask] * np.exp(-m[:, 3] / model.depth_scale_m - 0.5 * (off / sigma[mask]) ** 2)
+            d[mask] = np.maximum(d[mask], visible)
+        return d
+
+    def detect_local(self, east, north, altitude) -> np.ndarray:
+        """Mine probabilities for a batch of frames at local positions"""
+        d = self.separability(east, north, altitude)
+        score = d + self.rng.standard_normal(d.shape)
+        model = self.model
+        return 1.0 / (1.0 + np.exp(-model.d_prime * (score - model.threshold)))
+
+    def detect_positions(self, positions: Sequence[Tuple[float, float, float]]) -> np.ndarray:
+        """Mine probabilities for a batch of frames at (lat, lon, alt)"""
+        pos = np.asarray(positions, dtype=np.float64).reshape(-1, 3)
+        if self.projection is None and len(pos):
+            self.anchor(pos[0, 0], pos[0, 1])
+        east, north = self.projection.forward_many(pos[:, 0], pos[:, 1]) if len(pos) else (pos[:, 0], pos[:, 1])
+        return self.detect_local(east, north, pos[:, 2])
+
+    def truth(self, east, north, half_size_m: float) -> np.ndarray:
+        """Whether a mine centre lies inside each square cell (local metres)"""
+        east = np.asarray(east, dtype=np.float64).ravel()
+        north = np.asarray(north, dtype=np.float64).ravel()
+        hit = np.zeros(east.shape, dtype=bool)
+        if not len(east):
+            return hit
+        mines = self.minefield.mines_in(east.min() - half_size_m, north.min() - half_size_m,
+                                        east.max() + half_size_m, north.max() + half_size_m)
+        index = _MineIndex(mines, max(2 * half_size_m, 1e-3), east.min() - half_size_m, north.min() - half_size_m,
+                           north.max() + half_size_m)
+        for mask, m in index.nearby(east, north):
+            hit[mask] |= (np.abs(east[mask] - m[:, 0]) <= half_size_m) & (np.abs(north[mask] - m[:, 1]) <= half_size_m)
+        return hit
@@ -0,0 +1,242 @@
+"""MineDetector in a worker process, fed through a shared-memory frame ring"""
+
+import itertools
+import logging
+import multiprocessing
+import queue
+import threading
+from concurrent.futures import Future
+from multiprocessing import shared_memory
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from PIL import Image
+
+from .fusion import failed_result
+from .mine_detector import MineDetector
+from sensors.frame import Frame
+
+# FLIR Vue Pro frame: rows, columns, RGB
+DEFAULT_FRAME_SHAPE = (512, 640, 3)
+
+
+def _worker(detector_kwargs: dict, factory: Optional[Callable[[], MineDetector]], shm_name: str,
+            slots: int, slot_bytes: int, requests, responses):
+    """Worker process: load the detector, then run batches read straight out of the shared ring"""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s (worker) - %(levelname)s - %(message)s')
+    log = logging.getLogger(__name__)
+    shm = shared_memory.SharedMemory(name=shm_name)
+    ring = np.ndarray((slots * slot_bytes,), dtype=np.uint8, buffer=shm.buf)
+    try:
+        detector = factory() if factory else MineDetector(**detector_kwargs)
+        backend = detector.backend.name if detector.backend is not None else None
+        responses.put(('ready', detector.mode, detector.load_state, detector.load_time_s, backend))
+
+        while True:
+            request = requests.get()
+            if request is None:
+                break
+            request_id, frames = request
+            images = []
+            for slot, shape, channels, timestamp, metadata in frames:
+                start = slot * slot_bytes
+                view = ring[start:start + int(np.prod(shape))].reshape(shape)
+                images.append(Frame(view, timestamp, channels, metadata))
+            try:
+                results = detector.detect_batch(images)
+            except Exception as e:
+                log.error(f"Worker batch failed: {e}")
+                results = [failed_result(str(e)) for _ in frames]
+            responses.put(('result', request_id, results))
+    finally:
+        del ring
+        shm.close()
+
+
+class ProcessDetector(MineDetector):
+    """
+    MineDetector whose model runs in a dedicated worker process.
+
+    In-process, preprocessing and the Python side of inference hold the GIL
+    and delay the MQTT network thread, the heartbeat and command handling.
+    Here the parent only copies each frame into a slot of a shared-memory
+    ring (one memcpy, no pickling, in the frame's own channel order) and
+    sends the slot number with the frame's timestamp and metadata; the
+    worker preprocesses and runs the model on Frames around the shared
+    slots, and sends back the small result dicts. Slots are handed out in ring order and come free in the
+    same order, because the worker answers requests first in, first out.
+
+    Frames larger than a slot (frame_shape) are shrunk to fit. If the worker
+    dies, its pending frames fail (mine=None, like any inference failure)
+    and the next batch starts a new worker.
+    """
+
+    def __init__(self, mode: str = 'simulator', slots: int = 8, frame_shape: Tuple[int, int, int] = DEFAULT_FRAME_SHAPE,
+                 factory: Optional[Callable[[], MineDetector]] = None, **kwargs):
+        """
+        Args:
+            mode, **kwargs: As for MineDetector; the worker builds its detector from them
+            slots: Frames the ring holds (at least max_batch)
+            frame_shape: Largest frame stored without shrinking (rows, columns, 3)
+            factory: Picklable callable building the worker's detector instead (benchmarks)
+        """
+        kwargs.pop('defer_load', None)
+        super().__init__(mode, defer_load=True, **kwargs)
+        self.log = logging.getLogger(__name__)
+        self._worker_kwargs = dict(kwargs, mode=mode, defer_load=False)
+        self._factory = factory
+        self.slots = max(int(slots), self.preprocess.max_batch)
+        self.frame_shape = tuple(frame_shape)
+        self.slot_bytes = int(np.prod(self.frame_shape))
+
+        self._context = multiprocessing.get_context('spawn')
+        self._shm: Optional[shared_memory.SharedMemory] = None
+        self._ring: Optional[np.ndarray] = None
+        self._process = None
+        self._requests = None
+        self._free = threading.Semaphore(self.slots)
+        self._head = 0
+        self._lock = threading.Lock()
+        self._pending: Dict[int, Tuple[Future, int]] = {}
+        self._ids = itertools.count()
+        self._warned_size = False
+
+    def start_loading(self):
+        """Start the worker process (it loads the model); no-op while one is running"""
+        process = self._process
+        if process is not None and not process.is_alive():
+            self._worker_exited(process)  # Died before its results thread noticed
+        with self._lock:
+            if self._process is not None:
+                return
+            if self._shm is None:
+                self._shm = shared_memory.SharedMemory(create=True, size=self.slots * self.slot_bytes)
+                self._ring = np.ndarray((self.slots * self.slot_bytes,), dtype=np.uint8, buffer=self._shm.buf)
+            self._requests = self._context.Queue()
+            responses = self._context.Queue()
+            self._process = self._context.Process(
+                target=_worker, name="detector-worker", daemon=True,
+                args=(self._worker_kwargs, self._factory, self._shm.name, self.slots, self.slot_bytes,
+                      self._requests, responses)
+            )
+            self._process.start()
+            threading.Thread(target=self._read, args=(self._process, responses), name="detector-results",
+                             daemon=True).start()
+        self.log.info(f"Detector worker process started (pid {self._process.pid}, "
+                      f"{self.slots} x {self.slot_bytes / 2**20:.1f} MB shared frame slots)")
+
+    def load(self):
+        self.start_loading()
+
+    def _read(self, process, responses):
+        """Results thread: resolve pending batches, notice a dead worker"""
+        while True:
+            try:
+                message = responses.get(timeout=0.5)
+            except queue.Empty:
+                if process.is_alive():
+                    continue
+                self._worker_exited(process)
+                return
+            except (EOFError, OSError):
+                self._worker_exited(process)
+                return
+
+            if message[0] == 'ready':
+                _, mode, state, seconds, backend = message
+                self.mode = mode
+                self.backend = SimpleNamespace(name=backend) if backend else None
+                if not self.ready.is_set() or state != 'ready':
+                    self._set_ready(state, seconds)
+            else:
+                _, request_id, results = message
+                with self._lock:
+                    future, slots = self._pending.pop(request_id)
+                for _ in range(slots):
+                    self._free.release()
+                future.set_result(results)
+
+    def _worker_exited(self, process):
+        with self._lock:
+            if self._process is not None and self._process is not process:
+                return  # Already replaced; the pending batches belong to the new worker
+            self._process = None
+            pending, self._pending = self._pending, {}
+            # Nothing is left in the ring, so restart it from the first slot
+            self._head = 0
+        if pending:
+            self.log.error(f"Detector worker exited (code {process.exitcode}), failing {len(pending)} batches")
+        for future, slots in pending.values():
+            for _ in range(slots):
+                self._free.release()
+            future.set_exception(RuntimeError("detector worker process exited"))
+
+    def detect(self, image) -> Dict[str, Any]:
+        return self.detect_batch([image])[0]
+
+    def detect_batch(self, images: Sequence[Any]) -> List[Dict[str, Any]]:
+        """Send the frames through the ring in batches of up to max_batch and wait for the results"""
+        if not len(images):
+            return []
+        self.start_loading()
+        step = self.preprocess.max_batch
+        sent = [(self._send(images[k:k + step]), len(images[k:k + step])) for k in range(0, len(images), step)]
+
+        results = []
+        for future, n in sent:
+            try:
+                results.extend(future.result())
+            except Exception as e:
+                self.log.error(f"Worker inference failed: {e}")
+                results.extend(failed_result(str(e)) for _ in range(n))
+        return results
+
+    def _send(self, images: Sequence[Any]) -> Future:
+        frames = []
+        for image in images:
+            array, channels = self._as_array(image)
+            array = self._fit(array)
+            timestamp, metadata = (image.timestamp, image.metadata) if isinstance(image, Frame) else (None, None)
+            self._free.acquire()  # Blocks only while max slots of frames are in flight
+            with self._lock:
+                slot = self._head
+                self._head = (self._head + 1) % self.slots
+            start = slot * self.slot_bytes
+            np.copyto(self._ring[start:start + array.size].reshape(array.shape), array)
+            frames.append((slot, array.shape, channels, timestamp, metadata))
+
+        future = Future()
+        with self._lock:
+            request_id = next(self._ids)
+            self._pending[request_id] = (future, len(frames))
+            requests = self._requests
+        requests.put((request_id, frames))
+        return future
+
+    def _fit(self, array: np.ndarray) -> np.ndarray:
+        """Shrink frames that do not fit a slot (keeps the aspect ratio and channel order)"""
+        if array.size <= self.slot_bytes:
+            return array
+        if not self._warned_size:
+            self.log.warning(f"Frames of {array.shape[1]}x{array.shape[0]} exceed the shared slot "
+                             f"({self.frame_shape[1]}x{self.frame_shape[0]}), shrinking them")
+            self._warned_size = True
+        image = Image.fromarray(array)
+        image.thumbnail((self.frame_shape[1], self.frame_shape[0]))
+        return np.asarray(image)
+
+    def close(self, timeout: float = 5.0):
+        """Stop the worker and release the shared memory"""
+        with self._lock:
+            process, self._process = self._process, None
+        if process is not None:
+            self._requests.put(None)
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        if self._shm is not None:
+            self._ring = None
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
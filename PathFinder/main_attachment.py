@@ -4,19 +4,33 @@ MineFinder Detection Attachment
 Runs on Raspberry Pi mounted on drone.
 """
 
+import dataclasses
 import logging
 import time
 import threading
-from typing import Optional
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
 
 from config import config
 from mqtt.client import MineFinderMQTTClient
+from mqtt.publish_queue import PublishQueue
 from sensors.flir_vue_pro import FLIRVueProSensor
 from sensors.simulator import SimulatedSensor
 from navigation.dronekit_controller import DroneKitController
 from navigation.simulator import SimulatedDroneController, DroneConfig
 from detection.mine_detector import MineDetector
+from detection.inference_queue import InferenceQueue
+from detection.process_detector import ProcessDetector
+from detection.fusion import failed_result
+from detection.minefield import DetectorModel, Minefield, MinefieldConfig, SimulatedDetector
 from algorithms.corridor_sweep import CorridorSweepAlgorithm, CorridorConfig
+from algorithms.area_coverage import AreaCoverageAlgorithm, AreaConfig
+from algorithms.checkpoint import MissionCheckpoint
+from algorithms.flythrough import LineScan, claim_line
+from recorder.flight_recorder import FlightRecorder
 
 
 class MineFinderAttachment:
@@ -32,7 +46,8 @@ class MineFinderAttachment:
         # Initialize components based on mode
         if cfg.mode == 'real':
             self.log.info("Initializing in REAL mode")
-            self.sensor = FLIRVueProSensor(cfg.sensor.flir_device_id)
+            self.sensor = FLIRVueProSensor(cfg.sensor.flir_device_id, ring_frames=cfg.sensor.flir_ring_frames,
+                                           latency_s=cfg.sensor.capture_latency_ms / 1000)
             
             drone_cfg = DroneConfig(
                 connection_string=cfg.drone.connection_string,
@@ -44,22 +59,60 @@ class MineFinderAttachment:
                 waypoint_accept_radius_m=cfg.drone.waypoint_accept_radius_m
             )
             self.drone = DroneKitController(drone_cfg)
-            self.detector = MineDetector('real', cfg.ml.checkpoint_path)
+            # Loaded in the background once the attachment is online
+            self.detector = self._create_detector(cfg, 'real', checkpoint_path=cfg.ml.checkpoint_path,
+                                                  max_batch=cfg.ml.batch_size, defer_load=True,
+                                                  backend=cfg.ml.backend, device=cfg.ml.device,
+                                                  threads=cfg.ml.threads, model_path=cfg.ml.model_path or None)
         else:
             self.log.info("Initializing in SIMULATOR mode")
-            self.sensor = SimulatedSensor(cfg.sensor.test_images_dir)
+            self.sensor = SimulatedSensor(cfg.sensor.test_images_dir, pool=cfg.sensor.test_images_pool,
+                                          pool_max_mb=cfg.sensor.test_images_pool_mb,
+                                          cache_dir=cfg.sensor.test_images_cache_dir or None)
             
             drone_cfg = DroneConfig(
                 default_altitude_m=cfg.drone.default_altitude_m,
-                default_speed_ms=cfg.simulator.simulated_speed_ms
+                default_speed_ms=cfg.simulator.simulated_speed_ms,
+                telemetry_hz=cfg.simulator.telemetry_hz
             )
             self.drone = SimulatedDroneController(drone_cfg)
-            self.detector = MineDetector('simulator', mine_probability=cfg.simulator.mine_probability)
+            simulation = None
+            if cfg.simulator.detector == 'minefield':
+                simulation = SimulatedDetector(
+                    Minefield(MinefieldConfig(seed=cfg.simulator.seed, density_per_ha=cfg.simulator.mine_density_ha)),
+                    DetectorModel(detection_rate=cfg.simulator.detection_rate,
+                                  false_alarm_rate=cfg.simulator.false_alarm_rate,
+                                  reference_altitude_m=cfg.drone.default_altitude_m)
+                )
+                # Frames carry their capture position so detection can look up the minefield
+                self.sensor.position_source = self.drone.get_position
+            self.detector = self._create_detector(cfg, 'simulator', mine_probability=cfg.simulator.mine_probability,
+                                                  simulation=simulation)
+        
+        self.detector.on_ready = self._on_detector_ready
+        self._status_lock = threading.Lock()
+        
+        # Mission pipeline: the mission thread flies and captures, frames are
+        # detected in batches on the inference thread, and results are recorded
+        # and published on the publisher thread. Both queues are bounded.
+        self.inference = InferenceQueue(self.detector, cfg.ml.batch_size, cfg.ml.batch_wait_ms / 1000,
+                                        cfg.ml.queue_depth)
+        self.publisher = PublishQueue(cfg.mqtt.publish_queue)
+        
+        # Guards the sweep algorithm, shared by the mission and publisher threads
+        self._algorithm_lock = threading.RLock()
+        self._results_changed = threading.Condition(self._algorithm_lock)
+        self._outstanding = 0  # Captured frames whose result is not recorded yet
         
         self.algorithm: Optional[CorridorSweepAlgorithm] = None
+        self.recorder: Optional[FlightRecorder] = None
         self.running = False
         self.mission_active = False
         
+        # 'stop' hovers at every cell; 'continuous' flies each line and captures in flight
+        self.scan_mode = cfg.drone.scan_mode
+        self.scan_speed_ms = cfg.drone.scan_speed_ms
+        
         # Heartbeat thread
         self.heartbeat_thread = None
         self.heartbeat_running = False
@@ -82,18 +135,19 @@ class MineFinderAttachment:
         # Register command handlers
         self.mqtt.register_handler('mission_start', self._handle_mission_start)
         self.mqtt.register_handler('mission_stop', self._handle_mission_stop)
+        self.mqtt.register_handler('mission_resume', self._handle_mission_resume)
+        
+        # Model loading runs alongside sensor and drone setup
+        self.detector.start_loading()
         
         # Connect to sensor and drone
         self.sensor.connect()
         self.drone.connect()
+        self.inference.start()
+        self.publisher.start()
         
-        # Publish online status
-        self.mqtt.publish_status({
-            'online': True,
-            'mode': self.config.mode,
-            'attachment_name': self.config.attachment_name,
-            'capabilities': ['corridor_sweep', 'telemetry', 'detection']
-        })
+        # Publish online status (published again once the detector is ready)
+        self._publish_online_status()
         
         # Start heartbeat
         self._start_heartbeat()
@@ -102,6 +156,52 @@ class MineFinderAttachment:
         self.running = True
         return True
     
+    def _publish_online_status(self):
+        """Online status; 'detection' is only advertised once the model is loaded and warmed up"""
+        # Serialised so a stale 'loading' status can never overwrite the retained 'ready' one
+        with self._status_lock:
+            capabilities = ['corridor_sweep', 'area_coverage', 'mission_resume', 'telemetry']
+            if self.detector.loaded:
+                capabilities.append('detection')
+            
+            self.mqtt.publish_status({
+                'online': True,
+                'mode': self.config.mode,
+                'attachment_name': self.config.attachment_name,
+                'capabilities': capabilities,
+                'detector': {
+                    'state': self.detector.load_state,
+                    'load_time_s': self.detector.load_time_s,
+                    'backend': self.detector.backend.name if self.detector.backend is not None else None
+                }
+            })
+    
+    def _on_detector_ready(self, detector: MineDetector):
+        """Called from the model loader thread"""
+        if self.mqtt.connected and not self.mission_active:
+            self._publish_online_status()
+    
+    def _require_detector(self):
+        """Missions need a loaded model; reject them while it is loading or after it failed to load"""
+        if not self.detector.ready.is_set():
+            raise RuntimeError("Detection model is still loading")
+        if not self.detector.loaded:
+            raise RuntimeError(f"Detection model unavailable ({self.detector.load_state}), "
+                               f"refusing to scan with simulated detections")
+    
+    @staticmethod
+    def _create_detector(cfg, mode: str, **kwargs) -> MineDetector:
+        """In-process detector, or one running in a worker process (ML_WORKER_PROCESS)"""
+        kwargs.update(
+            confidence_threshold=cfg.ml.confidence_threshold,
+            frames_per_cell=cfg.ml.frames_per_cell,
+            fusion=cfg.ml.fusion,
+            early_stop_confidence=cfg.ml.early_stop_confidence
+        )
+        if cfg.ml.worker_process:
+            return ProcessDetector(mode, slots=cfg.ml.worker_slots, **kwargs)
+        return MineDetector(mode, **kwargs)
+    
     def _start_heartbeat(self):
         """Start heartbeat thread"""
         self.heartbeat_running = True
@@ -118,31 +218,58 @@ class MineFinderAttachment:
         """Handle mission start command from control panel"""
         try:
             mission_id = payload.get('mission_id', 'unknown')
-            start = payload['start']
-            goal = payload['goal']
             params = payload.get('parameters', {})
             
+            self._require_detector()
             self.log.info(f"Starting mission {mission_id}")
-            self.log.info(f"  Start: ({start['lat']:.6f}, {start['lon']:.6f})")
-            self.log.info(f"  Goal: ({goal['lat']:.6f}, {goal['lon']:.6f})")
             
-            # Create corridor configuration
-            corridor_config = CorridorConfig(
-                start=(start['lat'], start['lon']),
-                goal=(goal['lat'], goal['lon']),
-                corridor_width_m=params.get('corridor_width_m', 3.0),
-                scan_cell_size_m=params.get('grid_size_m', 1.0),
-                altitude_m=params.get('altitude_m', 10.0),
-                num_lines=params.get('num_lines', 3)
-            )
+            if 'polygon' in payload:
+                # Area mission: cover a polygon (with optional no-scan holes)
+                polygon = [(p['lat'], p['lon']) for p in payload['polygon']]
+                holes = [[(p['lat'], p['lon']) for p in hole] for hole in payload.get('holes', [])]
+                self.log.info(f"  Area: {len(polygon)} vertices, {len(holes)} holes")
+                
+                launch = payload.get('start')
+                mission_config = AreaConfig(
+                    polygon=polygon,
+                    holes=holes,
+                    start=(launch['lat'], launch['lon']) if launch else None,
+                    scan_cell_size_m=params.get('grid_size_m', 1.0),
+                    line_spacing_m=params.get('line_spacing_m', params.get('grid_size_m', 1.0)),
+                    altitude_m=params.get('altitude_m', 10.0),
+                    sweep_angle_deg=params.get('sweep_angle_deg')
+                )
+                self.algorithm = AreaCoverageAlgorithm(mission_config)
+            else:
+                start = payload['start']
+                goal = payload['goal']
+                self.log.info(f"  Start: ({start['lat']:.6f}, {start['lon']:.6f})")
+                self.log.info(f"  Goal: ({goal['lat']:.6f}, {goal['lon']:.6f})")
+                
+                # Create corridor configuration
+                mission_config = CorridorConfig(
+                    start=(start['lat'], start['lon']),
+                    goal=(goal['lat'], goal['lon']),
+                    corridor_width_m=params.get('corridor_width_m', 3.0),
+                    scan_cell_size_m=params.get('grid_size_m', 1.0),
+                    altitude_m=params.get('altitude_m', 10.0),
+                    num_lines=params.get('num_lines', 3),
+                    adaptive=params.get('adaptive', False),
+                    coarse_factor=params.get('coarse_factor', 3),
+                    coarse_altitude_m=params.get('coarse_altitude_m')
+                )
+                self.algorithm = CorridorSweepAlgorithm(mission_config)
             
-            self.algorithm = CorridorSweepAlgorithm(corridor_config)
+            self._set_scan_mode(params)
+            self.algorithm.on_path_update = self._publish_partial_path
+            self._start_checkpoint(mission_id)
+            self._start_recorder(mission_id, 'mission_start')
             self.mission_active = True
             
             # Start mission in separate thread
             mission_thread = threading.Thread(
                 target=self._run_mission_loop,
-                args=(mission_id, corridor_config),
+                args=(mission_id, mission_config),
                 daemon=True
             )
             mission_thread.start()
@@ -154,6 +281,74 @@ class MineFinderAttachment:
                 'error': str(e)
             })
     
+    def _set_scan_mode(self, params: dict):
+        """Scan mode and line speed for the next mission (mission parameters override config)"""
+        scan_mode = params.get('scan_mode', self.config.drone.scan_mode)
+        if scan_mode not in ('stop', 'continuous'):
+            raise ValueError(f"Unknown scan mode: {scan_mode}")
+        self.scan_mode = scan_mode
+        self.scan_speed_ms = float(params.get('scan_speed_ms', self.config.drone.scan_speed_ms))
+        self.log.info(f"  Scan mode: {scan_mode}" + (f" at {self.scan_speed_ms} m/s" if scan_mode == 'continuous' else ""))
+    
+    def _start_checkpoint(self, mission_id: str):
+        """Persist scan results of a new mission so it can be resumed"""
+        try:
+            MissionCheckpoint(self.config.checkpoint_dir, mission_id).create(self.algorithm)
+        except OSError as e:
+            self.log.warning(f"Mission checkpointing disabled: {e}")
+    
+    def _start_recorder(self, mission_id: str, event: str):
+        """Record the mission's frames, poses and detections (RECORDER_ENABLED)"""
+        cfg = self.config.recorder
+        if not cfg.enabled:
+            return
+        try:
+            recorder = FlightRecorder(cfg.directory, mission_id, cfg.codec, cfg.jpeg_quality,
+                                      int(cfg.segment_mb * 2**20), int(cfg.queue_mb * 2**20), cfg.sync_s)
+            recorder.start()
+        except (OSError, ValueError) as e:
+            self.log.warning(f"Flight recorder disabled: {e}")
+            return
+        recorder.record_event(event, mission_id=mission_id, scan_mode=self.scan_mode,
+                              config=dataclasses.asdict(self.algorithm.config))
+        self.recorder = recorder
+    
+    def _handle_mission_resume(self, payload: dict):
+        """Continue an interrupted mission from its last scanned cell"""
+        try:
+            if self.mission_active:
+                raise RuntimeError("A mission is already running")
+            self._require_detector()
+            
+            mission_id = payload.get('mission_id') or MissionCheckpoint.latest(self.config.checkpoint_dir)
+            if mission_id is None:
+                raise RuntimeError("No mission checkpoint to resume")
+            
+            checkpoint = MissionCheckpoint(self.config.checkpoint_dir, mission_id)
+            if not checkpoint.exists():
+                raise RuntimeError(f"No checkpoint for mission {mission_id}")
+            
+            self.log.info(f"Resuming mission {mission_id}")
+            self.algorithm = checkpoint.load()
+            self._set_scan_mode(payload.get('parameters', {}))
+            self.algorithm.on_path_update = self._publish_partial_path
+            self._start_recorder(mission_id, 'mission_resume')
+            self.mission_active = True
+            
+            mission_thread = threading.Thread(
+                target=self._run_mission_loop,
+                args=(mission_id, self.algorithm.config),
+                daemon=True
+            )
+            mission_thread.start()
+            
+        except Exception as e:
+            self.log.error(f"Error resuming mission: {e}")
+            self.mqtt.publish_status({
+                'state': 'error',
+                'error': str(e)
+            })
+    
     def _handle_mission_stop(self, payload: dict):
         """Handle mission stop command"""
         self.log.info("Mission stop requested")
@@ -169,30 +364,50 @@ class MineFinderAttachment:
     
     def _run_mission_loop(self, mission_id: str, corridor_config: CorridorConfig):
         """Main mission execution loop"""
+        recorder = self.recorder
         try:
             # Takeoff
             self.log.info(f"Taking off to {corridor_config.altitude_m}m...")
             self.drone.arm_and_takeoff(corridor_config.altitude_m)
             
+            # Share the mission projection so waypoint distances match the plan
+            self.drone.projection = self.algorithm.projection
+            
+            algorithm = self.algorithm
+            self._outstanding = 0
+            t_start = time.monotonic()
+            
             # Main scanning loop
             while self.mission_active:
-                # Get next waypoint
-                waypoint = self.algorithm.get_next_waypoint()
+                with self._algorithm_lock:
+                    waypoint = algorithm.get_next_waypoint()
+                    if waypoint is None and self._outstanding:
+                        # Late results may still queue refinement cells
+                        self._results_changed.wait(timeout=1.0)
+                        continue
+                
                 if waypoint is None:
                     self.log.info("Scan complete!")
                     break
                 
+                if self.scan_mode == 'continuous':
+                    if not self._scan_line(algorithm, waypoint[2]):
+                        break
+                    continue
+                
                 lat, lon, alt = waypoint
                 
                 # Fly to waypoint
                 self.log.debug(f"Flying to waypoint ({lat:.6f}, {lon:.6f})")
                 success = self.drone.goto_and_wait(lat, lon, alt, timeout=120)
+                settled = time.monotonic()
                 
                 if not success:
                     self.log.warning("Failed to reach waypoint, continuing...")
                 
-                # Capture thermal image
-                image = self.sensor.capture()
+                # Capture thermal image, exposed after arrival (not one buffered during the leg)
+                image = self.sensor.capture_after(settled)
+                self._record_frame(image)
                 
                 if image is None:
                     self.log.warning("Failed to capture image")
@@ -203,32 +418,34 @@ class MineFinderAttachment:
                         break
                     continue
                 
-                # Run detection
-                result = self.detector.detect(image)
-                
-                # Record result
-                self.algorithm.record_scan_result(
-                    result['mine'],
-                    result['confidence']
-                )
-                
-                # Publish detection event
-                self.mqtt.publish_detection({
-                    'position': {'lat': lat, 'lon': lon, 'alt_m': alt},
-                    'result': 'mine' if result['mine'] else 'clear',
-                    'confidence': result['confidence'],
-                    'sensor_id': result['sensor']
-                })
+                with self._algorithm_lock:
+                    cell = algorithm.mark_in_flight()
+                    self._outstanding += 1
+                if self._hover_frames:
+                    # Several frames (or retries) per cell: keep capturing until the verdict settles
+                    self.publisher.submit(self._record_result, algorithm, cell,
+                                          self._capture_burst(cell, image), (lat, lon, alt))
+                else:
+                    # Hand the frame to the pipeline and fly on; the result is recorded when it arrives
+                    self._submit_detection(algorithm, cell, [image], (lat, lon, alt))
                 
-                # Publish telemetry
-                self._publish_telemetry()
+                # Publish telemetry (skipped if the publisher is backed up)
+                self.publisher.submit(self._publish_telemetry, droppable=True)
             
             # Mission complete
             if self.mission_active:
                 self.log.info("Mission complete, returning to start...")
                 
-                # Get safe path
-                safe_path = self.algorithm.get_safe_path()
+                # Results of the last frames, then everything they published
+                with self._algorithm_lock:
+                    self._results_changed.wait_for(lambda: self._outstanding == 0, timeout=30)
+                    safe_path = algorithm.get_safe_path()
+                    stats = algorithm.get_statistics()
+                self.publisher.flush()
+                stats['mission_time_s'] = round(time.monotonic() - t_start, 1)
+                if recorder is not None:
+                    recorder.record_event('mission_complete', statistics=stats)
+                
                 if safe_path:
                     self.mqtt.publish_path(safe_path)
                 
@@ -237,7 +454,6 @@ class MineFinderAttachment:
                 self.drone.land()
                 
                 # Publish completion status
-                stats = self.algorithm.get_statistics()
                 self.mqtt.publish_status({
                     'state': 'complete',
                     'mission_id': mission_id,
@@ -246,6 +462,8 @@ class MineFinderAttachment:
             
         except Exception as e:
             self.log.error(f"Mission error: {e}", exc_info=True)
+            if recorder is not None:
+                recorder.record_event('mission_error', error=str(e))
             self.mqtt.publish_status({
                 'state': 'error',
                 'mission_id': mission_id,
@@ -256,6 +474,247 @@ class MineFinderAttachment:
         
         finally:
             self.mission_active = False
+            # Late results check mission_active under the same lock before recording
+            with self._algorithm_lock:
+                if self.algorithm and self.algorithm.checkpoint:
+                    self.algorithm.checkpoint.close()
+            # A mission started right after this one has its own recorder
+            if recorder is not None:
+                recorder.close()
+                if self.recorder is recorder:
+                    self.recorder = None
+    
+    def _scan_line(self, algorithm, alt: float) -> bool:
+        """
+        Continuous scan mode: fly the next straight run of cells at scan speed
+        without stopping, capturing at capture_hz. Each frame is placed at the
+        position interpolated from telemetry at its capture time and handed to
+        the cells its footprint covers. Returns False if the mission must abort.
+        """
+        with self._algorithm_lock:
+            cells = claim_line(algorithm)
+            self._outstanding += len(cells)
+            lats = algorithm.grid.lat[cells].astype(float)
+            lons = algorithm.grid.lon[cells].astype(float)
+        
+        projection = algorithm.projection
+        east, north = projection.forward_many(lats, lons)
+        cfg = algorithm.config
+        footprint = (getattr(cfg, 'footprint_m', None) or cfg.scan_cell_size_m) * alt / cfg.altitude_m
+        scan = LineScan(cells, east, north, footprint, self.detector.frames_per_cell)
+        positions = {cell: (float(la), float(lo), alt) for cell, la, lo in zip(cells, lats, lons)}
+        
+        def submit(ready):
+            for cell, images in ready:
+                self._submit_detection(algorithm, cell, images, positions[cell])
+        
+        def place(ts, image):
+            pos = self.drone.position_at(ts) or self.drone.get_position()
+            self._record_frame(image, pos)
+            submit(scan.add(image, *projection.forward(pos[0], pos[1])))
+        
+        # Enter the line at its first cell, then fly the pass without stopping
+        end_lat, end_lon = float(lats[-1]), float(lons[-1])
+        self.drone.goto_and_wait(float(lats[0]), float(lons[0]), alt, timeout=120)
+        self.drone.goto(end_lat, end_lon, alt, speed_ms=self.scan_speed_ms)
+        
+        period = 1.0 / max(self.config.sensor.capture_hz, 0.1)
+        latency = self.config.sensor.capture_latency_ms / 1000
+        arrive_m = min(self.config.drone.waypoint_accept_radius_m, footprint / 4)
+        length = float(np.hypot(east[-1] - east[0], north[-1] - north[0]))
+        deadline = time.monotonic() + 2 * length / self.scan_speed_ms + 30
+        waiting = deque()  # Frames newer than the last telemetry sample
+        last_frame = None
+        next_capture = time.monotonic()
+        next_telemetry = next_capture
+        dwell_until = None
+        
+        while self.mission_active:
+            if dwell_until is None and self.drone.distance_to(end_lat, end_lon) <= arrive_m:
+                # Hover briefly at the end until the last cells have a frame placed over them
+                dwell_until = time.monotonic() + 1.0
+            image = self.sensor.capture()
+            if image is not None and image.timestamp != last_frame:
+                # Skip repeats when capturing faster than the camera delivers
+                last_frame = image.timestamp
+                waiting.append((last_frame - latency, image))
+            
+            # Place frames once telemetry after their capture time is in, so they are interpolated
+            latest = self.drone.track.latest_time
+            while waiting and latest is not None and waiting[0][0] <= latest:
+                place(*waiting.popleft())
+            
+            if time.monotonic() >= next_telemetry:
+                self.publisher.submit(self._publish_telemetry, droppable=True)
+                next_telemetry += 1.0
+            if dwell_until is not None and (scan.uncovered == 0 or time.monotonic() > dwell_until):
+                break
+            if time.monotonic() > deadline:
+                break
+            next_capture += period
+            time.sleep(max(next_capture - time.monotonic(), 0.0))
+        
+        # Let telemetry catch up with the last frames so they are interpolated too
+        settle = time.monotonic() + 1.0
+        while waiting and (self.drone.track.latest_time or 0.0) < waiting[-1][0] and time.monotonic() < settle:
+            time.sleep(0.02)
+        while waiting:
+            place(*waiting.popleft())
+        ready, missed = scan.finish()
+        submit(ready)
+        self.log.debug(f"Line of {len(cells)} cells: {scan.frames} frames, {len(missed)} cells missed")
+        
+        # Cells no frame covered (dropped frames, aborted pass) get a stop-and-capture scan
+        for k, cell in enumerate(missed):
+            if not self.mission_active:
+                break
+            if not self._scan_missed(algorithm, cell, positions[cell]):
+                # Cells after this one stay in flight in the checkpoint and are rescanned on resume
+                with self._algorithm_lock:
+                    self._outstanding -= len(missed) - k - 1
+                return False
+        return True
+    
+    def _scan_missed(self, algorithm, cell: int, position: Tuple[float, float, float]) -> bool:
+        """Hover over a cell the fly-through pass missed and capture it; False if the mission must abort"""
+        self.drone.goto_and_wait(*position, timeout=120)
+        settled = time.monotonic()
+        for _ in range(max(self.config.failsafe.camera_failure_retries, 1)):
+            image = self.sensor.capture_after(settled)
+            self._record_frame(image)
+            if image is not None:
+                if self._hover_frames:
+                    self.publisher.submit(self._record_result, algorithm, cell,
+                                          self._capture_burst(cell, image), position)
+                else:
+                    self._submit_detection(algorithm, cell, [image], position)
+                return True
+        
+        self.log.warning(f"Failed to capture image for cell {cell}")
+        # The cell is already in flight, so it still needs a result: failsafe, assume mine
+        camera_failure = {'mine': True, 'confidence': 0.5, 'sensor': 'camera_failure'}
+        self.publisher.submit(self._record_result, algorithm, cell, camera_failure, position)
+        if self.config.failsafe.camera_failure_action == 'return_to_start':
+            self.log.error("Camera failure, returning to start")
+            self.drone.return_to_start()
+            return False
+        return True
+    
+    @property
+    def _hover_frames(self) -> bool:
+        """Stop mode captures more than one frame per cell (fusion or ML retries)"""
+        return self.detector.frames_per_cell > 1 or self.config.failsafe.ml_nan_action == 'retry'
+    
+    def _capture_burst(self, cell: int, image) -> Dict[str, Any]:
+        """
+        Stop mode with several frames per cell: while hovering, detect each
+        frame before capturing the next and stop as soon as the fused verdict
+        is confident. With ml_nan_action=retry, frames without a verdict are
+        replaced up to camera_failure_retries times.
+        """
+        failsafe = self.config.failsafe
+        retries = failsafe.camera_failure_retries if failsafe.ml_nan_action == 'retry' else 0
+        fusion = self.detector.new_fusion(retries=retries)
+        while True:
+            if image is None:
+                result = failed_result("camera failure")
+            else:
+                try:
+                    result = self.inference.submit(cell, image).result(timeout=30)
+                except Exception as e:
+                    result = failed_result(str(e) or type(e).__name__)
+                self._record_detection(image, result, cell)
+            if fusion.add(result) or not self.mission_active:
+                return fusion.result()
+            # A new frame, not the one just analyzed
+            image = self.sensor.capture_after(image.timestamp if image is not None else time.monotonic())
+            self._record_frame(image)
+    
+    def _record_frame(self, image, position: Optional[Tuple[float, float, float]] = None):
+        """Hand a captured frame, with the pose and battery at its capture time, to the flight recorder"""
+        recorder = self.recorder
+        if recorder is None or image is None:
+            return
+        if position is None:
+            t = image.timestamp - self.config.sensor.capture_latency_ms / 1000
+            position = self.drone.position_at(t) or self.drone.get_position()
+        recorder.record_frame(image, position, self.drone.get_battery())
+    
+    def _record_detection(self, image, result: Dict[str, Any], cell: int):
+        recorder = self.recorder
+        if recorder is not None:
+            recorder.record_detection(image, result, cell)
+    
+    def _submit_detection(self, algorithm, cell: int, images: List[Any], position: Tuple[float, float, float]):
+        """
+        Queue a cell's frames (nearest first) for inference; the fused result
+        is recorded on the publisher thread. Frames still queued when the
+        verdict turns confident are cancelled and never reach the detector.
+        """
+        fusion = self.detector.new_fusion(len(images))
+        lock = threading.Lock()
+        
+        def on_done(f: Future, image):
+            if f.cancelled():
+                return
+            try:
+                result = f.result()
+            except Exception as e:
+                result = failed_result(str(e) or type(e).__name__)
+            self._record_detection(image, result, cell)
+            with lock:
+                if fusion.done:
+                    return  # Finished frames racing an early stop
+                if not fusion.add(result):
+                    return
+            for other in futures:
+                other.cancel()
+            self.publisher.submit(self._record_result, algorithm, cell, fusion.result(), position)
+        
+        # Blocks only when inference has fallen queue_depth frames behind
+        futures = [self.inference.submit(cell, image) for image in images]
+        for image, future in zip(images, futures):
+            future.add_done_callback(lambda f, image=image: on_done(f, image))
+    
+    def _record_result(self, algorithm, cell: int, result: Dict[str, Any], position: Tuple[float, float, float]):
+        """Record a cell's fused detection in the sweep and publish it (publisher thread)"""
+        if result.get('mine') is None:
+            action = self.config.failsafe.ml_nan_action
+            self.log.error(f"No detection for cell {cell} after {result.get('attempts', 1)} frames "
+                           f"({result.get('error')}), failsafe: {'skip' if action == 'skip' else 'assume mine'}")
+            if action == 'skip':
+                # No evidence either way: the belief map keeps its prior for this cell
+                result = {**result, 'mine': False, 'confidence': 0.5, 'sensor': 'detector_failure'}
+            else:
+                # Conservative default (also after exhausted retries)
+                result = {**result, 'mine': True, 'confidence': 0.5, 'sensor': 'detector_failure'}
+        
+        with self._algorithm_lock:
+            if algorithm is not self.algorithm:
+                return  # A later mission replaced this one
+            self._outstanding -= 1
+            self._results_changed.notify_all()
+            if not self.mission_active:
+                # Stopped: the cell stays in flight in the checkpoint and is rescanned on resume
+                return
+            algorithm.record_cell_result(cell, result['mine'], result['confidence'])
+        
+        recorder = self.recorder
+        if recorder is not None:
+            recorder.record_cell(cell, result, position)
+        
+        lat, lon, alt = position
+        self.mqtt.publish_detection({
+            'position': {'lat': lat, 'lon': lon, 'alt_m': alt},
+            'result': 'mine' if result['mine'] else 'clear',
+            'confidence': result['confidence'],
+            'sensor_id': result['sensor'],
+            'frames': result.get('frames', 1)
+        })
+    
+    def _publish_partial_path(self, safe_path: list):
+        """Publish the repaired safe path (from the latest reading to the goal) while the sweep runs"""
+        self.mqtt.publish_path(safe_path, partial=True)
     
     def _publish_telemetry(self):
         """Publish current position and progress"""
@@ -269,7 +728,8 @@ class MineFinderAttachment:
         }
         
         if self.algorithm:
-            stats = self.algorithm.get_statistics()
+            with self._algorithm_lock:
+                stats = self.algorithm.get_statistics()
             telemetry.update({
                 'progress': stats['progress'],
                 'cells_scanned': stats['scanned_cells'],
@@ -277,6 +737,12 @@ class MineFinderAttachment:
                 'mines_detected': stats['mines_detected']
             })
         
+        if hasattr(self.sensor, 'stats'):
+            telemetry['camera'] = self.sensor.stats()
+        recorder = self.recorder
+        if recorder is not None:
+            telemetry['recorder'] = recorder.stats()
+        
         self.mqtt.publish_telemetry(telemetry)
     
     def stop(self):
@@ -287,6 +753,11 @@ class MineFinderAttachment:
         self.heartbeat_running = False
         
         # Close connections
+        self.inference.close(timeout=5)
+        self.detector.close()
+        if self.recorder is not None:
+            self.recorder.close()
+        self.publisher.close(timeout=5)
         self.sensor.close()
         self.drone.close()
         self.mqtt.disconnect()
@@ -171,12 +171,13 @@ class MineFinderMQTTClient:
         self.client.publish(topic, json.dumps(envelope), qos=1)
         self.log.info(f"Published detection: {detection.get('result')} at confidence {detection.get('confidence')}")
     
-    def publish_path(self, waypoints: list):
-        """Publish calculated path"""
+    def publish_path(self, waypoints: list, partial: bool = False):
+        """Publish calculated path (partial=True while the sweep is still running)"""
         topic = MQTTTopics.attachment_telemetry(self.attachment_id)
         data = {
             'type': 'path_update',
             'waypoints': waypoints,
+            'partial': partial,
             'ts': int(time.time() * 1000)
         }
         envelope = self._create_envelope(data)
@@ -0,0 +1,94 @@
+"""Dispatch partitioned missions to several attachments and merge their detections"""
+
+import json
+import ssl
+import time
+import uuid
+import logging
+import threading
+from typing import List, Optional, Tuple
+
+import paho.mqtt.client as mqtt
+
+from navigation.geodesy import LocalProjection
+from algorithms.mine_map import MineMap
+from algorithms.partition import merge_detections
+from .topics import MQTTTopics
+
+
+class FleetCoordinator:
+    """
+    Ground-side MQTT client for multi-attachment missions.
+
+    Sends per-attachment mission_start commands on each attachment's
+    command topic and folds every detection event published by the fleet
+    into one shared mine map.
+    """
+
+    def __init__(self, projection: LocalProjection, merge_radius_m: float = 0.5):
+        self.client = mqtt.Client(client_id=f"minefinder-fleet-{uuid.uuid4().hex[:8]}")
+        self.client.on_connect = self._on_connect
+        self.client.on_message = self._on_message
+        self.mine_map = MineMap(projection, merge_radius_m)
+        self._lock = threading.Lock()
+        self.connected = False
+        self.log = logging.getLogger(__name__)
+
+    def connect(self, host: str, port: int = 8883, username: Optional[str] = None,
+                password: Optional[str] = None, use_tls: bool = True, timeout: float = 10.0) -> bool:
+        """Connect to the broker and subscribe to fleet detections"""
+        try:
+            if use_tls:
+                self.client.tls_set(tls_version=ssl.PROTOCOL_TLS)
+            if username and password:
+                self.client.username_pw_set(username, password)
+
+            self.client.connect(host, port, keepalive=60)
+            self.client.loop_start()
+
+            start = time.time()
+            while not self.connected and (time.time() - start) < timeout:
+                time.sleep(0.1)
+            return self.connected
+
+        except Exception as e:
+            self.log.error(f"MQTT connection error: {e}")
+            return False
+
+    def disconnect(self):
+        self.client.loop_stop()
+        self.client.disconnect()
+        self.connected = False
+
+    def _on_connect(self, client, userdata, flags, rc):
+        if rc == 0:
+            self.connected = True
+            client.subscribe(MQTTTopics.attachment_detection('+'), qos=1)
+        else:
+            self.log.error(f"Connection failed with code {rc}")
+
+    def _on_message(self, client, userdata, msg):
+        try:
+            payload = json.loads(msg.payload.decode())
+            detection = payload.get('payload', payload)
+            with self._lock:
+                merge_detections(self.mine_map, [detection])
+        except Exception as e:
+            self.log.error(f"Error processing detection: {e}")
+
+    def dispatch(self, commands: List[Tuple[str, dict]]):
+        """Publish (attachment_id, mission_start payload) pairs from partition.mission_commands"""
+        for attachment_id, payload in commands:
+            envelope = {
+                'msg_id': str(uuid.uuid4()),
+                'ts': int(time.time() * 1000),
+                'correlation_id': str(uuid.uuid4()),
+                'payload': payload
+            }
+            self.client.publish(MQTTTopics.attachment_command(attachment_id), json.dumps(envelope), qos=2)
+            self.log.info(f"Dispatched {payload['mission_id']} to {attachment_id}")
+
+    def mines(self) -> List[Tuple[float, float]]:
+        """Merged mine positions reported so far"""
+        with self._lock:
+            return self.mine_map.positions()
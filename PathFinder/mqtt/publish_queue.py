@@ -0,0 +1,71 @@
+"""Bounded background queue for MQTT publishing and result handling"""
+
+import queue
+import logging
+import threading
+from typing import Callable, Optional
+
+
+class PublishQueue:
+    """
+    Runs publish jobs in submission order on one worker thread, so the
+    mission thread never waits on the network.
+
+    The queue is bounded. Jobs submitted with droppable=True (telemetry)
+    are discarded when it is full, since a newer one follows shortly.
+    Everything else (detections, paths) blocks the submitter until there
+    is room, which slows the pipeline down instead of losing results.
+    """
+
+    def __init__(self, max_pending: int = 64):
+        self._queue: "queue.Queue[Optional[tuple]]" = queue.Queue(maxsize=max(int(max_pending), 1))
+        self._thread: Optional[threading.Thread] = None
+        self.published = 0
+        self.dropped = 0
+        self.log = logging.getLogger(__name__)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="publisher", daemon=True)
+            self._thread.start()
+
+    def submit(self, job: Callable, *args, droppable: bool = False) -> bool:
+        """Queue job(*args); False if a droppable job was discarded"""
+        if droppable:
+            try:
+                self._queue.put_nowait((job, args))
+            except queue.Full:
+                self.dropped += 1
+                return False
+        else:
+            self._queue.put((job, args))
+        return True
+
+    def flush(self):
+        """Block until every queued job has run"""
+        self._queue.join()
+
+    def close(self, timeout: Optional[float] = None):
+        """Run the queued jobs and stop the worker"""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout)
+            self._thread = None
+
+    @property
+    def backlog(self) -> int:
+        return self._queue.qsize()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                job, args = item
+                job(*args)
+                self.published += 1
+            except Exception as e:
+                self.log.error(f"Publish job failed: {e}", exc_info=True)
+            finally:
+                self._queue.task_done()
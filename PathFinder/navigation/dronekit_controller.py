@@ -3,7 +3,6 @@
 from typing import Tuple, Optional, Callable
 import time
 import logging
-import math
 
 
 try:
@@ -15,6 +14,8 @@ except ImportError:
 
 
 from .simulator import DroneConfig
+from .geodesy import LocalProjection
+from .trajectory import PoseHistory
 
 
 class DroneKitController:
@@ -33,6 +34,10 @@ class DroneKitController:
         self.mission_start_pos: Optional[Tuple[float, float, float]] = None
         self.on_low_battery: Optional[Callable] = None
         self._mission_start_time: Optional[float] = None
+        self.projection: Optional[LocalProjection] = None
+        # Position telemetry as it arrives, for placing frames captured in flight.
+        # Resolution follows the autopilot's position stream rate (SRx_POSITION).
+        self.track = PoseHistory()
     
     def connect(self) -> bool:
         """Connect to drone via MAVLink"""
@@ -46,6 +51,12 @@ class DroneKitController:
             )
             self.log.info(f"Connected: {self.vehicle.version}")
             
+            # Timestamp every position update for fly-through frame placement
+            @self.vehicle.on_attribute('location.global_relative_frame')
+            def location_callback(vehicle, attr_name, value):
+                if value.lat is not None and value.lon is not None:
+                    self.track.record(time.monotonic(), value.lat, value.lon, value.alt or 0)
+            
             # Register battery callback
             @self.vehicle.on_attribute('battery')
             def battery_callback(self, attr_name, value):
@@ -71,6 +82,7 @@ class DroneKitController:
         loc = self.vehicle.location.global_relative_frame
         self.mission_start_pos = (loc.lat, loc.lon, loc.alt or 0)
         self._mission_start_time = time.time()
+        self.projection = LocalProjection(loc.lat, loc.lon)
         
         # Pre-arm checks
         self.log.info("Waiting for vehicle to be armable...")
@@ -101,24 +113,39 @@ class DroneKitController:
         
         return True
     
-    def goto(self, lat: float, lon: float, alt: float) -> bool:
-        """Fly to GPS position"""
+    def goto(self, lat: float, lon: float, alt: float, speed_ms: Optional[float] = None) -> bool:
+        """Fly to GPS position (returns at once)"""
         if not self.vehicle:
             return False
         
         target = LocationGlobalRelative(lat, lon, alt)
-        self.vehicle.simple_goto(target, groundspeed=self.config.default_speed_ms)
+        self.vehicle.simple_goto(target, groundspeed=speed_ms or self.config.default_speed_ms)
         return True
     
+    def distance_to(self, lat: float, lon: float) -> float:
+        """Horizontal distance from the current position in metres"""
+        current_lat, current_lon, _ = self.get_position()
+        projection = self.projection or LocalProjection(lat, lon)
+        return projection.distance_m(current_lat, current_lon, lat, lon)
+    
+    def position_at(self, t: float) -> Optional[Tuple[float, float, float]]:
+        """Position at a time.monotonic() timestamp, interpolated from telemetry"""
+        return self.track.at(t)
+    
     def goto_and_wait(self, lat: float, lon: float, alt: float, 
                       timeout: float = 60.0) -> bool:
         """Fly to position and wait until arrived"""
         self.goto(lat, lon, alt)
         
+        # Project the target once; each poll is then a multiply-add
+        projection = self.projection or LocalProjection(lat, lon)
+        target_e, target_n = projection.forward(lat, lon)
+        
         start = time.time()
         while time.time() - start < timeout:
             loc = self.vehicle.location.global_relative_frame
-            dist = self._haversine_distance(loc.lat, loc.lon, lat, lon)
+            e, n = projection.forward(loc.lat, loc.lon)
+            dist = ((e - target_e)**2 + (n - target_n)**2)**0.5
             
             if dist < self.config.waypoint_accept_radius_m:
                 self.log.info(f"Arrived at waypoint ({lat:.6f}, {lon:.6f})")
@@ -183,21 +210,6 @@ class DroneKitController:
         elapsed_min = (time.time() - self._mission_start_time) / 60
         return elapsed_min >= self.config.max_flight_time_min
     
-    @staticmethod
-    def _haversine_distance(lat1: float, lon1: float, 
-                            lat2: float, lon2: float) -> float:
-        """Calculate distance between two GPS points in meters"""
-        R = 6371000  # Earth radius in meters
-        
-        lat1, lon1, lat2, lon2 = map(math.radians, [lat1, lon1, lat2, lon2])
-        dlat = lat2 - lat1
-        dlon = lon2 - lon1
-        
-        a = math.sin(dlat/2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon/2)**2
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
-        
-        return R * c
-    
     def close(self):
         """Disconnect from drone"""
         if self.vehicle:
@@ -0,0 +1,136 @@
+"""
+Local metric projection shared by planning, simulation and navigation.
+
+Missions span at most a few kilometres, so GPS positions are projected onto
+a tangent plane (east/north metres) around a fixed origin. All scale
+factors are computed once from the WGS84 ellipsoid at the origin; forward
+and inverse transforms are then plain multiply-adds, with second-order terms
+for the change of longitude scale with latitude and for meridian
+convergence. Distances stay within centimetres of the geodesic within a
+few kilometres of the origin.
+"""
+
+import math
+from typing import Tuple
+
+import numpy as np
+
+
+# WGS84 ellipsoid
+WGS84_A = 6378137.0
+WGS84_F = 1 / 298.257223563
+WGS84_E2 = WGS84_F * (2 - WGS84_F)
+
+
+class LocalProjection:
+    """East/north tangent-plane projection around a fixed origin"""
+
+    def __init__(self, origin_lat: float, origin_lon: float):
+        self.origin_lat = origin_lat
+        self.origin_lon = origin_lon
+
+        phi = math.radians(origin_lat)
+        sin_phi, cos_phi = math.sin(phi), math.cos(phi)
+        w = 1 - WGS84_E2 * sin_phi * sin_phi
+        meridional_r = WGS84_A * (1 - WGS84_E2) / w ** 1.5
+        normal_r = WGS84_A / math.sqrt(w)
+
+        rad = math.pi / 180
+        self.m_per_deg_lat = meridional_r * rad
+        self.m_per_deg_lon = normal_r * cos_phi * rad
+        # d(m_per_deg_lon)/d(lat) relative to m_per_deg_lon, per degree
+        self._lon_scale_slope = (WGS84_E2 * sin_phi * cos_phi / w - math.tan(phi)) * rad
+        # Northing gained by moving east along a parallel (meridian convergence), per degree²
+        self._convergence = 0.5 * normal_r * sin_phi * cos_phi * rad * rad
+
+    def _lon_scale(self, dlat):
+        """Metres per degree of longitude at origin_lat + dlat"""
+        return self.m_per_deg_lon * (1 + self._lon_scale_slope * dlat)
+
+    def forward(self, lat: float, lon: float) -> Tuple[float, float]:
+        """GPS position to local (east, north) metres"""
+        dlat = lat - self.origin_lat
+        dlon = lon - self.origin_lon
+        return (dlon * self._lon_scale(dlat),
+                dlat * self.m_per_deg_lat + self._convergence * dlon * dlon)
+
+    def inverse(self, east: float, north: float) -> Tuple[float, float]:
+        """Local (east, north) metres to GPS position (lat, lon)"""
+        dlat = north / self.m_per_deg_lat
+        for _ in range(2):
+            dlon = east / self._lon_scale(dlat)
+            dlat = (north - self._convergence * dlon * dlon) / self.m_per_deg_lat
+        return (self.origin_lat + dlat,
+                self.origin_lon + east / self._lon_scale(dlat))
+
+    def forward_many(self, lat, lon) -> Tuple[np.ndarray, np.ndarray]:
+        """Vectorized forward(): arrays of lat/lon to arrays of east/north"""
+        dlat = np.asarray(lat, dtype=np.float64) - self.origin_lat
+        dlon = np.asarray(lon, dtype=np.float64) - self.origin_lon
+        return (dlon * self._lon_scale(dlat),
+                dlat * self.m_per_deg_lat + self._convergence * dlon * dlon)
+
+    def inverse_many(self, east, north) -> Tuple[np.ndarray, np.ndarray]:
+        """Vectorized inverse(): arrays of east/north to arrays of lat/lon"""
+        north = np.asarray(north, dtype=np.float64)
+        east = np.asarray(east, dtype=np.float64)
+        dlat = north / self.m_per_deg_lat
+        for _ in range(2):
+            dlon = east / self._lon_scale(dlat)
+            dlat = (north - self._convergence * dlon * dlon) / self.m_per_deg_lat
+        return self.origin_lat + dlat, self.origin_lon + east / self._lon_scale(dlat)
+
+    def distance_m(self, lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+        """Ground distance between two GPS positions near the origin"""
+        e1, n1 = self.forward(lat1, lon1)
+        e2, n2 = self.forward(lat2, lon2)
+        return math.hypot(e2 - e1, n2 - n1)
+
+
+class CorridorFrame:
+    """
+    Corridor-aligned local frame on top of a LocalProjection.
+    u points from start to goal and v to the left of travel, both in metres
+    with the origin at the corridor start.
+    """
+
+    def __init__(self, start: Tuple[float, float], goal: Tuple[float, float],
+                 projection: LocalProjection = None):
+        self.start = start
+        self.goal = goal
+        self.projection = projection or LocalProjection(*start)
+
+        self._e0, self._n0 = self.projection.forward(*start)
+        east, north = self.projection.forward(*goal)
+        east, north = east - self._e0, north - self._n0
+        self.length_m = math.hypot(east, north)
+        if self.length_m > 0:
+            self.dir_e, self.dir_n = east / self.length_m, north / self.length_m
+        else:
+            self.dir_e, self.dir_n = 1.0, 0.0
+
+    def to_local(self, lat: float, lon: float) -> Tuple[float, float]:
+        """GPS position to corridor frame (u, v) in metres"""
+        east, north = self.projection.forward(lat, lon)
+        east, north = east - self._e0, north - self._n0
+        return (east * self.dir_e + north * self.dir_n,
+                -east * self.dir_n + north * self.dir_e)
+
+    def to_geo(self, u: float, v: float) -> Tuple[float, float]:
+        """Corridor frame (u, v) in metres to GPS position (lat, lon)"""
+        return self.projection.inverse(self._e0 + u * self.dir_e - v * self.dir_n,
+                                       self._n0 + u * self.dir_n + v * self.dir_e)
+
+    def to_local_many(self, lat, lon) -> Tuple[np.ndarray, np.ndarray]:
+        """Vectorized to_local()"""
+        east, north = self.projection.forward_many(lat, lon)
+        east, north = east - self._e0, north - self._n0
+        return (east * self.dir_e + north * self.dir_n,
+                -east * self.dir_n + north * self.dir_e)
+
+    def to_geo_many(self, u, v) -> Tuple[np.ndarray, np.ndarray]:
+        """Vectorized to_geo()"""
+        u = np.asarray(u, dtype=np.float64)
+        v = np.asarray(v, dtype=np.float64)
+        return self.projection.inverse_many(self._e0 + u * self.dir_e - v * self.dir_n,
+                                            self._n0 + u * self.dir_n + v * self.dir_e)
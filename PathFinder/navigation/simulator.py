@@ -3,9 +3,13 @@
 import time
 import random
 import logging
+import threading
 from typing import Tuple, Optional
 from dataclasses import dataclass
 
+from .geodesy import LocalProjection
+from .trajectory import PoseHistory
+
 
 @dataclass 
 class DroneConfig:
@@ -17,10 +21,17 @@ class DroneConfig:
     default_altitude_m: float = 10.0
     default_speed_ms: float = 5.0
     waypoint_accept_radius_m: float = 2.0
+    telemetry_hz: float = 5.0  # Simulated position telemetry rate
 
 
 class SimulatedDroneController:
-    """Simulated drone for testing without hardware"""
+    """
+    Simulated drone for testing without hardware.
+    
+    goto_and_wait() jumps to the target after a short sleep. goto() starts
+    a real-time constant-speed flight instead, sampled into `track` at
+    telemetry_hz like MAVLink position updates, for fly-through scanning.
+    """
     
     def __init__(self, config: Optional[DroneConfig] = None):
         self.config = config or DroneConfig()
@@ -30,16 +41,32 @@ class SimulatedDroneController:
         self.mission_start_pos: Optional[Tuple[float, float, float]] = None
         self.log = logging.getLogger(__name__)
         self._mission_start_time: Optional[float] = None
+        self.projection: Optional[LocalProjection] = None
+        
+        # Position telemetry history and the flight started by goto()
+        self.track = PoseHistory()
+        self._motion: Optional[tuple] = None
+        self._motion_lock = threading.Lock()
+        self._telemetry_running = False
     
     def connect(self) -> bool:
         """Simulate drone connection"""
+        self._telemetry_running = True
+        threading.Thread(target=self._telemetry_loop, name="sim-telemetry", daemon=True).start()
         self.log.info("Simulated drone connected")
         return True
     
+    def _telemetry_loop(self):
+        period = 1.0 / max(self.config.telemetry_hz, 0.1)
+        while self._telemetry_running:
+            self.track.record(time.monotonic(), *self.get_position())
+            time.sleep(period)
+    
     def arm_and_takeoff(self, altitude_m: float) -> bool:
         """Simulate arming and takeoff"""
         self.mission_start_pos = self.position
         self._mission_start_time = time.time()
+        self.projection = LocalProjection(self.position[0], self.position[1])
         self.armed = True
         
         # Simulate takeoff time
@@ -49,19 +76,49 @@ class SimulatedDroneController:
         self.log.info(f"Simulated takeoff to {altitude_m}m")
         return True
     
-    def goto(self, lat: float, lon: float, alt: float) -> bool:
-        """Simulate flying to GPS position"""
+    def goto(self, lat: float, lon: float, alt: float, speed_ms: Optional[float] = None) -> bool:
+        """Start flying to GPS position at constant ground speed (returns at once)"""
         self.log.debug(f"Flying to ({lat:.6f}, {lon:.6f}, {alt:.1f}m)")
+        speed = speed_ms or self.config.default_speed_ms
+        with self._motion_lock:
+            start = self._advance_motion()
+            projection = self.projection or LocalProjection(lat, lon)
+            duration = projection.distance_m(start[0], start[1], lat, lon) / speed
+            self._motion = (time.monotonic(), start, (lat, lon, alt), duration)
         return True
     
+    def _advance_motion(self) -> Tuple[float, float, float]:
+        """Update position along the current goto() flight"""
+        if self._motion is not None:
+            t0, start, end, duration = self._motion
+            f = min((time.monotonic() - t0) / duration, 1.0) if duration > 0 else 1.0
+            self.position = tuple(a + (b - a) * f for a, b in zip(start, end))
+            if f >= 1.0:
+                self._motion = None
+        return self.position
+    
+    def distance_to(self, lat: float, lon: float) -> float:
+        """Horizontal distance from the current position in metres"""
+        current_lat, current_lon, _ = self.get_position()
+        projection = self.projection or LocalProjection(lat, lon)
+        return projection.distance_m(current_lat, current_lon, lat, lon)
+    
+    def position_at(self, t: float) -> Optional[Tuple[float, float, float]]:
+        """Position at a time.monotonic() timestamp, interpolated from telemetry"""
+        return self.track.at(t)
+    
     def goto_and_wait(self, lat: float, lon: float, alt: float, 
                       timeout: float = 60.0) -> bool:
         """Simulate flying to position and waiting until arrived"""
+        with self._motion_lock:
+            self._advance_motion()
+            self._motion = None
+        
         # Simulate flight time based on distance
         current_lat, current_lon, current_alt = self.position
         
-        # Simple distance calculation (not accurate, just for simulation)
-        dist = ((lat - current_lat)**2 + (lon - current_lon)**2)**0.5 * 111320  # rough meters
+        projection = self.projection or LocalProjection(lat, lon)
+        dist = projection.distance_m(current_lat, current_lon, lat, lon)
         flight_time = dist / self.config.default_speed_ms
         
         # Simulate flight (but keep it quick for testing)
@@ -69,6 +126,7 @@ class SimulatedDroneController:
         time.sleep(random.uniform(0.3, actual_wait))
         
         self.position = (lat, lon, alt)
+        self.track.record(time.monotonic(), lat, lon, alt)
         self.log.debug(f"Arrived at ({lat:.6f}, {lon:.6f}, {alt:.1f}m)")
         
         # Simulate battery drain
@@ -78,7 +136,8 @@ class SimulatedDroneController:
     
     def get_position(self) -> Tuple[float, float, float]:
         """Get current GPS position"""
-        return self.position
+        with self._motion_lock:
+            return self._advance_motion()
     
     def get_battery(self) -> dict:
         """Get simulated battery status"""
@@ -102,10 +161,14 @@ class SimulatedDroneController:
         """Simulate landing"""
         self.log.info("Landing...")
         time.sleep(0.5)
+        with self._motion_lock:
+            self._advance_motion()
+            self._motion = None
         self.position = (self.position[0], self.position[1], 0.0)
         self.armed = False
         return True
     
     def close(self):
         """Disconnect from drone"""
+        self._telemetry_running = False
         self.log.info("Simulated drone disconnected")
@@ -0,0 +1,71 @@
+"""Timestamped position history for placing frames captured in flight"""
+
+import threading
+from typing import Optional, Tuple
+
+import numpy as np
+
+
+class PoseHistory:
+    """
+    Ring buffer of (monotonic time, lat, lon, alt) telemetry samples.
+
+    at(t) interpolates linearly between the samples around t, so a frame
+    captured between two telemetry updates is placed where the vehicle
+    actually was. Just past the newest sample the last velocity is
+    extrapolated (up to max_extrapolation_s).
+    """
+
+    def __init__(self, capacity: int = 1024, max_extrapolation_s: float = 0.5):
+        self.capacity = capacity
+        self.max_extrapolation_s = max_extrapolation_s
+        self._t = np.zeros(capacity, dtype=np.float64)
+        self._pos = np.zeros((capacity, 3), dtype=np.float64)
+        self._count = 0
+        self._head = 0  # Next write slot
+        self._lock = threading.Lock()
+
+    def record(self, t: float, lat: float, lon: float, alt: float):
+        """Add a sample; samples not newer than the last one are ignored"""
+        with self._lock:
+            if self._count and t <= self._t[(self._head - 1) % self.capacity]:
+                return
+            self._t[self._head] = t
+            self._pos[self._head] = (lat, lon, alt)
+            self._head = (self._head + 1) % self.capacity
+            self._count = min(self._count + 1, self.capacity)
+
+    def clear(self):
+        with self._lock:
+            self._count = 0
+            self._head = 0
+
+    @property
+    def latest_time(self) -> Optional[float]:
+        with self._lock:
+            return float(self._t[(self._head - 1) % self.capacity]) if self._count else None
+
+    def _ordered(self) -> Tuple[np.ndarray, np.ndarray]:
+        order = (self._head - self._count + np.arange(self._count)) % self.capacity
+        return self._t[order], self._pos[order]
+
+    def at(self, t: float) -> Optional[Tuple[float, float, float]]:
+        """(lat, lon, alt) at monotonic time t, or None without usable samples"""
+        with self._lock:
+            if self._count == 0:
+                return None
+            times, pos = self._ordered()
+
+        if t < times[0] - self.max_extrapolation_s or t > times[-1] + self.max_extrapolation_s:
+            return None
+        if t <= times[0]:
+            return tuple(map(float, pos[0]))
+        if t >= times[-1]:
+            if len(times) == 1:
+                return tuple(map(float, pos[-1]))
+            velocity = (pos[-1] - pos[-2]) / (times[-1] - times[-2])
+            return tuple(map(float, pos[-1] + velocity * (t - times[-1])))
+
+        k = int(np.searchsorted(times, t))
+        f = (t - times[k - 1]) / (times[k] - times[k - 1])
+        return tuple(map(float, pos[k - 1] + f * (pos[k] - pos[k - 1])))
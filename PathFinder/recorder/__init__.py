@@ -0,0 +1 @@
+"""Flight recorder: frames, poses and detections of a mission on disk"""
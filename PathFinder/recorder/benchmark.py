@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Flight recorder benchmarks.
+
+Usage (from the PathFinder directory):
+    python -m recorder.benchmark
+    python -m recorder.benchmark --fps 30 --seconds 20 --codecs jpeg raw --dir /media/sd/bench
+    python -m recorder.benchmark --images ./test_images --queue-mb 32
+
+Feeds frames at a fixed rate through FlightRecorder, as the mission loop
+does, and reports the cost of record_frame() to the caller, the write rate,
+dropped frames and the writer's peak backlog; then times frame and
+timestamp lookups in the recording. Point --dir at the target storage (SD
+card): the default temporary directory is usually RAM or a fast disk.
+"""
+
+import argparse
+import glob
+import os
+import shutil
+import statistics
+import tempfile
+import time
+
+import numpy as np
+from PIL import Image
+
+from sensors.frame import Frame
+from .flight_recorder import FlightLog, FlightRecorder
+
+
+def _thermal_frames(width: int, height: int, count: int, seed: int):
+    """Smooth warm blobs over a gradient plus sensor noise, in BGR like the FLIR grabber"""
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:height, 0:width]
+    frames = []
+    for _ in range(count):
+        field = 80 + 40 * x / width
+        for _ in range(6):
+            cx, cy, r = rng.uniform(0, width), rng.uniform(0, height), rng.uniform(10, 60)
+            field = field + 90 * np.exp(-((x - cx) ** 2 + (y - cy) ** 2) / (2 * r * r))
+        field = field + rng.normal(0, 3, field.shape)
+        gray = np.clip(field, 0, 255).astype(np.uint8)
+        frames.append(np.ascontiguousarray(np.stack([gray, gray, gray], axis=-1)))
+    return frames
+
+
+def _load_frames(images_dir: str, count: int):
+    paths = sorted(p for ext in ('*.jpg', '*.jpeg', '*.png') for p in glob.glob(os.path.join(images_dir, ext)))
+    if not paths:
+        raise FileNotFoundError(f"No images in {images_dir}")
+    return [np.asarray(Image.open(p).convert('RGB'))[:, :, ::-1].copy() for p in paths[:count]]
+
+
+def bench_write(directory: str, codec: str, pool, fps: float, seconds: float, segment_mb: float,
+                queue_mb: float) -> dict:
+    """Record at fps for seconds; caller-side latency, throughput and drops"""
+    recorder = FlightRecorder(directory, f"bench-{codec}", codec=codec, segment_bytes=int(segment_mb * 2**20),
+                              queue_bytes=int(queue_mb * 2**20))
+    recorder.start()
+    period = 1.0 / fps
+    calls = []
+    t0 = time.monotonic()
+    next_frame = t0
+    k = 0
+    while time.monotonic() - t0 < seconds:
+        frame = Frame(pool[k % len(pool)], channels='BGR')
+        t1 = time.perf_counter()
+        recorder.record_frame(frame, (55.3676, 10.4316, 10.0), {'voltage': 16.1, 'pct': 80})
+        recorder.record_detection(frame, {'mine': False, 'confidence': 0.1, 'sensor': 'flir_vue_pro'}, k)
+        calls.append(time.perf_counter() - t1)
+        k += 1
+        next_frame += period
+        time.sleep(max(next_frame - time.monotonic(), 0.0))
+    feed_s = time.monotonic() - t0
+    t1 = time.monotonic()
+    recorder.close(timeout=120)
+    drain_s = time.monotonic() - t1
+
+    calls.sort()
+    raw_mb = recorder.frames_recorded * pool[0].nbytes / 2**20
+    return {
+        'codec': codec,
+        'frames': k,
+        'fps': k / feed_s,
+        'recorded': recorder.frames_recorded,
+        'dropped': recorder.frames_dropped,
+        'mb_written': recorder.bytes_written / 2**20,
+        'write_mb_s': recorder.bytes_written / 2**20 / (feed_s + drain_s),
+        'compression': raw_mb / max(recorder.bytes_written / 2**20, 1e-9),
+        'peak_queue_mb': recorder.peak_queued_bytes / 2**20,
+        'drain_s': drain_s,
+        'segments': recorder.stats()['segment'] + 1,
+        'call_p50_us': calls[len(calls) // 2] * 1e6,
+        'call_p99_us': calls[int(len(calls) * 0.99)] * 1e6,
+    }
+
+
+def bench_seek(path: str, lookups: int, seed: int) -> dict:
+    """Latency of random frame reads (index entry, read, decode) and timestamp searches"""
+    log = FlightLog(path)
+    n = len(log)
+    rng = np.random.default_rng(seed)
+    start, end = log.entry(0)[1]['timestamp'], log.entry(n - 1)[1]['timestamp']
+    frames, searches = [], []
+    for _ in range(lookups):
+        t0 = time.perf_counter()
+        log.frame(int(rng.integers(n)))
+        t1 = time.perf_counter()
+        log.find_time(float(rng.uniform(start, end)))
+        searches.append(time.perf_counter() - t1)
+        frames.append(t1 - t0)
+    log.close()
+    return {'frames': n, 'frame_ms': statistics.median(frames) * 1e3, 'find_time_us': statistics.median(searches) * 1e6}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Flight recorder benchmarks")
+    parser.add_argument('--dir', default=None, help="Write recordings here (default: a temporary directory)")
+    parser.add_argument('--codecs', nargs='*', default=['jpeg', 'raw'])
+    parser.add_argument('--fps', type=float, default=30.0)
+    parser.add_argument('--seconds', type=float, default=10.0)
+    parser.add_argument('--width', type=int, default=640)
+    parser.add_argument('--height', type=int, default=512)
+    parser.add_argument('--images', default=None, help="Record these frames instead of synthetic thermal ones")
+    parser.add_argument('--segment-mb', type=float, default=64.0)
+    parser.add_argument('--queue-mb', type=float, default=64.0)
+    parser.add_argument('--lookups', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    pool = _load_frames(args.images, 16) if args.images else _thermal_frames(args.width, args.height, 16, args.seed)
+    h, w = pool[0].shape[:2]
+    directory = args.dir or tempfile.mkdtemp(prefix='recorder-bench-')
+    os.makedirs(directory, exist_ok=True)
+    print(f"Flight recorder: {w}x{h} frames at {args.fps:g} fps for {args.seconds:g} s into {directory}")
+    try:
+        for codec in args.codecs:
+            shutil.rmtree(os.path.join(directory, f"bench-{codec}"), ignore_errors=True)
+            r = bench_write(directory, codec, pool, args.fps, args.seconds, args.segment_mb, args.queue_mb)
+            print(f"  {codec:5s} {r['fps']:.1f} fps, {r['recorded']} recorded, {r['dropped']} dropped, "
+                  f"{r['write_mb_s']:.1f} MB/s ({r['compression']:.1f}x), {r['segments']} segments, "
+                  f"peak queue {r['peak_queue_mb']:.1f} MB, drain {r['drain_s']:.2f} s, "
+                  f"record_frame p50={r['call_p50_us']:.0f} us p99={r['call_p99_us']:.0f} us")
+            s = bench_seek(os.path.join(directory, f"bench-{codec}"), args.lookups, args.seed)
+            print(f"        seek over {s['frames']} frames: frame read+decode {s['frame_ms']:.2f} ms, "
+                  f"find_time {s['find_time_us']:.0f} us")
+    finally:
+        if args.dir is None:
+            shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
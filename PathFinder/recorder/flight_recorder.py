@@ -0,0 +1,428 @@
+"""Append-only, segmented flight recorder with a fixed-size frame index"""
+
+import bisect
+import io
+import json
+import logging
+import os
+import re
+import struct
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+from sensors.frame import Frame
+
+
+# segment-NNNNNN.rec: header, then records back to back
+# segment-NNNNNN.idx: header, then one INDEX_DTYPE entry per frame number from first_frame on
+MAGIC = b'MFFR'
+INDEX_MAGIC = b'MFFI'
+VERSION = 1
+HEADER = struct.Struct('<4sHHQ')  # magic, version, index entry size (0 in .rec), first frame number
+RECORD = struct.Struct('<BBHIIqd')  # kind, codec, reserved, meta length, data length, frame number, timestamp
+INDEX_DTYPE = np.dtype([('timestamp', '<f8'), ('wall_time', '<f8'), ('offset', '<u8'), ('length', '<u4'),
+                        ('reserved', '<u4')])
+
+# Record kinds
+KIND_FRAME = 1      # Pixels, pose and battery at capture
+KIND_DETECTION = 2  # Detector output for one frame
+KIND_CELL = 3       # Fused verdict recorded for a scan cell
+KIND_EVENT = 4      # Mission start, end, errors
+
+# Frame codecs
+CODECS = {'raw': 0, 'jpeg': 1}
+
+SEGMENT_NAME = re.compile(r'segment-(\d{6})\.rec$')
+
+
+def _segment_paths(path: str, sequence: int) -> Tuple[str, str]:
+    base = os.path.join(path, f"segment-{sequence:06d}")
+    return base + '.rec', base + '.idx'
+
+
+def _read_header(path: str, magic: bytes) -> Optional[Tuple[int, int, int, int]]:
+    """Header of a segment file, or None if the file is missing, short or not a recorder file"""
+    try:
+        with open(path, 'rb') as f:
+            raw = f.read(HEADER.size)
+    except FileNotFoundError:
+        return None
+    if len(raw) < HEADER.size:
+        return None
+    header = HEADER.unpack(raw)
+    return header if header[0] == magic else None
+
+
+def _json(value) -> bytes:
+    return json.dumps(value, separators=(',', ':'), default=str).encode()
+
+
+class FlightRecorder:
+    """
+    Records a mission's frames, the drone pose and battery at capture, the
+    detector output per frame and the verdict per cell, for replay and
+    post-mortem analysis.
+
+    Data goes to segment files under <directory>/<mission_id>, each a plain
+    sequence of records (fixed header, JSON metadata, payload) that can be
+    read front to back without the index. A segment is closed and the next
+    one started once it reaches segment_bytes. Every segment has an index
+    file of fixed-size entries, one per frame number, so frame n is found
+    with one seek; timestamps in the index are monotonic, so a time is
+    found by binary search over it.
+
+    The mission loop only queues: frames are encoded (JPEG or raw) and
+    written on a writer thread. Queued frames are bounded by queue_bytes;
+    beyond that new frames are dropped (counted, and left as empty index
+    entries) rather than blocking capture. Small records are always
+    queued. Files are flushed after every batch and fsynced every sync_s
+    seconds, so a power cut loses at most the last moments; readers skip
+    torn records.
+
+    A resumed mission continues with new segments after the existing ones.
+    """
+
+    def __init__(self, directory: str, mission_id: str, codec: str = 'jpeg', jpeg_quality: int = 90,
+                 segment_bytes: int = 256 * 2**20, queue_bytes: int = 64 * 2**20, sync_s: float = 1.0):
+        if codec not in CODECS:
+            raise ValueError(f"Unknown recorder codec: {codec} (expected one of {', '.join(CODECS)})")
+        self.mission_id = mission_id
+        self.path = os.path.join(directory, mission_id)
+        self.codec = codec
+        self.jpeg_quality = jpeg_quality
+        self.segment_bytes = segment_bytes
+        self.queue_bytes = queue_bytes
+        self.sync_s = sync_s
+        self.log = logging.getLogger(__name__)
+
+        self._queue = deque()
+        self._queued_bytes = 0
+        self._cond = threading.Condition()
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+        self._next_frame = 0  # Next frame number handed out
+
+        # Writer state (writer thread only)
+        self._sequence = -1
+        self._data = None
+        self._index = None
+        self._data_size = 0
+        self._index_next = 0  # Frame number of the next index entry
+        self._last_sync = 0.0
+
+        # Counters
+        self.frames_recorded = 0
+        self.frames_dropped = 0
+        self.bytes_written = 0
+        self.peak_queued_bytes = 0
+        self.write_errors = 0
+
+    def start(self):
+        """Open the mission directory (after any segments already in it) and start the writer thread"""
+        os.makedirs(self.path, exist_ok=True)
+        existing = FlightLog(self.path) if os.listdir(self.path) else None
+        if existing is not None:
+            # Torn segments are left on disk for inspection; new ones go after them
+            self._sequence = max(existing.segments + existing.torn, default=-1)
+            self._next_frame = self._index_next = len(existing)
+            existing.close()
+
+        self._running = True
+        self._thread = threading.Thread(target=self._write_loop, name="flight-recorder", daemon=True)
+        self._thread.start()
+        self.log.info(f"Flight recorder writing to {self.path} ({self.codec}"
+                      + (f", continuing at frame {self._next_frame}" if self._next_frame else "") + ")")
+
+    def record_frame(self, frame: Frame, position: Optional[Tuple[float, float, float]] = None,
+                     battery: Optional[dict] = None) -> Optional[int]:
+        """
+        Queue a captured frame with the pose and battery at capture; returns
+        its frame number (also stored in frame.metadata['frame_no']), or None
+        once closed. Never blocks.
+        """
+        with self._cond:
+            if not self._running:
+                return None
+            number = frame.metadata.get('frame_no')
+            if number is not None:
+                return number  # Same frame handed out twice by the sensor
+            number = self._next_frame
+            self._next_frame += 1
+            frame.metadata['frame_no'] = number
+            wall_time = time.time() - (time.monotonic() - frame.timestamp)
+            size = frame.data.nbytes
+            if self._queued_bytes + size > self.queue_bytes:
+                # Writer behind: keep the slot in the index, drop the pixels
+                self.frames_dropped += 1
+                self._queue.append((KIND_FRAME, number, frame.timestamp, wall_time, None, 0))
+            else:
+                meta = {'position': position, 'battery': battery,
+                        'metadata': {k: v for k, v in frame.metadata.items() if k != 'frame_no'}}
+                self._queue.append((KIND_FRAME, number, frame.timestamp, wall_time, (frame, meta), size))
+                self._queued_bytes += size
+                self.peak_queued_bytes = max(self.peak_queued_bytes, self._queued_bytes)
+            self._cond.notify()
+        return number
+
+    def record_detection(self, frame: Frame, result: Dict[str, Any], cell: Optional[int] = None):
+        """Detector output for a recorded frame"""
+        self._record(KIND_DETECTION, frame.metadata.get('frame_no', -1), {'cell': cell, **result})
+
+    def record_cell(self, cell: int, result: Dict[str, Any], position: Tuple[float, float, float]):
+        """Verdict recorded for a scan cell"""
+        self._record(KIND_CELL, -1, {'cell': cell, 'position': position, **result})
+
+    def record_event(self, event: str, **details):
+        self._record(KIND_EVENT, -1, {'event': event, **details})
+
+    def _record(self, kind: int, number: int, meta: dict):
+        with self._cond:
+            if not self._running:
+                return
+            self._queue.append((kind, number, time.monotonic(), time.time(), meta, 0))
+            self._cond.notify()
+
+    def stats(self) -> dict:
+        return {
+            'frames_recorded': self.frames_recorded,
+            'frames_dropped': self.frames_dropped,
+            'mb_written': round(self.bytes_written / 2**20, 1),
+            'queued_mb': round(self._queued_bytes / 2**20, 1),
+            'segment': self._sequence
+        }
+
+    def _write_loop(self):
+        """Writer thread: drain the queue in batches, one flush per batch"""
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._queue or not self._running, timeout=self.sync_s)
+                if not self._queue and not self._running:
+                    break
+                batch = list(self._queue)
+                self._queue.clear()
+
+            for kind, number, timestamp, wall_time, payload, size in batch:
+                try:
+                    if kind == KIND_FRAME:
+                        self._write_frame(number, timestamp, wall_time, payload)
+                    else:
+                        self._write_record(kind, 0, number, timestamp, _json(dict(payload, wall_time=wall_time)),
+                                           b'')
+                except Exception as e:
+                    self._write_failed(e)
+            with self._cond:
+                self._queued_bytes -= sum(item[5] for item in batch)
+
+            try:
+                if self._data is not None:
+                    self._data.flush()
+                    self._index.flush()
+                    if time.monotonic() - self._last_sync >= self.sync_s:
+                        os.fsync(self._data.fileno())
+                        os.fsync(self._index.fileno())
+                        self._last_sync = time.monotonic()
+            except OSError as e:
+                self._write_failed(e)
+        self._close_segment()
+
+    def _write_failed(self, e: Exception):
+        self.write_errors += 1
+        if self.write_errors % 100 == 1:
+            self.log.error(f"Flight recorder write failed ({self.write_errors} failures): {e}")
+
+    def _write_frame(self, number: int, timestamp: float, wall_time: float, payload):
+        offset, length = 0, 0
+        if payload is not None:
+            frame, meta = payload
+            meta.update(shape=list(frame.shape), channels=frame.channels, wall_time=wall_time)
+            if self.codec == 'jpeg':
+                data = self._encode_jpeg(frame)
+                meta['channels'] = 'RGB'
+            else:
+                data = np.ascontiguousarray(frame.data).data.cast('B')
+            offset, length = self._write_record(KIND_FRAME, CODECS[self.codec], number, timestamp, _json(meta), data)
+            self.frames_recorded += 1
+
+        # Frame numbers are queued in order; any skipped by a failed write get empty entries
+        entries = np.zeros(number + 1 - self._index_next, dtype=INDEX_DTYPE)
+        entries[-1] = (timestamp, wall_time, offset, length, 0)
+        entries['timestamp'][:-1] = timestamp
+        entries['wall_time'][:-1] = wall_time
+        if self._index is None:
+            self._open_segment()
+        self._index.write(entries.tobytes())
+        self._index_next = number + 1
+
+    def _encode_jpeg(self, frame: Frame) -> bytes:
+        h, w = frame.shape[:2]
+        # Channel swap happens in PIL's unpacker, without an intermediate array
+        image = Image.frombuffer('RGB', (w, h), np.ascontiguousarray(frame.data), 'raw', frame.channels, 0, 1)
+        out = io.BytesIO()
+        image.save(out, format='JPEG', quality=self.jpeg_quality)
+        return out.getvalue()
+
+    def _write_record(self, kind: int, codec: int, number: int, timestamp: float, meta: bytes,
+                      data) -> Tuple[int, int]:
+        length = RECORD.size + len(meta) + len(data)
+        if self._data is None or (self._data_size + length > self.segment_bytes and self._data_size > HEADER.size):
+            self._open_segment()
+        offset = self._data_size
+        self._data.write(RECORD.pack(kind, codec, 0, len(meta), len(data), number, timestamp))
+        self._data.write(meta)
+        self._data.write(data)
+        self._data_size += length
+        self.bytes_written += length
+        return offset, length
+
+    def _open_segment(self):
+        """Close the current segment and start the next one"""
+        self._close_segment()
+        self._sequence += 1
+        data_path, index_path = _segment_paths(self.path, self._sequence)
+        # Large buffers: SD cards want big sequential writes
+        self._data = open(data_path, 'wb', buffering=2**20)
+        self._index = open(index_path, 'wb', buffering=2**16)
+        self._data.write(HEADER.pack(MAGIC, VERSION, 0, self._index_next))
+        self._index.write(HEADER.pack(INDEX_MAGIC, VERSION, INDEX_DTYPE.itemsize, self._index_next))
+        self._data_size = HEADER.size
+        self.bytes_written += HEADER.size
+
+    def _close_segment(self):
+        if self._data is None:
+            return
+        for f in (self._data, self._index):
+            try:
+                f.flush()
+                os.fsync(f.fileno())
+            except OSError as e:
+                self.log.error(f"Flight recorder sync failed: {e}")
+            f.close()
+        self._data = self._index = None
+
+    def close(self, timeout: float = 10.0):
+        """Write what is queued and close the files"""
+        with self._cond:
+            if not self._running:
+                return
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self.log.info(f"Flight recorder closed: {self.frames_recorded} frames, {self.frames_dropped} dropped, "
+                      f"{self.bytes_written / 2**20:.1f} MB in {self._sequence + 1} segments")
+
+
+class FlightLog:
+    """
+    Reader for a FlightRecorder mission directory.
+
+    frame(n) costs one index lookup and one read, whatever the length of
+    the recording; find_time() is a binary search over the memory-mapped
+    index timestamps. records() walks every record in order (detections,
+    cell verdicts and events included).
+
+    Segments whose data or index header is missing, short or not a
+    recorder header (a power cut while the segment was being created) are
+    skipped with a warning and listed in torn.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.segments: List[int] = []
+        self.torn: List[int] = []
+        self._first: List[int] = []
+        self._index: List[np.ndarray] = []
+        self._data_size: List[int] = []
+        self._files: Dict[int, Any] = {}
+        self.log = logging.getLogger(__name__)
+        for sequence in sorted(int(m.group(1)) for m in map(SEGMENT_NAME.match, os.listdir(path)) if m):
+            data_path, index_path = _segment_paths(path, sequence)
+            header = _read_header(index_path, INDEX_MAGIC)
+            if header is None or _read_header(data_path, MAGIC) is None:
+                self.log.warning(f"Skipping torn flight recorder segment {data_path}")
+                self.torn.append(sequence)
+                continue
+            _, version, entry_size, first = header
+            if version != VERSION or entry_size != INDEX_DTYPE.itemsize:
+                raise ValueError(f"Unsupported flight recorder index {index_path}")
+            self.segments.append(sequence)
+            count = (os.path.getsize(index_path) - HEADER.size) // INDEX_DTYPE.itemsize
+            self._first.append(first)
+            self._index.append(np.memmap(index_path, dtype=INDEX_DTYPE, mode='r', offset=HEADER.size, shape=(count,))
+                               if count else np.zeros(0, dtype=INDEX_DTYPE))
+            self._data_size.append(os.path.getsize(data_path))
+
+    def __len__(self) -> int:
+        """Frame numbers covered (including dropped frames)"""
+        return self._first[-1] + len(self._index[-1]) if self.segments else 0
+
+    def entry(self, number: int) -> Tuple[int, np.void]:
+        """(segment position, index entry) of a frame number"""
+        k = bisect.bisect_right(self._first, number) - 1
+        if k < 0 or number - self._first[k] >= len(self._index[k]):
+            raise IndexError(f"Frame {number} not in the recording")
+        return k, self._index[k][number - self._first[k]]
+
+    def frame(self, number: int) -> Optional[Tuple[dict, Frame]]:
+        """Metadata and pixels of frame number; None if it was dropped or torn"""
+        k, entry = self.entry(number)
+        offset, length = int(entry['offset']), int(entry['length'])
+        if length == 0 or offset + length > self._data_size[k]:
+            return None
+        raw = self._read(k, offset, length)
+        kind, codec, _, meta_len, data_len, _, timestamp = RECORD.unpack_from(raw)
+        meta = json.loads(raw[RECORD.size:RECORD.size + meta_len])
+        data = raw[RECORD.size + meta_len:]
+        if codec == CODECS['jpeg']:
+            with Image.open(io.BytesIO(data)) as image:
+                pixels = np.asarray(image.convert('RGB'))
+        else:
+            pixels = np.frombuffer(data, dtype=np.uint8).reshape(meta['shape'])
+        return meta, Frame(pixels, timestamp, meta['channels'], meta.get('metadata'))
+
+    def find_time(self, timestamp: float, clock: str = 'timestamp') -> int:
+        """
+        First frame number captured at or after timestamp (len(self) if none).
+        clock: 'timestamp' (monotonic, one boot) or 'wall_time' (seconds since the epoch)
+        """
+        for k, index in enumerate(self._index):
+            if len(index) and index[clock][-1] >= timestamp:
+                return self._first[k] + int(np.searchsorted(index[clock], timestamp, side='left'))
+        return len(self)
+
+    def records(self) -> Iterator[Tuple[int, int, float, dict, bytes]]:
+        """(kind, frame number, timestamp, metadata, payload) of every complete record, in order"""
+        for k, sequence in enumerate(self.segments):
+            data_path, _ = _segment_paths(self.path, sequence)
+            with open(data_path, 'rb') as f:
+                magic, version, _, _ = HEADER.unpack(f.read(HEADER.size))
+                if magic != MAGIC or version != VERSION:
+                    raise ValueError(f"Unsupported flight recorder segment {data_path}")
+                while True:
+                    head = f.read(RECORD.size)
+                    if len(head) < RECORD.size:
+                        break
+                    kind, codec, _, meta_len, data_len, number, timestamp = RECORD.unpack(head)
+                    body = f.read(meta_len + data_len)
+                    if len(body) < meta_len + data_len:
+                        break  # Torn by a power cut
+                    yield kind, number, timestamp, json.loads(body[:meta_len]), body[meta_len:]
+
+    def _read(self, k: int, offset: int, length: int) -> bytes:
+        f = self._files.get(k)
+        if f is None:
+            f = self._files[k] = open(_segment_paths(self.path, self.segments[k])[0], 'rb')
+        f.seek(offset)
+        return f.read(length)
+
+    def close(self):
+        for f in self._files.values():
+            f.close()
+        self._files.clear()
+        self._index.clear()
@@ -1,24 +1,73 @@
 """FLIR Vue Pro R thermal camera interface"""
 
 import cv2
-from PIL import Image
-from typing import Optional
+from collections import deque
+from typing import List, Optional
+import numpy as np
 import logging
+import threading
+import time
+import weakref
+
+from .frame import Frame
 
 
 class FLIRVueProSensor:
     """
     FLIR Vue Pro R interface via USB video capture.
     Camera outputs analog video which can be captured via USB frame grabber.
+    
+    A grabber thread drains the device continuously into a small ring of
+    timestamped frames, so the driver's own buffer never holds stale
+    imagery. capture() returns the newest frame without waiting on the
+    device; capture_after(ts) waits for a frame exposed after ts (e.g. after
+    the drone settled over a cell).
+    
+    Frames are returned as Frame objects around the ring buffer itself, in
+    the camera's BGR order, with their monotonic grab time. The detector
+    reorders channels during preprocessing, so a frame reaches the model
+    without any conversion or copy. A slot whose Frame is still held when
+    the grabber comes round to it gets a fresh buffer instead of being
+    overwritten; with frames released promptly nothing is allocated per
+    frame.
     """
     
-    def __init__(self, device_id: int = 0):
+    def __init__(self, device_id: int = 0, ring_frames: int = 4, latency_s: float = 0.0,
+                 max_age_s: float = 1.0):
+        """
+        Args:
+            device_id: Video capture device index
+            ring_frames: Frames kept by the grabber (at least 2)
+            latency_s: Exposure to grab delay, used by capture_after()
+            max_age_s: capture() returns None once the newest frame is older (camera stalled)
+        """
         self.device_id = device_id
         self.cap: Optional[cv2.VideoCapture] = None
         self.log = logging.getLogger(__name__)
+        self.ring_frames = max(int(ring_frames), 2)
+        self.latency_s = latency_s
+        self.max_age_s = max_age_s
+        
+        # Ring of BGR buffers (allocated by the decoder at the first frame) and
+        # the Frame last handed out for each slot
+        self._ring: List[Optional[np.ndarray]] = [None] * self.ring_frames
+        self._leases: List[Optional[weakref.ref]] = [None] * self.ring_frames
+        self._times = np.zeros(self.ring_frames, dtype=np.float64)
+        self._head = 0  # Slot the grabber writes next
+        self._newest: Optional[int] = None
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        
+        # Counters
+        self.frames_grabbed = 0
+        self.frames_dropped = 0  # Estimated from gaps in the device frame rate
+        self.grab_failures = 0
+        self.buffers_allocated = 0
+        self._recent = deque(maxlen=60)  # Grab times for the rate estimate
     
     def connect(self) -> bool:
-        """Connect to FLIR camera via video capture device"""
+        """Connect to FLIR camera via video capture device and start grabbing"""
         try:
             self.cap = cv2.VideoCapture(self.device_id)
             if not self.cap.isOpened():
@@ -29,33 +78,130 @@ class FLIRVueProSensor:
             self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
             self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 512)
             
+            self._running = True
+            self._thread = threading.Thread(target=self._grab_loop, name="flir-grabber", daemon=True)
+            self._thread.start()
+            
             self.log.info(f"FLIR Vue Pro connected on device {self.device_id}")
             return True
-            
+        
         except Exception as e:
             self.log.error(f"Failed to connect to FLIR camera: {e}")
             return False
     
-    def capture(self) -> Optional[Image.Image]:
+    def _grab_loop(self):
+        """Grabber thread: read every frame the device delivers into the ring"""
+        fps = self.cap.get(cv2.CAP_PROP_FPS) or 0.0
+        period = 1.0 / fps if fps > 0 else None
+        last = None
+        
+        while self._running:
+            if not self.cap.grab():
+                self.grab_failures += 1
+                if self.grab_failures % 30 == 1:
+                    self.log.error(f"Failed to grab frame ({self.grab_failures} failures)")
+                time.sleep(0.05)
+                continue
+            t = time.monotonic()
+            
+            # The slot after the newest is never handed out, so decode straight into it,
+            # unless a consumer still holds the Frame from its last round
+            with self._cond:
+                slot = self._head
+                lease = self._leases[slot]
+                if lease is not None and lease() is not None:
+                    self._ring[slot] = None
+                self._leases[slot] = None
+                buffer = self._ring[slot]
+            ok, frame = self.cap.retrieve(buffer) if buffer is not None else self.cap.retrieve()
+            if not ok or frame is None:
+                self.grab_failures += 1
+                continue
+            
+            with self._cond:
+                if frame is not buffer:
+                    # First round, a held slot or a new frame size: the decoder allocated
+                    self._ring[slot] = frame
+                    self.buffers_allocated += 1
+                self._times[slot] = t
+                self._newest = slot
+                self._head = (slot + 1) % self.ring_frames
+                self.frames_grabbed += 1
+                if period and last is not None and t - last > 1.5 * period:
+                    self.frames_dropped += int(round((t - last) / period)) - 1
+                self._recent.append(t)
+                self._cond.notify_all()
+            last = t
+    
+    @property
+    def grab_rate_hz(self) -> float:
+        """Frames per second the grabber received recently"""
+        with self._cond:
+            if len(self._recent) < 2:
+                return 0.0
+            return (len(self._recent) - 1) / (self._recent[-1] - self._recent[0])
+    
+    def stats(self) -> dict:
+        return {
+            'grab_rate_hz': round(self.grab_rate_hz, 1),
+            'frames_grabbed': self.frames_grabbed,
+            'frames_dropped': self.frames_dropped,
+            'grab_failures': self.grab_failures,
+            'buffers_allocated': self.buffers_allocated
+        }
+    
+    def capture(self) -> Optional[Frame]:
         """
-        Capture a thermal image from the camera.
-        Returns PIL Image or None if capture fails.
+        Newest thermal frame from the ring (waits briefly only right after connect).
+        Returns a BGR Frame or None if the camera is not delivering frames.
         """
         if not self.cap or not self.cap.isOpened():
             self.log.error("Camera not connected")
             return None
         
-        ret, frame = self.cap.read()
-        if not ret:
+        with self._cond:
+            self._cond.wait_for(lambda: self._newest is not None, timeout=self.max_age_s)
+            return self._newest_frame()
+    
+    def capture_after(self, ts: float, timeout: float = 1.0) -> Optional[Frame]:
+        """Wait for a frame exposed after monotonic time ts; None on timeout"""
+        if not self.cap or not self.cap.isOpened():
+            self.log.error("Camera not connected")
+            return None
+        
+        with self._cond:
+            fresh = self._cond.wait_for(
+                lambda: self._newest is not None and self._times[self._newest] - self.latency_s > ts, timeout=timeout
+            )
+            if not fresh:
+                self.log.error(f"No frame after t={ts:.3f} within {timeout:.1f}s")
+                return None
+            return self._newest_frame()
+    
+    def _newest_frame(self) -> Optional[Frame]:
+        """Frame around the newest slot, the same object for repeated calls (caller holds the lock)"""
+        if self._newest is None:
             self.log.error("Failed to capture frame")
             return None
+        t = float(self._times[self._newest])
+        if time.monotonic() - t > self.max_age_s:
+            self.log.error(f"Newest frame is {time.monotonic() - t:.1f}s old, camera stalled")
+            return None
         
-        # Convert BGR to RGB
-        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        return Image.fromarray(rgb)
+        lease = self._leases[self._newest]
+        frame = lease() if lease is not None else None
+        if frame is None:
+            frame = Frame(self._ring[self._newest], t, channels='BGR')
+            self._leases[self._newest] = weakref.ref(frame)
+        return frame
     
     def close(self):
         """Close camera connection"""
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
         if self.cap:
             self.cap.release()
-            self.log.info("FLIR Vue Pro disconnected")
+            self.log.info(f"FLIR Vue Pro disconnected ({self.frames_grabbed} frames grabbed, "
+                          f"{self.frames_dropped} dropped, {self.buffers_allocated} buffers allocated)")
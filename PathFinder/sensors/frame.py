@@ -0,0 +1,70 @@
+"""Sensor frame: NumPy pixel buffer with capture time and metadata"""
+
+import time
+from typing import Any, Dict, Optional
+
+import numpy as np
+from PIL import Image
+
+CHANNEL_ORDERS = ('RGB', 'BGR')
+
+
+class Frame:
+    """
+    One captured frame: an HxWx3 uint8 buffer in the sensor's native channel
+    order, its monotonic capture time and free-form metadata (e.g.
+    'position', the (lat, lon, alt) it was taken at).
+
+    The buffer is passed on as delivered, without colour conversion or a
+    copy; the detector reorders channels while preprocessing. Sensors may
+    hand out buffers they reuse later, so it stays valid only while the
+    Frame is referenced: keep the Frame, not just .data. image() builds a
+    PIL image on first use for code that needs one.
+    """
+
+    __slots__ = ('data', 'timestamp', 'channels', 'metadata', '_image', '__weakref__')
+
+    def __init__(self, data: np.ndarray, timestamp: Optional[float] = None, channels: str = 'RGB',
+                 metadata: Optional[Dict[str, Any]] = None):
+        if channels not in CHANNEL_ORDERS:
+            raise ValueError(f"Unknown channel order: {channels} (expected one of {', '.join(CHANNEL_ORDERS)})")
+        self.data = data
+        self.timestamp = time.monotonic() if timestamp is None else timestamp
+        self.channels = channels
+        self.metadata = metadata if metadata is not None else {}
+        self._image: Optional[Image.Image] = None
+
+    @classmethod
+    def from_image(cls, image: Image.Image, timestamp: Optional[float] = None,
+                   metadata: Optional[Dict[str, Any]] = None) -> 'Frame':
+        """Frame of a decoded PIL image (copies its pixels once)"""
+        return cls(np.asarray(image.convert('RGB')), timestamp, 'RGB', metadata)
+
+    @property
+    def shape(self):
+        return self.data.shape
+
+    @property
+    def width(self) -> int:
+        return self.data.shape[1]
+
+    @property
+    def height(self) -> int:
+        return self.data.shape[0]
+
+    def rgb(self) -> np.ndarray:
+        """Pixels in RGB order (a channel-reversed view of BGR buffers, not a copy)"""
+        return self.data if self.channels == 'RGB' else self.data[:, :, ::-1]
+
+    def image(self) -> Image.Image:
+        """PIL adapter, converted on first call and cached"""
+        if self._image is None:
+            self._image = Image.fromarray(np.ascontiguousarray(self.rgb()))
+        return self._image
+
+    def __array__(self, dtype=None, copy=None):
+        rgb = self.rgb()
+        return np.array(rgb, dtype=dtype, copy=True) if copy or dtype is not None else rgb
+
+    def __repr__(self):
+        return f"Frame({self.width}x{self.height} {self.channels}, t={self.timestamp:.3f})"
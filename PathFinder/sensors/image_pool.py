@@ -0,0 +1,243 @@
+"""Test images decoded once, held in memory or in a memory-mapped .npy cache"""
+
+import hashlib
+import itertools
+import json
+import logging
+import os
+import random
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+POOL_MODES = ('off', 'memory', 'mmap')
+IMAGE_PATTERNS = ('*.jpg', '*.jpeg', '*.png')
+CACHE_VERSION = 1
+
+
+def scan_images(directory: Path) -> List[Path]:
+    """Test images in a directory, in a stable order"""
+    return sorted(p for pattern in IMAGE_PATTERNS for p in directory.glob(pattern))
+
+
+class ImagePool:
+    """
+    Test images decoded once and handed out as read-only RGB views.
+
+    All images are packed row by row into one flat uint8 buffer, whatever
+    their sizes; an index of offsets and shapes turns an image number into
+    a view without copying.
+
+    'mmap': the packed buffer is a .npy file in cache_dir, memory-mapped,
+    so the OS page cache holds it and simulators running side by side
+    share it. Next to it a JSON index records the name, size and mtime of
+    every source file; when they no longer match the directory, the cache
+    is rebuilt.
+
+    'memory': images are decoded into RAM. A set that fits in max_bytes
+    is packed once; a larger one keeps the most recently used images up
+    to max_bytes and decodes the rest on demand.
+
+    Every refresh_s seconds the name, size and mtime of every image are
+    compared with those the pool was built from, and the pool is rebuilt
+    when an image was added, removed, renamed or overwritten in place. A
+    packed set outlives its directory being emptied: it keeps being served
+    until images reappear. sample() raises LookupError when there is
+    nothing to serve.
+    """
+
+    def __init__(self, directory: str, mode: str = 'memory', cache_dir: Optional[str] = None,
+                 max_bytes: int = 512 * 2**20, refresh_s: float = 5.0):
+        if mode not in POOL_MODES[1:]:
+            raise ValueError(f"Unknown image pool mode: {mode} (expected memory or mmap)")
+        self.directory = Path(directory)
+        self.mode = mode
+        self.cache_dir = Path(cache_dir) if cache_dir else self.directory / '.image_pool'
+        self.max_bytes = max_bytes
+        self.refresh_s = refresh_s
+        self.log = logging.getLogger(__name__)
+
+        self.paths: List[Path] = []
+        self._files: list = []
+        self._shapes: List[Tuple[int, int, int]] = []
+        self._offsets: List[int] = []
+        self._packed: Optional[np.ndarray] = None
+        self._lru: 'OrderedDict[int, np.ndarray]' = OrderedDict()
+        self._lru_bytes = 0
+        self._lock = threading.Lock()
+        self._checked = 0.0
+        self._emptied = False  # Directory emptied while a packed set is still served
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.rebuilds = 0
+
+        self.build()
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    @staticmethod
+    def _fingerprint(paths: List[Path]) -> list:
+        fingerprint = []
+        for p in paths:
+            st = p.stat()
+            fingerprint.append([p.name, st.st_size, st.st_mtime_ns])
+        return fingerprint
+
+    def build(self):
+        """(Re)scan the directory and pack its images"""
+        t0 = time.perf_counter()
+        paths = scan_images(self.directory)
+        files = self._fingerprint(paths)
+        shapes = []
+        for p in paths:
+            with Image.open(p) as image:  # Header only
+                shapes.append((image.height, image.width, 3))
+        offsets = [0] + list(itertools.accumulate(h * w * c for h, w, c in shapes))
+        total = offsets[-1]
+
+        packed, source = None, 'decoded on demand (LRU)'
+        if paths and self.mode == 'mmap':
+            packed, source = self._mapped_cache(paths, files, shapes, offsets)
+        elif paths and total <= self.max_bytes:
+            packed = np.empty(total, dtype=np.uint8)
+            self._decode_into(packed, paths, shapes, offsets)
+            packed.setflags(write=False)
+            source = 'packed in memory'
+
+        with self._lock:
+            self.paths, self._files, self._shapes, self._offsets = paths, files, shapes, offsets
+            self._packed = packed
+            self._lru.clear()
+            self._lru_bytes = 0
+            self._checked = time.monotonic()
+        if paths:
+            self.log.info(f"Image pool: {len(paths)} images, {total / 2**20:.1f} MB {source} "
+                          f"({time.perf_counter() - t0:.2f}s)")
+
+    @staticmethod
+    def _decode_into(packed: np.ndarray, paths: List[Path], shapes: list, offsets: list):
+        for k, p in enumerate(paths):
+            with Image.open(p) as image:
+                view = packed[offsets[k]:offsets[k + 1]].reshape(shapes[k])
+                np.copyto(view, np.asarray(image.convert('RGB')))
+
+    def _mapped_cache(self, paths: List[Path], files: list, shapes: list, offsets: list) -> Tuple[np.ndarray, str]:
+        """Memory-map the .npy cache, rebuilding it first if it does not match the images"""
+        key = hashlib.sha1(str(self.directory.resolve()).encode()).hexdigest()[:12]
+        data_path = self.cache_dir / f"pool-{key}.npy"
+        index_path = self.cache_dir / f"pool-{key}.json"
+        index = {'version': CACHE_VERSION, 'files': files, 'shapes': [list(s) for s in shapes]}
+
+        try:
+            with open(index_path) as f:
+                cached = json.load(f)
+            if cached == index:
+                packed = np.load(data_path, mmap_mode='r')
+                if packed.shape == (offsets[-1],):
+                    return packed, f"memory-mapped from {data_path}"
+        except (OSError, ValueError):
+            pass
+
+        # Index last: a build cut short leaves no index matching the data
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        if index_path.exists():
+            index_path.unlink()
+        tmp = data_path.with_suffix('.tmp.npy')
+        packed = np.lib.format.open_memmap(tmp, mode='w+', dtype=np.uint8, shape=(offsets[-1],))
+        self._decode_into(packed, paths, shapes, offsets)
+        packed.flush()
+        del packed
+        os.replace(tmp, data_path)
+        with open(index_path.with_suffix('.tmp'), 'w') as f:
+            json.dump(index, f)
+        os.replace(index_path.with_suffix('.tmp'), index_path)
+        return np.load(data_path, mmap_mode='r'), f"memory-mapped from {data_path} (cache rebuilt)"
+
+    def refresh(self, force: bool = False):
+        """Rebuild if the directory's images changed (checked at most every refresh_s seconds unless forced)"""
+        now = time.monotonic()
+        if not force and now - self._checked < self.refresh_s:
+            return
+        self._checked = now
+        try:
+            files = self._fingerprint(scan_images(self.directory))
+        except OSError as e:
+            self.log.error(f"Cannot check test images in {self.directory}: {e}")
+            return
+        if files == self._files:
+            self._emptied = False
+            return
+        if not files and self._packed is not None:
+            if not self._emptied:
+                self.log.warning(f"No test images left in {self.directory}, "
+                                 f"keeping the {len(self.paths)} already decoded")
+                self._emptied = True
+            return
+        self._emptied = False
+        self.log.info(f"Test images in {self.directory} changed, rebuilding image pool")
+        self.rebuilds += 1
+        self.build()
+
+    def get(self, k: int) -> np.ndarray:
+        """Read-only HxWx3 RGB view of image k"""
+        with self._lock:
+            image = self._cached(k)
+            if image is not None:
+                return image
+            path = self.paths[k]
+        return self._decode(k, path)
+
+    def _cached(self, k: int) -> Optional[np.ndarray]:
+        """Image k from the packed buffer or the LRU, None if it has to be decoded (lock held)"""
+        if self._packed is not None:
+            return self._packed[self._offsets[k]:self._offsets[k + 1]].reshape(self._shapes[k])
+        image = self._lru.get(k)
+        if image is not None:
+            self._lru.move_to_end(k)
+            self.hits += 1
+        return image
+
+    def _decode(self, k: int, path: Path) -> np.ndarray:
+        """Decode image k from path outside the lock and keep it in the LRU"""
+        self.misses += 1
+        with Image.open(path) as decoded:
+            image = np.asarray(decoded.convert('RGB'))
+        image.setflags(write=False)
+        with self._lock:
+            if k < len(self.paths) and self.paths[k] is path:  # Not rebuilt meanwhile
+                self._lru[k] = image
+                self._lru_bytes += image.nbytes
+                while self._lru_bytes > self.max_bytes and len(self._lru) > 1:
+                    _, evicted = self._lru.popitem(last=False)
+                    self._lru_bytes -= evicted.nbytes
+        return image
+
+    def sample(self, rng=random) -> Tuple[str, np.ndarray]:
+        """Name and view of a random image; LookupError if the pool is empty"""
+        self.refresh()
+        with self._lock:
+            if not self.paths:
+                raise LookupError(f"No test images in {self.directory}")
+            k = rng.randrange(len(self.paths))
+            path = self.paths[k]
+            image = self._cached(k)
+        return path.name, image if image is not None else self._decode(k, path)
+
+    def stats(self) -> dict:
+        return {
+            'images': len(self.paths),
+            'mode': self.mode,
+            'packed': self._packed is not None,
+            'lru_mb': round(self._lru_bytes / 2**20, 1),
+            'hits': self.hits,
+            'misses': self.misses,
+            'rebuilds': self.rebuilds
+        }
@@ -3,26 +3,53 @@
 from PIL import Image
 import numpy as np
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Optional, Tuple
 import random
 import logging
+import time
+
+from .frame import Frame
+from .image_pool import ImagePool
 
 
 class SimulatedSensor:
     """
     Simulated thermal sensor for testing without hardware.
     Uses test images or generates random thermal-like images.
+    
+    With position_source set, each frame records where it was taken in
+    frame.metadata['position'] (lat, lon, alt), which the simulated
+    detector uses to look up the synthetic minefield.
+    
+    By default every capture decodes a test image from disk. With pool set
+    to 'memory' or 'mmap' the test set is decoded once into an ImagePool
+    (see sensors.image_pool) and captures are views into it, which keeps
+    long soak runs and fleet simulations off the disk.
     """
     
-    def __init__(self, test_images_dir: Optional[str] = None):
+    def __init__(self, test_images_dir: Optional[str] = None, pool: str = 'off', pool_max_mb: float = 512,
+                 cache_dir: Optional[str] = None):
+        """
+        Args:
+            test_images_dir: Directory of .jpg/.png test images
+            pool: 'off' (decode every capture), 'memory' or 'mmap'
+            pool_max_mb: Memory pool budget; larger test sets keep the most recently used images
+            cache_dir: Where the mmap pool keeps its .npy cache (default: inside test_images_dir)
+        """
         self.log = logging.getLogger(__name__)
+        self.position_source: Optional[Callable[[], Tuple[float, float, float]]] = None
         self.test_images_dir = Path(test_images_dir) if test_images_dir else None
         self.images = []
+        self.pool: Optional[ImagePool] = None
         
         if self.test_images_dir and self.test_images_dir.exists():
             # Load test images if available
-            for ext in ['*.jpg', '*.jpeg', '*.png']:
-                self.images.extend(list(self.test_images_dir.glob(ext)))
+            if pool != 'off':
+                self.pool = ImagePool(str(self.test_images_dir), pool, cache_dir, int(pool_max_mb * 2**20))
+                self.images = list(self.pool.paths)
+            else:
+                for ext in ['*.jpg', '*.jpeg', '*.png']:
+                    self.images.extend(list(self.test_images_dir.glob(ext)))
             
             if self.images:
                 self.log.info(f"Loaded {len(self.images)} test images from {test_images_dir}")
@@ -36,21 +63,41 @@ class SimulatedSensor:
         self.log.info("Simulated sensor connected")
         return True
     
-    def capture(self) -> Image.Image:
+    def capture(self) -> Frame:
         """
-        Capture a simulated thermal image.
-        Returns either a test image or a generated random image.
+        Capture a simulated thermal frame.
+        Returns either a test image or a generated random image, as an RGB Frame.
         """
-        if self.images:
+        t = time.monotonic()
+        arr = None
+        if self.pool is not None:
+            # Read-only view into the decoded pool
+            try:
+                name, arr = self.pool.sample()
+                self.log.debug(f"Using test image: {name}")
+            except LookupError:
+                pass  # Test images removed: random frames until they come back
+        elif self.images:
             # Return random test image
             img_path = random.choice(self.images)
             self.log.debug(f"Using test image: {img_path.name}")
-            return Image.open(img_path).convert('RGB')
-        else:
+            with Image.open(img_path) as image:
+                arr = np.asarray(image.convert('RGB'))
+        if arr is None:
             # Generate random thermal-like image (224x224 default for ML model)
             arr = np.random.randint(0, 255, (224, 224, 3), dtype=np.uint8)
-            return Image.fromarray(arr)
+        
+        frame = Frame(arr, t)
+        if self.position_source:
+            frame.metadata['position'] = tuple(self.position_source())
+        return frame
+    
+    def capture_after(self, ts: float, timeout: float = 1.0) -> Frame:
+        """Simulated frames are taken on demand, so every capture is after ts"""
+        return self.capture()
     
     def close(self):
         """Close sensor connection"""
+        if self.pool is not None:
+            self.log.info(f"Image pool: {self.pool.stats()}")
         self.log.info("Simulated sensor closed")
@@ -0,0 +1,38 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from recorder.flight_recorder import FlightLog, FlightRecorder, HEADER, MAGIC, VERSION  # noqa: E402
+from sensors.frame import Frame  # noqa: E402
+
+
+def _record(directory, value):
+    recorder = FlightRecorder(str(directory), 'mission', codec='raw')
+    recorder.start()
+    number = recorder.record_frame(Frame(np.full((4, 4, 3), value, dtype=np.uint8)))
+    recorder.close()
+    return number
+
+
+def test_restart_after_torn_segment(tmp_path):
+    """A segment cut short while being created must not stop the next start"""
+    assert _record(tmp_path, 10) == 0
+    path = tmp_path / 'mission'
+    # Power cut right after the next segment's files were created
+    (path / 'segment-000001.rec').write_bytes(HEADER.pack(MAGIC, VERSION, 0, 1)[:5])
+    (path / 'segment-000001.idx').write_bytes(b'')
+
+    assert _record(tmp_path, 20) == 1
+    log = FlightLog(str(path))
+    try:
+        assert log.torn == [1]
+        assert log.segments == [0, 2]
+        assert len(log) == 2
+        assert [int(log.frame(n)[1].data[0, 0, 0]) for n in range(2)] == [10, 20]
+        assert sum(1 for _ in log.records()) == 2
+    finally:
+        log.close()
+    assert os.path.getsize(path / 'segment-000001.idx') == 0  # Left for inspection